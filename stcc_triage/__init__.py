@@ -2,27 +2,35 @@
 STCC Triage Agent - A DSPy Extension for Medical Triage.
 
 Professional medical triage system with specialized nurses powered by DSPy and DeepSeek.
+
+Public names are imported on first use, so importing the package (and
+starting any stcc-* command) does not load DSPy until it is needed.
 """
 
-from stcc_triage.core.agent import STCCTriageAgent
-from stcc_triage.core.signatures import TriageSignature, FollowUpSignature
-from stcc_triage.nurses.roles import NurseRole
-from stcc_triage.nurses.specialized import (
-    WoundCareNurse,
-    OBNurse,
-    PediatricNurse,
-    NeuroNurse,
-    GINurse,
-    RespiratoryNurse,
-    MentalHealthNurse,
-    CHFNurse,
-    EDNurse,
-    PreOpNurse,
-    GeneralNurse,
-)
-from stcc_triage.optimizers.compiler import optimize_nurse, load_compiled_nurse
-from stcc_triage.datasets.generator import generate_all_specialized_datasets
-from stcc_triage.protocols.parser import parse_all_protocols
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from stcc_triage.core.agent import STCCTriageAgent
+    from stcc_triage.core.signatures import TriageSignature, FollowUpSignature
+    from stcc_triage.nurses.roles import NurseRole
+    from stcc_triage.nurses.specialized import (
+        WoundCareNurse,
+        OBNurse,
+        PediatricNurse,
+        NeuroNurse,
+        GINurse,
+        RespiratoryNurse,
+        MentalHealthNurse,
+        CHFNurse,
+        EDNurse,
+        PreOpNurse,
+        GeneralNurse,
+    )
+    from stcc_triage.optimizers.compiler import optimize_nurse, load_compiled_nurse
+    from stcc_triage.datasets.generator import generate_all_specialized_datasets
+    from stcc_triage.protocols.parser import parse_all_protocols
 
 __all__ = [
     # Core
@@ -52,4 +60,29 @@ __all__ = [
     "parse_all_protocols",
 ]
 
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "STCCTriageAgent": "stcc_triage.core.agent",
+        "TriageSignature": "stcc_triage.core.signatures",
+        "FollowUpSignature": "stcc_triage.core.signatures",
+        "NurseRole": "stcc_triage.nurses.roles",
+        "WoundCareNurse": "stcc_triage.nurses.specialized",
+        "OBNurse": "stcc_triage.nurses.specialized",
+        "PediatricNurse": "stcc_triage.nurses.specialized",
+        "NeuroNurse": "stcc_triage.nurses.specialized",
+        "GINurse": "stcc_triage.nurses.specialized",
+        "RespiratoryNurse": "stcc_triage.nurses.specialized",
+        "MentalHealthNurse": "stcc_triage.nurses.specialized",
+        "CHFNurse": "stcc_triage.nurses.specialized",
+        "EDNurse": "stcc_triage.nurses.specialized",
+        "PreOpNurse": "stcc_triage.nurses.specialized",
+        "GeneralNurse": "stcc_triage.nurses.specialized",
+        "optimize_nurse": "stcc_triage.optimizers.compiler",
+        "load_compiled_nurse": "stcc_triage.optimizers.compiler",
+        "generate_all_specialized_datasets": "stcc_triage.datasets.generator",
+        "parse_all_protocols": "stcc_triage.protocols.parser",
+    },
+)
+
 __version__ = "2.0.0"
@@ -0,0 +1,44 @@
+"""
+Lazy Package Exports.
+
+Package __init__ modules re-export their public names through a
+module-level __getattr__, so `import stcc_triage` (and every stcc-*
+command) only loads DSPy and the other heavy modules once a name that
+needs them is first used.
+"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build __getattr__ and __dir__ for a package that re-exports lazily.
+
+    Args:
+        package: The package's __name__
+        exports: Public name -> module it is defined in (absolute, or
+            relative to the package when it starts with ".")
+
+    Returns:
+        (__getattr__, __dir__) to assign at module level
+
+    Example:
+        __getattr__, __dir__ = lazy_exports(__name__, {"STCCTriageAgent": ".agent"})
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def module_getattr(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value  # Later lookups skip __getattr__
+        return value
+
+    def module_dir() -> List[str]:
+        return sorted({*namespace, *exports})
+
+    return module_getattr, module_dir
@@ -1,6 +1,51 @@
 """FastAPI application for STCC Triage."""
 
-from .app import app
-from .models import TriageRequest, TriageResponse, HealthResponse
+from typing import TYPE_CHECKING
 
-__all__ = ["app", "TriageRequest", "TriageResponse", "HealthResponse"]
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .app import app
+    from .models import (
+        TriageRequest,
+        TriageResponse,
+        HealthResponse,
+        TokenUsage,
+        BatchTriageRequest,
+        BatchTriageItem,
+        SessionCreateRequest,
+        SessionMessageRequest,
+        SessionResponse,
+        SessionReply,
+    )
+
+__all__ = [
+    "app",
+    "TriageRequest",
+    "TriageResponse",
+    "HealthResponse",
+    "TokenUsage",
+    "BatchTriageRequest",
+    "BatchTriageItem",
+    "SessionCreateRequest",
+    "SessionMessageRequest",
+    "SessionResponse",
+    "SessionReply",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "app": ".app",
+        "TriageRequest": ".models",
+        "TriageResponse": ".models",
+        "HealthResponse": ".models",
+        "TokenUsage": ".models",
+        "BatchTriageRequest": ".models",
+        "BatchTriageItem": ".models",
+        "SessionCreateRequest": ".models",
+        "SessionMessageRequest": ".models",
+        "SessionResponse": ".models",
+        "SessionReply": ".models",
+    },
+)
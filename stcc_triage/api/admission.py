@@ -0,0 +1,204 @@
+"""
+Admission Control for the LM Path.
+
+Caps triage requests in flight per API process and the queue in front
+of them. When both are full (or a queued request waits too long) the
+request is turned away with OverloadedError, so a traffic spike is shed
+early instead of piling up LM calls that all time out together.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from stcc_triage.telemetry.metrics import (
+    ADMISSION_INFLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_TOTAL,
+    ADMISSION_WAIT_SECONDS,
+)
+
+T = TypeVar("T")
+
+
+class OverloadedError(Exception):
+    """No LM capacity for this request; retry after retry_after seconds."""
+
+    def __init__(self, retry_after: int, reason: str = "queue full"):
+        super().__init__(f"Triage service overloaded ({reason}); retry in {retry_after}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO queue (one per event loop / process).
+
+    Slots are handed directly from a finishing request to the oldest
+    waiter, so queued requests are served in arrival order. State is only
+    changed on the event loop; `queued` is a plain int so other threads
+    (the load controller) can read it safely.
+    """
+
+    def __init__(self, max_inflight: int = 0, max_queue: int = 100, queue_timeout: float = 10.0):
+        """
+        Initialize the controller.
+
+        Args:
+            max_inflight: Requests allowed on the LM path at once (0 = unlimited)
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is turned away
+        """
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.queued = 0  # len(self._waiters), kept as an int for readers on other threads
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_seconds = 1.0  # EWMA of time in flight
+
+    def full(self) -> bool:
+        """True if a new request would be turned away right now."""
+        return (
+            self.max_inflight > 0
+            and self.inflight >= self.max_inflight
+            and self.queued >= self.max_queue
+        )
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free (for the Retry-After header)."""
+        slots = max(1, self.max_inflight)
+        return max(1, math.ceil(self._service_seconds * (self.queued + 1) / slots))
+
+    def _publish(self):
+        ADMISSION_INFLIGHT.set(self.inflight)
+        ADMISSION_QUEUE_DEPTH.set(self.queued)
+
+    def _reject(self, reason: str) -> OverloadedError:
+        self.rejected += 1
+        ADMISSION_TOTAL.inc(outcome="rejected")
+        return OverloadedError(self.retry_after(), reason)
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait for an LM slot.
+
+        Args:
+            timeout: Wait at most this long (e.g. a request deadline), capped
+                at queue_timeout
+
+        Raises:
+            OverloadedError: If the queue is full or the wait timed out
+        """
+        if self.max_inflight <= 0 or (self.inflight < self.max_inflight and not self.queued):
+            self.inflight += 1
+            ADMISSION_TOTAL.inc(outcome="admitted")
+            ADMISSION_WAIT_SECONDS.observe(0.0)
+            self._publish()
+            return
+        if self.queued >= self.max_queue:
+            raise self._reject("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self._publish()
+        start = time.perf_counter()
+        try:
+            wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+            await asyncio.wait_for(waiter, wait)
+        except asyncio.TimeoutError:
+            raise self._reject("queue timeout") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Slot was handed over as we were cancelled
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)  # Timed out or cancelled while queued
+                self.queued -= 1
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start)
+            self._publish()
+        ADMISSION_TOTAL.inc(outcome="queued")
+
+    def release(self, seconds: Optional[float] = None):
+        """
+        Free a slot, handing it to the oldest waiter if there is one.
+
+        Args:
+            seconds: Time the request spent in flight (updates Retry-After estimates)
+        """
+        if seconds is not None:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            self.queued -= 1
+            if not waiter.done():
+                waiter.set_result(None)  # inflight count passes to the waiter
+                self._publish()
+                return
+        self.inflight = max(0, self.inflight - 1)
+        self._publish()
+
+    @asynccontextmanager
+    async def admit(self, timeout: Optional[float] = None):
+        """Hold an LM slot for the duration of the block (see acquire)."""
+        await self.acquire(timeout)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    async def run_in_thread(
+        self, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs
+    ) -> T:
+        """
+        Run a blocking call in the threadpool while holding an LM slot.
+
+        Unlike admit(), giving up on the result (timeout or cancellation)
+        does not free the slot: the thread keeps using the LM after its
+        caller stops waiting, so the slot is released when it returns.
+
+        Args:
+            func: Blocking callable, called with args and kwargs
+            timeout: Seconds to wait for the result, queue wait included
+
+        Returns:
+            The call's result
+
+        Raises:
+            OverloadedError: If the request was turned away
+            asyncio.TimeoutError: If the result did not arrive within timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        await self.acquire(timeout)
+        start = time.perf_counter()
+        task = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+
+        def finished(task: asyncio.Future):
+            if not task.cancelled():
+                task.exception()  # Mark retrieved: the caller may have stopped waiting
+            self.release(time.perf_counter() - start)
+
+        task.add_done_callback(finished)
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        return await asyncio.wait_for(asyncio.shield(task), remaining)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current limits and load."""
+        return {
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_seconds": round(self._service_seconds, 3),
+        }
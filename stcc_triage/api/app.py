@@ -4,18 +4,98 @@ FastAPI Application for STCC Triage Agent.
 RESTful API for medical triage with specialized nurses.
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import re
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
 from stcc_triage.core.agent import STCCTriageAgent
+from stcc_triage.core.settings import APIConfig
+from stcc_triage.nurses.pool import NursePool
 from stcc_triage.nurses.roles import NurseRole
-from stcc_triage.api.models import TriageRequest, TriageResponse, HealthResponse
+from stcc_triage.api.models import (
+    BatchTriageItem,
+    BatchTriageRequest,
+    HealthResponse,
+    SessionCreateRequest,
+    SessionMessageRequest,
+    SessionReply,
+    SessionResponse,
+    TokenUsage,
+    TriageRequest,
+    TriageResponse,
+)
+from stcc_triage.api.admission import AdmissionController, OverloadedError
+from stcc_triage.api.catalog import ProtocolCatalog
+from stcc_triage.api.idempotency import IdempotencyConflictError, IdempotencyStore, StoredResponse
+from stcc_triage.api.jobs import DEFAULT_LEASE_SECONDS, JobQueue, JobStore
+from stcc_triage.api.sessions import Session, SessionStore
+from stcc_triage.api.warmup import Warmup
+from stcc_triage.lm.deadline import expired as deadline_expired
+from stcc_triage.lm.deadline import remaining as deadline_remaining
+from stcc_triage.lm.deadline import request_deadline
+from stcc_triage.lm.quality import get_quality_controller
+from stcc_triage.lm.scheduler import Lane, lm_lane
+from stcc_triage.lm.usage import get_usage_ledger, track_usage
+from stcc_triage.telemetry.metrics import (
+    ADMISSION_TOTAL,
+    CONTENT_TYPE,
+    get_registry,
+    observe_request,
+    observe_usage,
+)
+from stcc_triage.telemetry.profiling import PROFILE_HEADER, get_profiler, profile_request
+from stcc_triage.telemetry.timing import annotate_request, current_timer, track_stages
+from stcc_triage.telemetry.tracing import get_tracer
+
+# Startup warm-up state reported by /readyz
+warmup = Warmup()
+
+
+def warmup_steps():
+    """One-time setup run at boot: protocols and LM client, compiled nurses, retrieval."""
+    return [
+        ("agent", get_agent),
+        ("nurses", lambda: get_nurse_pool().preload()),
+        ("retrieval", lambda: get_agent()._add_protocol_context("chest pain and fever")),
+        ("catalog", get_protocol_catalog),
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up and resume queued jobs at boot; stop jobs, spill sessions and flush usage at shutdown."""
+    if warmup.status != "pending":
+        pass  # Already warmed by a pre-fork master
+    elif api_config.prewarm:
+        warmup.start(warmup_steps())
+    else:
+        warmup.skip()
+    if api_config.jobs_workers > 0:
+        get_job_queue().start()
+    yield
+    if _job_queue is not None:
+        _job_queue.stop()
+    if _session_store is not None:
+        _session_store.spill_all()
+    get_usage_ledger().flush()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="STCC Triage Agent API",
     description="Medical triage API using DSPy and DeepSeek",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -27,29 +107,526 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize triage agent (lazy loading)
+
+# POSTs that honour Idempotency-Key (JSON responses, replayed byte-for-byte)
+IDEMPOTENT_PATHS = re.compile(r"^/(triage|triage/specialized|sessions/[^/]+/messages)$")
+
+
+@app.middleware("http")
+async def idempotent_request(request: Request, call_next):
+    """Replay the stored response for a repeated Idempotency-Key; retries wait for the original."""
+    key = request.headers.get("idempotency-key")
+    if key is None or request.method != "POST" or not IDEMPOTENT_PATHS.match(request.url.path):
+        return await call_next(request)
+    if not key or len(key) > 255:
+        return JSONResponse({"detail": "Idempotency-Key must be 1-255 characters"}, status_code=400)
+
+    store_key = f"{request.url.path}\n{key}"
+    body = await request.body()
+    fingerprint = IdempotencyStore.fingerprint(request.method, request.url.path, body)
+    deadline = asyncio.get_running_loop().time() + api_config.idempotency_wait
+    while True:
+        try:
+            claim = idempotency.begin(store_key, fingerprint)
+        except IdempotencyConflictError:
+            return JSONResponse(
+                {"detail": "Idempotency-Key was already used with a different request"},
+                status_code=422,
+            )
+        if claim is None:
+            break
+        if isinstance(claim, StoredResponse):
+            return Response(
+                claim.body,
+                status_code=claim.status_code,
+                headers={**claim.headers, "Idempotent-Replayed": "true"},
+            )
+        # Original still running: wait for it, then replay (or run if it failed)
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            await asyncio.wait_for(asyncio.shield(claim), max(0.0, remaining))
+        except asyncio.TimeoutError:
+            return JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+            )
+
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        idempotency.abandon(store_key)
+        raise
+    headers = IdempotencyStore.replayable_headers(response.headers)
+    if response.status_code >= 500 or response.status_code == 429:
+        idempotency.abandon(store_key)  # Transient: let a retry run again
+    else:
+        idempotency.finish(
+            store_key, StoredResponse(fingerprint, response.status_code, headers, body)
+        )
+    return Response(body, status_code=response.status_code, headers=headers)
+
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """Trace, time and optionally profile each request, add Server-Timing and record triage metrics."""
+    tracer = get_tracer()
+    profiling = get_profiler().wants_request(request.headers.get(PROFILE_HEADER))
+    with (
+        tracer.span("http.request", method=request.method) as span,
+        track_stages() as timer,
+        profile_request(profiling) as profile,
+    ):
+        response = await call_next(request)
+        total = timer.elapsed()
+
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", request.url.path)
+        stages = {
+            f"stage.{name}_ms": round(seconds * 1000, 3)
+            for name, seconds in list(timer.stages.items())
+        }
+        span.set_attributes(
+            route=endpoint,
+            status_code=response.status_code,
+            role=timer.role,
+            action=timer.action,
+            degraded=timer.degraded,
+            **stages,
+        )
+
+    response.headers["Server-Timing"] = timer.server_timing(total)
+    if tracer.enabled:
+        response.headers["X-Trace-Id"] = span.trace_id
+    if profile is not None and profile.path is not None:
+        response.headers["X-Profile"] = profile.path.name
+    if timer.action is not None:
+        observe_request(timer, endpoint, response.status_code, total)
+    return response
+
+
+# Per-endpoint timeouts
+api_config = APIConfig()
+
+# Bounded concurrency and queue in front of the LM path (per process)
+admission = AdmissionController(
+    max_inflight=api_config.max_inflight,
+    max_queue=api_config.max_queue,
+    queue_timeout=api_config.queue_timeout,
+)
+# Stored responses for Idempotency-Key retries (per process)
+idempotency = IdempotencyStore(
+    max_entries=api_config.idempotency_max, ttl_seconds=api_config.idempotency_ttl
+)
+# Queue depth is one of the load signals for adaptive triage quality
+get_quality_controller().set_queue_source(lambda: admission.queued)
+
+# Initialize triage agent (built by warm-up, or lazily on first use)
 _agent = None
+_nurse_pool = None
+_job_queue = None
+_session_store = None
+_protocol_catalog = None
+_init_lock = threading.Lock()
 
 
 def get_agent() -> STCCTriageAgent:
     """Get or initialize the triage agent."""
     global _agent
     if _agent is None:
-        _agent = STCCTriageAgent()
+        with _init_lock:
+            if _agent is None:
+                _agent = STCCTriageAgent()
     return _agent
 
 
+def get_nurse_pool() -> NursePool:
+    """Get or initialize the compiled nurse pool (shares the triage agent's protocols)."""
+    global _nurse_pool
+    if _nurse_pool is None:
+        agent = get_agent()
+        with _init_lock:
+            if _nurse_pool is None:
+                _nurse_pool = NursePool(agent)
+    return _nurse_pool
+
+
+def get_job_queue() -> JobQueue:
+    """Get or initialize the persistent job queue (workers start with the app)."""
+    global _job_queue
+    if _job_queue is None:
+        with _init_lock:
+            if _job_queue is None:
+                path = Path(api_config.jobs_db) if api_config.jobs_db else None
+                _job_queue = JobQueue(
+                    JobStore(path, max_attempts=api_config.jobs_max_attempts),
+                    run_job_item,
+                    workers=api_config.jobs_workers,
+                    ready=lambda: warmup.ready,
+                )
+    return _job_queue
+
+
+def get_session_store() -> SessionStore:
+    """Get or initialize the in-memory conversation session store."""
+    global _session_store
+    if _session_store is None:
+        with _init_lock:
+            if _session_store is None:
+                spill = Path(api_config.session_spill) if api_config.session_spill else None
+                _session_store = SessionStore(
+                    max_sessions=api_config.session_max,
+                    ttl_seconds=api_config.session_ttl,
+                    spill_path=spill,
+                )
+    return _session_store
+
+
+def get_protocol_catalog() -> ProtocolCatalog:
+    """Get or build the protocol catalog (shares the triage agent's protocols)."""
+    global _protocol_catalog
+    if _protocol_catalog is None:
+        agent = get_agent()
+        with _init_lock:
+            if _protocol_catalog is None:
+                _protocol_catalog = ProtocolCatalog(agent.protocols)
+    return _protocol_catalog
+
+
+def record_usage(source: str, role: Optional[str], usage: dict):
+    """Export a usage snapshot to /metrics and the daily usage rollup."""
+    observe_usage(source, role, usage)
+    get_usage_ledger().record(source, role, usage)
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded(request: Request, exc: OverloadedError):
+    """Answer requests shed by admission control with 429 and Retry-After."""
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def rules_fast_path(agent: STCCTriageAgent, symptoms: str, conversation_history=None) -> bool:
+    """True if an overloaded request should get rule-based triage instead of 429."""
+    if api_config.overload_policy == "rules":
+        return True
+    text = agent._build_conversation(symptoms, conversation_history)
+    return bool(agent.rules.red_flags(text))
+
+
+def overload_fallback(
+    agent: STCCTriageAgent, symptoms: str, conversation_history, error: OverloadedError
+):
+    """
+    Answer a request turned away by admission control.
+
+    Suspected red flags (or every request with STCC_API_OVERLOAD_POLICY=rules)
+    get conservative rule-based triage; anything else re-raises for a 429.
+
+    Raises:
+        OverloadedError: If the request should be retried later
+    """
+    if not rules_fast_path(agent, symptoms, conversation_history):
+        raise error
+    ADMISSION_TOTAL.inc(outcome="rules")
+    return agent.fallback_triage(symptoms, conversation_history=conversation_history)
+
+
+async def run_triage(
+    agent: STCCTriageAgent, request: TriageRequest, timeout: float, role: Optional[str] = None
+):
+    """
+    Run agent triage off the event loop with a deadline.
+
+    Falls back to conservative rule-based triage (flagged as degraded)
+    when the LM does not answer within the endpoint timeout or the
+    request's deadline_ms, or when admission control is full and red
+    flags are suspected. The deadline (the endpoint timeout unless
+    deadline_ms is shorter) covers the admission queue wait and is passed
+    on to the agent, which picks a strategy and LM timeout that fit. The
+    admission slot is held until the worker thread returns, even after a
+    timeout.
+
+    Args:
+        agent: General or specialized agent
+        request: Triage request
+        timeout: Seconds before answering with degraded triage
+        role: Nurse role for usage accounting (default: the request timer's role)
+
+    Returns:
+        Tuple of (prediction, LM usage snapshot for this request)
+
+    Raises:
+        OverloadedError: If admission control turned the request away
+    """
+    deadline = min(timeout, request.deadline_ms / 1000) if request.deadline_ms else timeout
+    with track_usage() as usage, request_deadline(deadline):
+        try:
+            result = await admission.run_in_thread(
+                agent.triage,
+                symptoms=request.symptoms,
+                conversation_history=request.conversation_history,
+                timeout=deadline,
+            )
+        except asyncio.TimeoutError:
+            result = agent.fallback_triage(
+                request.symptoms, conversation_history=request.conversation_history
+            )
+        except OverloadedError as e:
+            if deadline_expired():
+                # Deadline passed while queued: answer now rather than 429
+                result = agent.fallback_triage(
+                    request.symptoms, conversation_history=request.conversation_history
+                )
+            else:
+                result = overload_fallback(
+                    agent, request.symptoms, request.conversation_history, e
+                )
+
+    snapshot = usage.snapshot()
+    if role is None:
+        timer = current_timer()
+        role = timer.role if timer is not None else None
+    record_usage("api", role, snapshot)
+    return result, snapshot
+
+
+async def run_session_turn(session: Session, message: str, on_chunk=None) -> SessionReply:
+    """
+    Answer one patient message in a session with ask_or_triage.
+
+    Only the new message is scanned for missing info; the history sent to
+    the LM is capped at STCC_API_SESSION_MAX_MESSAGES, so per-turn work
+    does not grow with the conversation.
+
+    Args:
+        session: Conversation session (updated in place)
+        message: Latest patient message
+        on_chunk: Optional async callback(field, text); when given, triage
+            output is streamed to it while the LM generates it
+
+    Returns:
+        SessionReply with follow-up questions or a triage decision
+
+    Raises:
+        OverloadedError: If admission control turned the message away
+    """
+    if session.nurse_role:
+        agent = get_nurse_pool().get(NurseRole(session.nurse_role))
+        timeout, role = api_config.specialized_timeout, session.nurse_role
+    else:
+        agent, timeout, role = get_agent(), api_config.triage_timeout, "general"
+    annotate_request(role=role)
+
+    history = list(session.history)
+    turn: Dict[str, Any] = dict(
+        conversation_history=history,
+        question_rounds=session.question_rounds,
+        max_rounds=session.max_rounds,
+        missing_info=session.missing_info,
+    )
+
+    async def stream_answer() -> dict:
+        response = await run_in_threadpool(agent.ask_followup, message, **turn)
+        if response["action"] == "triage":
+            async for value in agent.stream_triage(message, conversation_history=history):
+                if isinstance(value, tuple):
+                    await on_chunk(*value)
+                else:
+                    response["result"] = value
+        return response
+
+    with track_usage() as usage:
+        try:
+            if on_chunk is None:
+                response = await admission.run_in_thread(
+                    agent.ask_or_triage, message, timeout=timeout, **turn
+                )
+            else:
+                async with admission.admit():
+                    response = await asyncio.wait_for(stream_answer(), timeout=timeout)
+        except asyncio.TimeoutError:
+            annotate_request(action="triage")
+            response = {
+                "action": "triage",
+                "result": agent.fallback_triage(message, conversation_history=history),
+                "missing_info": session.missing_info,
+            }
+        except OverloadedError as e:
+            annotate_request(action="triage")
+            response = {
+                "action": "triage",
+                "result": overload_fallback(agent, message, history, e),
+                "missing_info": session.missing_info,
+            }
+
+    snapshot = usage.snapshot()
+    record_usage("api", role, snapshot)
+
+    session.add_message(message, api_config.session_max_messages)
+    session.missing_info = response["missing_info"]
+    if response["action"] == "ask":
+        session.question_rounds += 1
+        return SessionReply(
+            session_id=session.id,
+            action="ask",
+            questions=response["questions"],
+            question_rounds=session.question_rounds,
+        )
+
+    # Reset rounds after triage (further messages start a new assessment)
+    session.question_rounds = 0
+    return SessionReply(
+        session_id=session.id,
+        action="triage",
+        result=to_response(response["result"], snapshot),
+    )
+
+
+def run_job_item(index: int, payload: dict):
+    """
+    Triage one queued job item in a job worker thread.
+
+    Runs in the batch LM lane so live requests are served first, with the
+    same agent, compiled nurses, caches and rate limits as the endpoints.
+    The endpoint timeout applies as a deadline, capped well inside the job
+    lease so an item is never handed to a second worker while it runs.
+
+    Args:
+        index: Position of the item in its job
+        payload: TriageRequest body
+
+    Returns:
+        Tuple of (status code, BatchTriageItem line)
+    """
+    request = TriageRequest(**payload)
+    agent, timeout, role = get_agent(), api_config.triage_timeout, "general"
+    if request.nurse_role:
+        try:
+            nurse_role = NurseRole(request.nurse_role)
+            agent, role = get_nurse_pool().get(nurse_role), nurse_role.value
+            timeout = api_config.specialized_timeout
+        except ValueError as e:
+            item = BatchTriageItem(index=index, status_code=400, error=str(e))
+            return item.status_code, item.model_dump(exclude_none=True)
+        except FileNotFoundError as e:
+            item = BatchTriageItem(index=index, status_code=404, error=f"Compiled nurse not found: {e}")
+            return item.status_code, item.model_dump(exclude_none=True)
+
+    deadline = min(timeout, DEFAULT_LEASE_SECONDS / 2)
+    with lm_lane(Lane.BATCH), track_usage() as usage, request_deadline(deadline):
+        result = agent.triage(
+            symptoms=request.symptoms,
+            conversation_history=request.conversation_history,
+        )
+
+    snapshot = usage.snapshot()
+    record_usage("jobs", role, snapshot)
+    item = BatchTriageItem(index=index, result=to_response(result, snapshot))
+    return item.status_code, item.model_dump(exclude_none=True)
+
+
+def to_response(result, usage=None) -> TriageResponse:
+    """Convert a DSPy Prediction (and optional usage snapshot) to the response model."""
+    degraded = bool(getattr(result, 'degraded', False))
+    return TriageResponse(
+        triage_level=result.triage_level,
+        clinical_justification=result.clinical_justification,
+        # ChainOfThought names the field `reasoning` (older DSPy used `rationale`)
+        rationale=getattr(result, 'reasoning', None) or getattr(result, 'rationale', None),
+        degraded=degraded,
+        mode="rules" if degraded else getattr(result, 'quality_mode', "full"),
+        usage=TokenUsage(**usage) if usage is not None else None,
+    )
+
+
 @app.get("/", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint."""
-    agent = get_agent()
+    """Health check endpoint (reports "warming" instead of blocking during warm-up)."""
+    warming = warmup.status == "warming"
+    agent = _agent if warming else get_agent()
     return HealthResponse(
-        status="healthy",
+        status="warming" if warming else "healthy",
         version="2.0.0",
-        protocols_loaded=len(agent.protocols)
+        protocols_loaded=len(agent.protocols) if agent is not None else 0
     )
 
 
+@app.get("/livez")
+async def livez():
+    """Liveness probe: the process is serving requests (never touches the agent)."""
+    return {"status": "alive"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: 200 once warm-up has finished, 503 while warming or failed."""
+    state = warmup.snapshot()
+    if _nurse_pool is not None:
+        state["nurses"] = [role.value for role in _nurse_pool.loaded_roles()]
+    state["admission"] = admission.snapshot()
+    return JSONResponse(state, status_code=200 if warmup.ready else 503)
+
+
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus metrics: per-stage latency histograms and LM call-layer state.
+
+    A plain def so FastAPI runs it in the threadpool: rendering reads the
+    rate-limit state file and must not block the event loop.
+    """
+    return Response(get_registry().render(), media_type=CONTENT_TYPE)
+
+
+def protocols_cache_control() -> str:
+    """Cache-Control for protocol responses: revalidate each time unless a max age is set."""
+    if api_config.protocols_max_age > 0:
+        return f"public, max-age={api_config.protocols_max_age}"
+    return "no-cache"
+
+
+@app.get("/protocols")
+async def list_protocols(
+    request: Request,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """
+    Page through STCC protocol summaries (id, name, category, urgency levels).
+
+    Bodies are pre-serialized and gzipped; send If-None-Match with the
+    ETag from a previous response to get 304 Not Modified.
+    """
+    catalog = await run_in_threadpool(get_protocol_catalog)
+    return catalog.page(offset, limit).response(request, protocols_cache_control())
+
+
+@app.get("/protocols/search")
+async def search_protocols(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    """Search protocol names, categories, red flags and conditions (all terms must match)."""
+    catalog = await run_in_threadpool(get_protocol_catalog)
+    return catalog.search(q, offset, limit).response(request, protocols_cache_control())
+
+
+@app.get("/protocols/{protocol_id}")
+async def get_protocol(protocol_id: int, request: Request):
+    """Full protocol text: sections with conditions and actions, red flags, key questions."""
+    catalog = await run_in_threadpool(get_protocol_catalog)
+    cached = catalog.get(protocol_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Protocol {protocol_id} not found")
+    return cached.response(request, protocols_cache_control())
+
+
 @app.post("/triage", response_model=TriageResponse)
 async def triage(request: TriageRequest):
     """
@@ -61,22 +638,19 @@ async def triage(request: TriageRequest):
     Returns:
         TriageResponse with triage level and clinical justification
     """
+    annotate_request(role="general", action="triage")
+
     try:
         agent = get_agent()
 
         # Perform triage
-        result = agent.triage(
-            symptoms=request.symptoms,
-            conversation_history=request.conversation_history
-        )
+        result, usage = await run_triage(agent, request, api_config.triage_timeout)
 
         # Convert DSPy Prediction to response model
-        return TriageResponse(
-            triage_level=result.triage_level,
-            clinical_justification=result.clinical_justification,
-            rationale=getattr(result, 'rationale', None)
-        )
+        return to_response(result, usage)
 
+    except OverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -99,28 +673,19 @@ async def triage_specialized(request: TriageRequest):
         )
 
     try:
-        # Load specialized nurse
-        from stcc_triage.optimizers.compiler import load_compiled_nurse
-
         role = NurseRole(request.nurse_role)
-        compiled_module = load_compiled_nurse(role)
+        annotate_request(role=role.value, action="triage")
 
-        # Create agent with compiled module
-        agent = get_agent()
-        agent.triage_module = compiled_module
+        # Specialized nurse with its compiled program (loaded once per role)
+        agent = get_nurse_pool().get(role)
 
         # Perform triage
-        result = agent.triage(
-            symptoms=request.symptoms,
-            conversation_history=request.conversation_history
-        )
+        result, usage = await run_triage(agent, request, api_config.specialized_timeout)
 
-        return TriageResponse(
-            triage_level=result.triage_level,
-            clinical_justification=result.clinical_justification,
-            rationale=getattr(result, 'rationale', None)
-        )
+        return to_response(result, usage)
 
+    except OverloadedError:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(
             status_code=404,
@@ -130,6 +695,500 @@ async def triage_specialized(request: TriageRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/triage/stream")
+async def triage_stream(request: TriageRequest):
+    """
+    Triage with output streamed as Server-Sent Events while it is generated.
+
+    Events, in generation order:
+        reasoning: {"text": chunk} while the chain of thought is generated
+        triage_level: {"triage_level": level} as soon as the level is decoded
+        clinical_justification: {"text": chunk}
+        result: the full TriageResponse (degraded if the deadline passed)
+        error: {"detail": message} if triage failed
+
+    Args:
+        request: TriageRequest (nurse_role selects a specialized nurse)
+
+    Returns:
+        text/event-stream response
+    """
+    if request.nurse_role:
+        try:
+            nurse_role = NurseRole(request.nurse_role)
+            agent = get_nurse_pool().get(nurse_role)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Compiled nurse not found: {str(e)}"
+            )
+        timeout, role = api_config.specialized_timeout, nurse_role.value
+    else:
+        agent, timeout, role = get_agent(), api_config.triage_timeout, "general"
+    annotate_request(role=role, action="stream")
+    if admission.full() and not rules_fast_path(
+        agent, request.symptoms, request.conversation_history
+    ):
+        raise OverloadedError(admission.retry_after())
+
+    async def produce(queue: asyncio.Queue):
+        # The LM stream lives in one task; the bounded queue applies back-pressure
+        try:
+            async for value in agent.stream_triage(request.symptoms, request.conversation_history):
+                await queue.put(value)
+        except Exception as e:
+            await queue.put(e)
+        await queue.put(None)
+
+    seconds = request.deadline_ms / 1000 if request.deadline_ms else None
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if seconds is None else min(timeout, seconds))
+        level, level_sent, result = "", False, None
+        with track_usage() as usage, request_deadline(seconds):
+            try:
+                async with admission.admit(timeout=deadline_remaining()):
+                    queue = asyncio.Queue(maxsize=64)
+                    producer = asyncio.create_task(produce(queue))
+                    try:
+                        while result is None:
+                            try:
+                                value = await asyncio.wait_for(
+                                    queue.get(), max(0.0, deadline - loop.time())
+                                )
+                            except asyncio.TimeoutError:
+                                result = agent.fallback_triage(
+                                    request.symptoms,
+                                    conversation_history=request.conversation_history,
+                                )
+                                break
+                            if value is None:
+                                break
+                            if isinstance(value, Exception):
+                                yield sse_event("error", {"detail": str(value)})
+                                return
+                            if not isinstance(value, tuple):
+                                result = value
+                                break
+
+                            field, text = value
+                            if field == "triage_level":
+                                level += text
+                                continue
+                            if level and not level_sent:
+                                # The level is complete once the next field starts
+                                yield sse_event("triage_level", {"triage_level": level.strip()})
+                                level_sent = True
+                            yield sse_event(field, {"text": text})
+                    finally:
+                        producer.cancel()
+            except OverloadedError as e:
+                try:
+                    if deadline_expired():
+                        result = agent.fallback_triage(
+                            request.symptoms, conversation_history=request.conversation_history
+                        )
+                    else:
+                        result = overload_fallback(
+                            agent, request.symptoms, request.conversation_history, e
+                        )
+                except OverloadedError:
+                    yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+                    return
+
+        if result is None:
+            yield sse_event("error", {"detail": "Triage produced no result"})
+            return
+        if not level_sent:
+            # Not streamed (cache hit, non-streaming LM or fallback) or still buffered
+            yield sse_event("triage_level", {"triage_level": result.triage_level})
+        snapshot = usage.snapshot()
+        record_usage("api", role, snapshot)
+        yield sse_event("result", to_response(result, snapshot).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/triage/batch")
+async def triage_batch(batch: BatchTriageRequest):
+    """
+    Triage many requests concurrently, streaming results as they finish.
+
+    Items run concurrently (at most STCC_API_BATCH_CONCURRENCY at once, and
+    within the shared LM rate limits) in the batch LM lane. Each finished item is written as one
+    NDJSON line, tagged with its index in the batch, so early results arrive
+    before the slowest item completes. A failing item yields an error line
+    instead of failing the batch.
+
+    Args:
+        batch: BatchTriageRequest with a list of TriageRequest objects
+
+    Returns:
+        application/x-ndjson stream of BatchTriageItem lines
+    """
+    if len(batch.requests) > api_config.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.requests)} requests "
+            f"(limit {api_config.batch_max_size})"
+        )
+    annotate_request(role="batch", action="batch")
+
+    agent = get_agent()
+    semaphore = asyncio.Semaphore(max(1, api_config.batch_concurrency))
+
+    async def triage_item(index: int, request: TriageRequest) -> BatchTriageItem:
+        item_agent, timeout, role = agent, api_config.triage_timeout, "general"
+        if request.nurse_role:
+            try:
+                nurse_role = NurseRole(request.nurse_role)
+                item_agent = get_nurse_pool().get(nurse_role)
+            except ValueError as e:
+                return BatchTriageItem(index=index, status_code=400, error=str(e))
+            except FileNotFoundError as e:
+                return BatchTriageItem(
+                    index=index, status_code=404, error=f"Compiled nurse not found: {e}"
+                )
+            timeout, role = api_config.specialized_timeout, nurse_role.value
+
+        # Bulk work yields the LM to interactive requests in the live lane
+        async with semaphore:
+            with lm_lane(Lane.BATCH):
+                try:
+                    result, usage = await run_triage(item_agent, request, timeout, role=role)
+                except OverloadedError as e:
+                    return BatchTriageItem(index=index, status_code=429, error=str(e))
+                except Exception as e:
+                    return BatchTriageItem(index=index, status_code=500, error=str(e))
+        return BatchTriageItem(index=index, result=to_response(result, usage))
+
+    async def stream():
+        tasks = [
+            asyncio.create_task(triage_item(index, request))
+            for index, request in enumerate(batch.requests)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item = await finished
+                yield json.dumps(item.model_dump(exclude_none=True), ensure_ascii=False) + "\n"
+        finally:
+            # Client went away: stop items that have not started
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def session_response(session: Session) -> SessionResponse:
+    """Describe a session without its message contents."""
+    return SessionResponse(
+        session_id=session.id,
+        nurse_role=session.nurse_role,
+        max_rounds=session.max_rounds,
+        question_rounds=session.question_rounds,
+        messages=len(session.history),
+    )
+
+
+@app.post("/sessions", status_code=201, response_model=SessionResponse)
+async def create_session(request: SessionCreateRequest):
+    """
+    Start a conversation session.
+
+    The server keeps the conversation, follow-up rounds and missing info,
+    so each turn only sends the new message to POST /sessions/{id}/messages.
+    Idle sessions expire after STCC_API_SESSION_TTL seconds.
+
+    Args:
+        request: SessionCreateRequest with optional nurse_role and max_rounds
+
+    Returns:
+        SessionResponse with the new session_id
+    """
+    if request.nurse_role:
+        try:
+            get_nurse_pool().get(NurseRole(request.nurse_role))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Compiled nurse not found: {str(e)}"
+            )
+
+    session = await run_in_threadpool(
+        get_session_store().create, request.nurse_role, request.max_rounds
+    )
+    return session_response(session)
+
+
+@app.get("/sessions/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str):
+    """Get a session's state (404 once it has expired)."""
+    session = await run_in_threadpool(get_session_store().get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return session_response(session)
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    """End a session and discard its conversation."""
+    if not await run_in_threadpool(get_session_store().delete, session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return Response(status_code=204)
+
+
+@app.post("/sessions/{session_id}/messages", response_model=SessionReply)
+async def session_message(session_id: str, request: SessionMessageRequest):
+    """
+    Send the next patient message in a session.
+
+    Args:
+        session_id: Id returned by POST /sessions
+        request: SessionMessageRequest with the latest patient message
+
+    Returns:
+        SessionReply with follow-up questions (action "ask") or a triage
+        decision (action "triage")
+    """
+    session = await run_in_threadpool(get_session_store().get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    if session.busy:
+        raise HTTPException(
+            status_code=409,
+            detail="Previous message in this session is still being answered"
+        )
+
+    session.busy = True
+    try:
+        return await run_session_turn(session, request.message)
+    except OverloadedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        session.busy = False
+
+
+class _SlowClientError(Exception):
+    """A WebSocket client stopped reading its events."""
+
+
+@app.websocket("/chat")
+async def chat(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    nurse_role: Optional[str] = None,
+    max_rounds: int = 3,
+):
+    """
+    Multi-turn ask-or-triage conversation over one WebSocket.
+
+    Opens (or, with session_id, resumes) a conversation session. The client
+    sends {"message": "..."} frames; the server answers each with either a
+    "questions" event or "chunk" events streaming the triage output followed
+    by a "triage" event. Messages are answered one at a time, and a client
+    that stops reading for STCC_API_WS_SEND_TIMEOUT seconds is disconnected.
+    Connections idle for STCC_API_WS_IDLE_TIMEOUT seconds are closed.
+
+    Args:
+        websocket: Client connection
+        session_id: Existing session to resume
+        nurse_role: Specialized nurse role for a new session
+        max_rounds: Maximum follow-up rounds for a new session
+    """
+    await websocket.accept()
+    store = get_session_store()
+
+    async def send(event: dict):
+        # A client that stops reading blocks the send: give up on it
+        try:
+            await asyncio.wait_for(websocket.send_json(event), api_config.ws_send_timeout)
+        except asyncio.TimeoutError:
+            raise _SlowClientError() from None
+
+    async def send_chunk(field: str, text: str):
+        await send({"type": "chunk", "field": field, "text": text})
+
+    try:
+        if session_id:
+            session = await run_in_threadpool(store.get, session_id)
+            if session is None:
+                await send({"type": "error", "status_code": 404, "detail": f"Unknown or expired session: {session_id}"})
+                await websocket.close(code=4404)
+                return
+        else:
+            try:
+                if nurse_role:
+                    get_nurse_pool().get(NurseRole(nurse_role))
+            except ValueError as e:
+                await send({"type": "error", "status_code": 400, "detail": str(e)})
+                await websocket.close(code=4400)
+                return
+            except FileNotFoundError as e:
+                await send({"type": "error", "status_code": 404, "detail": f"Compiled nurse not found: {e}"})
+                await websocket.close(code=4404)
+                return
+            session = await run_in_threadpool(store.create, nurse_role, max(0, min(max_rounds, 10)))
+        await send({"type": "session", **session_response(session).model_dump()})
+
+        while True:
+            try:
+                frame = await asyncio.wait_for(
+                    websocket.receive_text(), api_config.ws_idle_timeout
+                )
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="idle timeout")
+                return
+            try:
+                message = SessionMessageRequest.model_validate_json(frame).message
+            except ValidationError as e:
+                await send({"type": "error", "status_code": 422, "detail": e.errors(include_url=False)[0]["msg"]})
+                continue
+
+            # Keep the session alive in the store while the socket is in use
+            if await run_in_threadpool(store.get, session.id) is None:
+                await send({"type": "error", "status_code": 404, "detail": "Session expired"})
+                await websocket.close(code=4404)
+                return
+            if session.busy:
+                await send({"type": "error", "status_code": 409, "detail": "Session is busy in another request"})
+                continue
+
+            session.busy = True
+            try:
+                reply = await run_session_turn(session, message, on_chunk=send_chunk)
+            except (WebSocketDisconnect, _SlowClientError):
+                raise
+            except OverloadedError as e:
+                await send({
+                    "type": "error",
+                    "status_code": 429,
+                    "retry_after": e.retry_after,
+                    "detail": str(e),
+                })
+                continue
+            except Exception as e:
+                await send({"type": "error", "status_code": 500, "detail": str(e)})
+                continue
+            finally:
+                session.busy = False
+
+            if reply.action == "ask":
+                await send({
+                    "type": "questions",
+                    "questions": reply.questions,
+                    "question_rounds": reply.question_rounds,
+                })
+            else:
+                result = reply.result.model_dump() if reply.result is not None else None
+                await send({"type": "triage", "result": result})
+    except WebSocketDisconnect:
+        pass
+    except _SlowClientError:
+        # Slow consumer: drop the connection rather than buffer without bound
+        await websocket.close(code=1008, reason="client not reading")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request):
+    """
+    Queue a JSONL file of triage requests for background processing.
+
+    The body holds one TriageRequest JSON object per line. Items are stored
+    in a persistent SQLite queue and triaged by background workers in the
+    batch LM lane; unfinished jobs resume when the server restarts.
+
+    Args:
+        request: Raw request with an application/x-ndjson (JSONL) body
+
+    Returns:
+        202 with the job's progress and a Location header to poll
+    """
+    annotate_request(role="batch", action="jobs")
+
+    requests = []
+    body = (await request.body()).decode("utf-8", errors="replace")
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            requests.append(TriageRequest.model_validate_json(line).model_dump())
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Line {number}: {e.errors(include_url=False)[0]['msg']}"
+            )
+        if len(requests) > api_config.jobs_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Job too large: more than {api_config.jobs_max_items} requests"
+            )
+    if not requests:
+        raise HTTPException(status_code=400, detail="Job has no requests")
+
+    queue = get_job_queue()
+    job_id = await run_in_threadpool(queue.submit, requests)
+    progress = await run_in_threadpool(queue.store.progress, job_id)
+    return JSONResponse(progress, status_code=202, headers={"Location": f"/jobs/{job_id}"})
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """
+    Get a job's progress.
+
+    Args:
+        job_id: Id returned by POST /jobs
+
+    Returns:
+        Status (queued, running or completed) with item counts
+    """
+    progress = await run_in_threadpool(get_job_queue().store.progress, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return progress
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    """
+    Download a job's finished items as NDJSON, in input order.
+
+    Can be called while the job is running: only finished items are
+    returned, so poll GET /jobs/{job_id} until the job is completed.
+
+    Args:
+        job_id: Id returned by POST /jobs
+
+    Returns:
+        application/x-ndjson stream of BatchTriageItem lines
+    """
+    store = get_job_queue().store
+    if await run_in_threadpool(store.progress, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    def stream():
+        for line in store.results(job_id):
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
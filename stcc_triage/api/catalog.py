@@ -0,0 +1,209 @@
+"""
+Protocol Catalog.
+
+Read-only browsing and search over the agent's in-memory STCC protocols,
+so client apps no longer ship their own protocols.json. Response bodies
+are serialized and gzipped once, and every body carries a strong ETag
+derived from a hash of the protocol store, so repeat fetches are
+answered with 304 Not Modified.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() in ("gzip", "*"):
+            q = params.strip()
+            try:
+                weight = float(q[2:]) if q.startswith("q=") else 1.0
+            except ValueError:
+                weight = 1.0
+            return weight > 0
+    return False
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A pre-serialized JSON body, its gzip encoding and strong ETag."""
+
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def build(cls, payload, etag: str) -> "CachedBody":
+        body = _dumps(payload)
+        return cls(body=body, gzipped=gzip.compress(body, mtime=0), etag=etag)
+
+    @property
+    def gzip_etag(self) -> str:
+        # Strong validators are per representation, so the gzip body gets its own
+        return self.etag[:-1] + '-gzip"'
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """
+        Answer a request with this body: 304 if the client's copy is current.
+
+        Args:
+            request: Incoming request (If-None-Match and Accept-Encoding are used)
+            cache_control: Cache-Control header value
+
+        Returns:
+            304, gzip-encoded or identity JSON response
+        """
+        headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+        headers["ETag"] = self.gzip_etag if use_gzip else self.etag
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Weak comparison, as RFC 9110 specifies for If-None-Match
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or self.etag in tags or self.gzip_etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzipped, media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class ProtocolCatalog:
+    """
+    Pre-serialized protocol index with listing pages and keyword search.
+
+    Protocol ids are positions in the protocol store. Detail bodies are
+    built up front. List pages and search results are built on first
+    use and kept in a bounded LRU cache. The store hash is part of every
+    ETag, so cached copies become invalid whenever the protocols change.
+    """
+
+    def __init__(self, protocols: List[dict], cache_size: int = 512):
+        """
+        Build the catalog.
+
+        Args:
+            protocols: Parsed STCC protocols (e.g. the agent's protocols)
+            cache_size: List pages and search results kept serialized
+        """
+        self.store_hash = hashlib.sha256(
+            json.dumps(protocols, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self.cache_size = cache_size
+        self._summaries = [self._summary(i, p) for i, p in enumerate(protocols)]
+        self._details = [
+            CachedBody.build({"id": i, **p}, self._etag(f"p{i}")) for i, p in enumerate(protocols)
+        ]
+        self._search_fields = [
+            (
+                p["protocol_name"].lower(),
+                p.get("category", "").lower(),
+                " ".join(
+                    [*p.get("red_flags", []), *p.get("key_questions", [])]
+                    + [c for s in p.get("sections", []) for c in s.get("conditions", [])]
+                ).lower(),
+            )
+            for p in protocols
+        ]
+        self._cache: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._details)
+
+    def _etag(self, key: str) -> str:
+        return f'"{self.store_hash}-{key}"'
+
+    @staticmethod
+    def _summary(index: int, protocol: dict) -> Dict:
+        return {
+            "id": index,
+            "protocol_name": protocol["protocol_name"],
+            "category": protocol.get("category"),
+            "urgency_levels": [s["urgency_level"] for s in protocol.get("sections", [])],
+            "red_flags": len(protocol.get("red_flags", [])),
+        }
+
+    def _cached(self, key: str, build) -> CachedBody:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        cached = CachedBody.build(build(), self._etag(key))
+        with self._lock:
+            self._cache[key] = cached
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return cached
+
+    def get(self, protocol_id: int) -> Optional[CachedBody]:
+        """Full protocol by id, or None if unknown."""
+        if 0 <= protocol_id < len(self._details):
+            return self._details[protocol_id]
+        return None
+
+    def page(self, offset: int = 0, limit: int = 50) -> CachedBody:
+        """Protocol summaries in store order."""
+        return self._cached(
+            f"list-{offset}-{limit}",
+            lambda: {
+                "total": len(self._summaries),
+                "offset": offset,
+                "limit": limit,
+                "items": self._summaries[offset:offset + limit],
+            },
+        )
+
+    def search_ids(self, query: str) -> List[int]:
+        """
+        Ids of protocols matching every query term, best match first.
+
+        A term scores 3 in the protocol name, 2 in the category and 1 in
+        red flags, conditions or key questions.
+        """
+        terms = query.lower().split()
+        scored = []
+        for index, (name, category, body) in enumerate(self._search_fields):
+            score = 0
+            for term in terms:
+                term_score = 3 * (term in name) + 2 * (term in category) + (term in body)
+                if not term_score:
+                    break
+                score += term_score
+            else:
+                if terms:
+                    scored.append((-score, index))
+        return [index for _, index in sorted(scored)]
+
+    def search(self, query: str, offset: int = 0, limit: int = 50) -> CachedBody:
+        """Summaries of protocols matching the query (see search_ids)."""
+        query = " ".join(query.lower().split())
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+
+        def build():
+            ids = self.search_ids(query)
+            return {
+                "query": query,
+                "total": len(ids),
+                "offset": offset,
+                "limit": limit,
+                "items": [self._summaries[i] for i in ids[offset:offset + limit]],
+            }
+
+        return self._cached(f"search-{digest}-{offset}-{limit}", build)
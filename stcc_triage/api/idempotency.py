@@ -0,0 +1,124 @@
+"""
+Idempotency Keys for Triage Requests.
+
+Clients on flaky networks retry POSTs. With an `Idempotency-Key` header
+the first response is stored and replayed byte-for-byte on retries, so
+a retry costs no LM call and cannot return a different answer. A retry
+that arrives while the original is still running waits for it instead
+of starting a second call. Entries live in a bounded in-memory LRU store
+with a TTL (one per API process / event loop).
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+
+# Headers that describe one particular exchange rather than the stored response
+_VOLATILE_HEADERS = {"content-length", "date", "server-timing", "x-trace-id", "x-profile"}
+
+
+@dataclass
+class StoredResponse:
+    """A finished response kept for replay."""
+
+    fingerprint: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class IdempotencyConflictError(Exception):
+    """The key was already used with a different request body."""
+
+
+class IdempotencyStore:
+    """
+    Bounded LRU store of replayable responses with TTL and in-flight tracking.
+
+    Only touched from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Stored responses kept (least recently used are dropped)
+            ttl_seconds: Seconds a stored response can be replayed
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._responses: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.replays = 0
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    @staticmethod
+    def fingerprint(method: str, path: str, body: bytes) -> str:
+        """Hash identifying the request a key was first used with."""
+        digest = hashlib.sha256(f"{method} {path}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _lookup(self, key: str) -> Optional[StoredResponse]:
+        stored = self._responses.get(key)
+        if stored is None:
+            return None
+        if self.ttl_seconds > 0 and time.monotonic() - stored.created_at > self.ttl_seconds:
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return stored
+
+    def begin(self, key: str, fingerprint: str) -> Union[StoredResponse, asyncio.Future, None]:
+        """
+        Claim a key for a new request.
+
+        Returns:
+            The stored response to replay, a future to wait on while the
+            original is in flight, or None if the caller should run the
+            request (and then call finish or abandon)
+
+        Raises:
+            IdempotencyConflictError: If the key was used with another request
+        """
+        stored = self._lookup(key)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                raise IdempotencyConflictError(key)
+            self.replays += 1
+            return stored
+        if key in self._inflight:
+            owner, future = self._inflight[key]
+            if owner != fingerprint:
+                raise IdempotencyConflictError(key)
+            return future
+        self._inflight[key] = (fingerprint, asyncio.get_running_loop().create_future())
+        return None
+
+    def finish(self, key: str, stored: StoredResponse):
+        """Store the original response and wake waiting retries."""
+        self._responses[key] = stored
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
+        _, future = self._inflight.pop(key)
+        if not future.done():
+            future.set_result(stored)
+
+    def abandon(self, key: str):
+        """Release a key without storing (failed or transient response); waiters retry."""
+        entry = self._inflight.pop(key, None)
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(None)
+
+    @staticmethod
+    def replayable_headers(headers) -> Dict[str, str]:
+        """Response headers worth replaying."""
+        return {k: v for k, v in headers.items() if k.lower() not in _VOLATILE_HEADERS}
@@ -0,0 +1,404 @@
+"""
+Persistent Triage Job Queue.
+
+SQLite-backed queue of triage items processed by background worker
+threads. Items are claimed with a lease and tagged with the claiming
+process, so a restarted server picks up where it left off (items held by
+a dead process are re-queued at start-up), and several API worker
+processes on one host can share one queue file. Items that fail with a
+server error are retried a bounded number of times.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    idx INTEGER NOT NULL,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_at REAL,
+    finished_at REAL,
+    result TEXT,
+    owner_pid INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    retry_at REAL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items(status, claimed_at);
+"""
+
+# Columns added after the first release, for queue files created before them
+_ADDED_COLUMNS = {
+    "owner_pid": "INTEGER",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "retry_at": "REAL",
+}
+
+# Item runner: (index, request dict) -> (status_code, NDJSON result line)
+ItemRunner = Callable[[int, Dict], Tuple[int, Dict]]
+
+# Running items older than this are handed out again; item runners must finish sooner
+DEFAULT_LEASE_SECONDS = 300.0
+
+# Matches an item only while it is still held by the claim being finished
+_OWNED = "job_id = ? AND idx = ? AND status = 'running' AND owner_pid = ? AND claimed_at = ?"
+
+
+def _pid_alive(pid: int) -> bool:
+    """True if a process with this pid exists (or liveness cannot be checked)."""
+    if pid == os.getpid() or os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+class JobStore:
+    """Jobs and their items in one SQLite file (safe across threads and processes)."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite file (default: user_data/jobs.sqlite3)
+            lease_seconds: Running items older than this are handed out again
+            max_attempts: Tries per item before a 5xx result is final
+            retry_delay: Seconds before a 5xx item is retried (times the attempts so far)
+        """
+        if path is None:
+            from stcc_triage.core.paths import get_user_data_dir
+            path = get_user_data_dir() / "jobs.sqlite3"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        self._migrate()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections must not cross a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _connect(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _migrate(self):
+        with self._connect(immediate=True) as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(items)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE items ADD COLUMN {name} {definition}")
+
+    def submit(self, requests: List[Dict]) -> str:
+        """
+        Store a job and queue its items.
+
+        Args:
+            requests: Request bodies (TriageRequest dicts)
+
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, created_at, total) VALUES (?, ?, ?)",
+                (job_id, time.time(), len(requests)),
+            )
+            conn.executemany(
+                "INSERT INTO items (job_id, idx, request) VALUES (?, ?, ?)",
+                [(job_id, i, json.dumps(r, ensure_ascii=False)) for i, r in enumerate(requests)],
+            )
+        return job_id
+
+    def claim(self) -> Optional[Tuple[str, int, Dict, float]]:
+        """
+        Take the oldest pending item (or one whose lease expired).
+
+        Items waiting to be retried are skipped until their retry time.
+
+        Returns:
+            (job_id, index, request, claimed_at) or None when the queue is
+            empty; claimed_at identifies the claim when finishing the item
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                """
+                SELECT items.job_id, items.idx, items.request FROM items
+                JOIN jobs ON jobs.id = items.job_id
+                WHERE (items.status = 'pending' AND COALESCE(items.retry_at, 0) <= ?)
+                   OR (items.status = 'running' AND items.claimed_at < ?)
+                ORDER BY jobs.created_at, items.idx
+                LIMIT 1
+                """,
+                (now, now - self.lease_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE items SET status = 'running', claimed_at = ?, owner_pid = ?,
+                    attempts = attempts + 1
+                WHERE job_id = ? AND idx = ?
+                """,
+                (now, os.getpid(), row["job_id"], row["idx"]),
+            )
+        return row["job_id"], row["idx"], json.loads(row["request"]), now
+
+    def finish(
+        self, job_id: str, index: int, status_code: int, line: Dict, claimed_at: float
+    ) -> bool:
+        """
+        Store an item's result line, or queue a retry after a server error.
+
+        A finish from a claim that no longer holds the item (its lease
+        expired and another worker took it over) is ignored.
+
+        Args:
+            job_id: Job the item belongs to
+            index: Item index
+            status_code: HTTP-style status of the item's result
+            line: NDJSON result line
+            claimed_at: Claim time returned by claim()
+
+        Returns:
+            True if the result is final, False if the item will be retried
+            or is no longer held by this claim
+        """
+        now = time.time()
+        owned = (job_id, index, os.getpid(), claimed_at)
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(f"SELECT attempts FROM items WHERE {_OWNED}", owned).fetchone()
+            if row is None:
+                return False
+            attempts = row["attempts"]
+            if status_code >= 500 and attempts < self.max_attempts:
+                conn.execute(
+                    f"""
+                    UPDATE items SET status = 'pending', claimed_at = NULL, owner_pid = NULL,
+                        retry_at = ?
+                    WHERE {_OWNED}
+                    """,
+                    (now + self.retry_delay * attempts, *owned),
+                )
+                return False
+            status = "done" if status_code == 200 else "failed"
+            conn.execute(
+                f"UPDATE items SET status = ?, finished_at = ?, result = ? WHERE {_OWNED}",
+                (status, now, json.dumps(line, ensure_ascii=False), *owned),
+            )
+        return True
+
+    def release_stale(self) -> int:
+        """
+        Re-queue running items whose claiming process has exited.
+
+        Only processes on this host can be checked, so items claimed before
+        owners were recorded (or where liveness cannot be checked) are left
+        to the lease.
+
+        Returns:
+            Number of items re-queued
+        """
+        with self._connect(immediate=True) as conn:
+            owners = [
+                row["owner_pid"]
+                for row in conn.execute(
+                    "SELECT DISTINCT owner_pid FROM items "
+                    "WHERE status = 'running' AND owner_pid IS NOT NULL"
+                )
+            ]
+            dead = [pid for pid in owners if not _pid_alive(pid)]
+            released = 0
+            for pid in dead:
+                released += conn.execute(
+                    """
+                    UPDATE items SET status = 'pending', claimed_at = NULL, owner_pid = NULL
+                    WHERE status = 'running' AND owner_pid = ?
+                    """,
+                    (pid,),
+                ).rowcount
+        return released
+
+    def progress(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job's progress.
+
+        Returns:
+            Dict with status and item counts, or None if the job is unknown
+        """
+        with self._connect() as conn:
+            job = conn.execute(
+                "SELECT created_at, total FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(
+                conn.execute(
+                    "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status",
+                    (job_id,),
+                ).fetchall()
+            )
+            finished_at = conn.execute(
+                "SELECT MAX(finished_at) FROM items WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+
+        done, failed = counts.get("done", 0), counts.get("failed", 0)
+        running, pending = counts.get("running", 0), counts.get("pending", 0)
+        if done + failed == job["total"]:
+            status = "completed"
+        elif done + failed + running:
+            status = "running"
+        else:
+            status = "queued"
+        return {
+            "id": job_id,
+            "status": status,
+            "total": job["total"],
+            "done": done,
+            "failed": failed,
+            "running": running,
+            "pending": pending,
+            "created_at": job["created_at"],
+            "finished_at": finished_at if status == "completed" else None,
+        }
+
+    def results(self, job_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Yield finished result lines in index order, reading in batches."""
+        last = -1
+        while True:
+            rows = self._connection().execute(
+                """
+                SELECT idx, result FROM items
+                WHERE job_id = ? AND idx > ? AND result IS NOT NULL
+                ORDER BY idx LIMIT ?
+                """,
+                (job_id, last, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row["result"])
+            last = rows[-1]["idx"]
+
+
+class JobQueue:
+    """Background worker threads draining a JobStore."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: ItemRunner,
+        workers: int = 2,
+        ready: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            store: Persistent job store
+            runner: Triage function for one item
+            workers: Worker threads
+            ready: Items are only claimed while this returns True (e.g. warm-up done)
+            poll_interval: Seconds between polls when the queue is empty
+        """
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.ready = ready or (lambda: True)
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, requests: List[Dict]) -> str:
+        """Queue a job and wake the workers."""
+        job_id = self.store.submit(requests)
+        self._wake.set()
+        return job_id
+
+    def run_once(self) -> bool:
+        """
+        Process one queued item in the calling thread.
+
+        Returns:
+            False if there was nothing to do
+        """
+        claimed = self.store.claim()
+        if claimed is None:
+            return False
+        job_id, index, request, claimed_at = claimed
+        try:
+            status_code, line = self.runner(index, request)
+        except Exception as e:
+            status_code, line = 500, {"index": index, "status_code": 500, "error": str(e)}
+        self.store.finish(job_id, index, status_code, line, claimed_at)
+        return True
+
+    def _work(self):
+        while not self._stop.is_set():
+            if self.ready() and self.run_once():
+                continue
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start the worker threads (resuming any unfinished jobs)."""
+        self.store.release_stale()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"stcc-job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Ask workers to stop after their current item."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
@@ -24,6 +24,27 @@ class TriageRequest(BaseModel):
         default=None,
         description="Specialized nurse role (e.g., 'wound_care_nurse', 'ob_nurse')"
     )
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        gt=0,
+        le=600000,
+        description=(
+            "Milliseconds the caller can wait; the richest strategy that fits "
+            "is used (see mode in the response)"
+        )
+    )
+
+
+class TokenUsage(BaseModel):
+    """LM token usage and estimated cost for one request."""
+
+    calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    total_tokens: int = 0
+    cost_usd: float = 0.0
 
 
 class TriageResponse(BaseModel):
@@ -41,6 +62,86 @@ class TriageResponse(BaseModel):
         default=None,
         description="Chain-of-thought reasoning steps"
     )
+    degraded: bool = Field(
+        default=False,
+        description="True if the LM was unavailable and rule-based triage was used"
+    )
+    mode: str = Field(
+        default="full",
+        description=(
+            "How the decision was made: full (ChainOfThought), fast (direct "
+            "answer under load) or rules (rule-based fallback)"
+        )
+    )
+    usage: Optional[TokenUsage] = Field(
+        default=None,
+        description="LM tokens and estimated cost spent on this request"
+    )
+
+
+class BatchTriageRequest(BaseModel):
+    """Request model for the batch triage endpoint."""
+
+    requests: List[TriageRequest] = Field(
+        ...,
+        min_length=1,
+        description="Triage requests; nurse_role selects a specialized nurse per item"
+    )
+
+
+class BatchTriageItem(BaseModel):
+    """One NDJSON line of a batch triage response."""
+
+    index: int = Field(..., description="Position of the request in the batch")
+    status_code: int = Field(default=200, description="HTTP-style status for this item")
+    result: Optional[TriageResponse] = None
+    error: Optional[str] = None
+
+
+class SessionCreateRequest(BaseModel):
+    """Request model for starting a conversation session."""
+
+    nurse_role: Optional[str] = Field(
+        default=None,
+        description="Specialized nurse role (e.g., 'wound_care_nurse', 'ob_nurse')"
+    )
+    max_rounds: int = Field(
+        default=3,
+        ge=0,
+        le=10,
+        description="Maximum follow-up question rounds before forcing triage"
+    )
+
+
+class SessionMessageRequest(BaseModel):
+    """Request model for one patient message in a session."""
+
+    message: str = Field(
+        ...,
+        min_length=1,
+        description="Latest patient message (earlier messages are kept by the server)",
+        json_schema_extra={"example": "It started two days ago and is getting worse"},
+    )
+
+
+class SessionResponse(BaseModel):
+    """Conversation session state."""
+
+    session_id: str
+    nurse_role: Optional[str] = None
+    max_rounds: int = 3
+    question_rounds: int = 0
+    messages: int = Field(default=0, description="Patient messages kept in the session")
+
+
+class SessionReply(BaseModel):
+    """Reply to one patient message: follow-up questions or a triage decision."""
+
+    session_id: str
+    action: str = Field(..., description="'ask' for follow-up questions or 'triage'")
+    questions: Optional[str] = None
+    result: Optional[TriageResponse] = None
+    question_rounds: int = 0
 
 
 class HealthResponse(BaseModel):
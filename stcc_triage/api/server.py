@@ -0,0 +1,131 @@
+"""
+Pre-Fork Multi-Worker Server.
+
+Loads protocols, the LM client and compiled nurses once in a master
+process, freezes the garbage collector so the loaded objects stay in
+shared copy-on-write pages, then forks uvicorn workers that accept on
+one shared socket. A dead worker is replaced; SIGINT/SIGTERM stop all.
+"""
+
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Dict
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_app():
+    """
+    Warm up the API in this process before forking.
+
+    Raises:
+        RuntimeError: If a warm-up step fails
+    """
+    from stcc_triage.api.app import warmup, warmup_steps
+
+    warmup.run(warmup_steps())
+    if not warmup.ready:
+        raise RuntimeError(f"Preload failed: {warmup.error}")
+
+    # Objects that survive a collection now are never scanned again, so
+    # workers do not touch (and copy) the pages holding protocol data
+    gc.collect()
+    gc.freeze()
+
+
+def _run_worker(sock: socket.socket, host: str, port: int):
+    import uvicorn
+
+    from stcc_triage.api.app import app
+
+    random.seed()
+    config = uvicorn.Config(app, host=host, port=port, log_level="info")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def serve_workers(host: str = "0.0.0.0", port: int = 8000, workers: int = 2, preload: bool = True):
+    """
+    Serve the API from pre-forked worker processes.
+
+    Args:
+        host: Host to bind to
+        port: Port to bind to
+        workers: Number of worker processes
+        preload: Warm up once in the master so workers share its memory
+
+    Raises:
+        RuntimeError: If the platform cannot fork or preload fails
+    """
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork workers need os.fork (not available on this platform)")
+
+    if preload:
+        preload_app()
+    sock = _bind_socket(host, port)
+    print(f"Master {os.getpid()} serving http://{host}:{port} with {workers} workers")
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(sock, host, port)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        exited = children.pop(pid, None)
+        if exited is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+        time.sleep(1.0)  # Avoid a tight crash loop
+        spawn(exited)
+
+    sock.close()
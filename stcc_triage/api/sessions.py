@@ -0,0 +1,165 @@
+"""
+Server-Side Conversation Sessions.
+
+Keeps each patient's conversation (messages, follow-up rounds and the
+info categories still missing) on the server, so clients send only the
+new message each turn. Sessions live in a bounded in-memory LRU store
+with idle TTL eviction; with a spill file, evicted and shutdown-time
+sessions are written to SQLite and loaded back on their next message.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass
+class Session:
+    """One patient conversation."""
+
+    id: str
+    nurse_role: Optional[str] = None
+    max_rounds: int = 3
+    history: List[str] = field(default_factory=list)
+    question_rounds: int = 0
+    missing_info: Optional[List[str]] = None
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.time)
+    busy: bool = False
+
+    def add_message(self, message: str, max_messages: int):
+        """Append a patient message, keeping only the latest max_messages."""
+        self.history.append(message)
+        if max_messages > 0 and len(self.history) > max_messages:
+            del self.history[: len(self.history) - max_messages]
+
+
+class SessionStore:
+    """Bounded LRU session store with idle TTL and optional SQLite spill."""
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800.0,
+        spill_path: Optional[Path] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Sessions kept in memory; the least recently used
+                is spilled (or dropped without a spill file) beyond this
+            ttl_seconds: Idle time after which a session expires
+            spill_path: SQLite file for evicted sessions (None disables spill)
+        """
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill = None
+        if spill_path is not None:
+            spill_path = Path(spill_path)
+            spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+            self._spill.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, last_active REAL NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expired(self, session: Session, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - session.last_active > self.ttl_seconds
+
+    def _write_spill(self, sessions: List[Session]):
+        if self._spill is None or not sessions:
+            return
+        rows = []
+        for session in sessions:
+            data = asdict(session)
+            data["busy"] = False
+            rows.append((session.id, session.last_active, json.dumps(data, ensure_ascii=False)))
+        self._spill.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", rows)
+
+    def _take_spill(self, session_id: str) -> Optional[Session]:
+        if self._spill is None:
+            return None
+        row = self._spill.execute(
+            "SELECT data FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._spill.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return Session(**json.loads(row[0]))
+
+    def _evict(self, now: float):
+        # Oldest first: stop at the first live session once under capacity
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if self._expired(session, now):
+                self._sessions.popitem(last=False)
+            elif len(self._sessions) > self.max_sessions and not session.busy:
+                self._sessions.popitem(last=False)
+                self._write_spill([session])
+            else:
+                break
+
+    def create(self, nurse_role: Optional[str] = None, max_rounds: int = 3) -> Session:
+        """Start a new session."""
+        session = Session(id=uuid.uuid4().hex, nurse_role=nurse_role, max_rounds=max_rounds)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._evict(session.created_at)
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """
+        Get a live session and mark it recently used.
+
+        Returns:
+            Session, or None if unknown or expired
+        """
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._take_spill(session_id)
+                if session is None:
+                    return None
+                self._sessions[session_id] = session
+            if self._expired(session, now):
+                del self._sessions[session_id]
+                return None
+            session.last_active = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """End a session. Returns False if it did not exist."""
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+            if self._spill is not None:
+                found = self._spill.execute(
+                    "DELETE FROM sessions WHERE id = ?", (session_id,)
+                ).rowcount > 0 or found
+        return found
+
+    def spill_all(self):
+        """Write every live in-memory session to the spill file (e.g. at shutdown)."""
+        if self._spill is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._write_spill([s for s in self._sessions.values() if not self._expired(s, now)])
+            if self.ttl_seconds > 0:
+                self._spill.execute(
+                    "DELETE FROM sessions WHERE last_active < ?", (now - self.ttl_seconds,)
+                )
@@ -0,0 +1,93 @@
+"""
+API Startup Warm-Up.
+
+Runs the expensive one-time setup (protocols, LM client, compiled
+nurses, retrieval) in the background at boot and tracks readiness for
+the /readyz probe.
+"""
+
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+
+WarmupStep = Tuple[str, Callable[[], object]]
+
+
+class Warmup:
+    """Readiness state of a background warm-up run."""
+
+    def __init__(self) -> None:
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.steps: Dict[str, float] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def run(self, steps: List[WarmupStep]):
+        """
+        Run warm-up steps in order, stopping at the first failure.
+
+        Args:
+            steps: (name, callable) pairs
+        """
+        with self._lock:
+            self.status = "warming"
+            self.error = None
+            self.steps = {}
+            self.started = time.perf_counter()
+            self.finished = None
+
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                traceback.print_exc()
+                with self._lock:
+                    self.status = "failed"
+                    self.error = f"{name}: {type(e).__name__}: {e}"
+                    self.finished = time.perf_counter()
+                print(f"API warm-up failed at step '{name}': {e}")
+                return
+            with self._lock:
+                self.steps[name] = time.perf_counter() - start
+
+        with self._lock:
+            self.status = "ready"
+            self.finished = time.perf_counter()
+        print(f"API warm-up complete in {self.finished - self.started:.2f}s")
+
+    def start(self, steps: List[WarmupStep]) -> threading.Thread:
+        """Run warm-up in a daemon thread so the server can answer /livez meanwhile."""
+        with self._lock:
+            self.status = "warming"
+        self._thread = threading.Thread(
+            target=self.run, args=(steps,), name="stcc-api-warmup", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def skip(self):
+        """Mark the service ready without warming (lazy initialization)."""
+        with self._lock:
+            self.status = "ready"
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            elapsed = None
+            if self.started is not None:
+                end = self.finished if self.finished is not None else time.perf_counter()
+                elapsed = round(end - self.started, 3)
+            return {
+                "status": self.status,
+                "error": self.error,
+                "elapsed_seconds": elapsed,
+                "steps": {name: round(seconds, 3) for name, seconds in self.steps.items()},
+            }
@@ -0,0 +1,32 @@
+"""Offline file-to-file batch triage with checkpoint/resume."""
+
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .records import CallRecord, detect_format, read_records
+    from .runner import BatchCheckpoint, BatchRunner, format_stats, read_results
+
+__all__ = [
+    "CallRecord",
+    "detect_format",
+    "read_records",
+    "BatchCheckpoint",
+    "BatchRunner",
+    "format_stats",
+    "read_results",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "CallRecord": ".records",
+        "detect_format": ".records",
+        "read_records": ".records",
+        "BatchCheckpoint": ".runner",
+        "BatchRunner": ".runner",
+        "format_stats": ".runner",
+        "read_results": ".runner",
+    },
+)
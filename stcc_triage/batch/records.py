@@ -0,0 +1,120 @@
+"""
+Streaming Call-Record Readers.
+
+Reads CSV or JSONL call records one at a time, so a batch run holds only
+the records in flight no matter how large the input file is. Record
+indexes are positions in the file and stay stable across runs, which is
+what checkpoints refer to.
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class CallRecord:
+    """One call to triage (error is set if the record cannot be triaged)."""
+
+    index: int
+    id: str
+    symptoms: str = ""
+    conversation_history: Optional[List[str]] = None
+    error: Optional[str] = None
+
+
+def detect_format(path: Path) -> str:
+    """
+    Guess the record format from a file extension.
+
+    Raises:
+        ValueError: If the extension is not .csv, .jsonl or .ndjson
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path}; pass --format csv or jsonl")
+
+
+def _history(value) -> Optional[List[str]]:
+    # JSONL carries a list; CSV carries a JSON array or a single message
+    if value is None or value == "":
+        return None
+    if isinstance(value, list):
+        return [str(message) for message in value]
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            return [str(message) for message in json.loads(text)]
+        except json.JSONDecodeError:
+            pass
+    return [text]
+
+
+def _record(index: int, row: Dict, fields: Dict[str, str]) -> CallRecord:
+    record_id = row.get(fields["id"])
+    record = CallRecord(index=index, id=str(index) if record_id in (None, "") else str(record_id))
+    symptoms = row.get(fields["symptoms"])
+    if not isinstance(symptoms, str) or not symptoms.strip():
+        record.error = f"Missing {fields['symptoms']!r}"
+        return record
+    record.symptoms = symptoms
+    record.conversation_history = _history(row.get(fields["history"]))
+    return record
+
+
+def read_records(
+    path: Path,
+    fmt: Optional[str] = None,
+    id_field: str = "id",
+    symptoms_field: str = "symptoms",
+    history_field: str = "conversation_history",
+) -> Iterator[CallRecord]:
+    """
+    Stream call records from a CSV (with header) or JSONL file.
+
+    Blank JSONL lines are skipped without taking an index. Malformed
+    records are yielded with `error` set, so they are reported in the
+    results instead of stopping the run.
+
+    Args:
+        path: Input file
+        fmt: "csv" or "jsonl" (default: from the file extension)
+        id_field: Column/key holding the caller's record id (default: index)
+        symptoms_field: Column/key holding the patient's symptoms
+        history_field: Column/key holding earlier messages
+
+    Yields:
+        CallRecord objects in file order
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown record format: {fmt}")
+    fields = {"id": id_field, "symptoms": symptoms_field, "history": history_field}
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                yield _record(index, row, fields)
+            return
+
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield CallRecord(index=index, id=str(index), error=f"Invalid JSON: {e}")
+            else:
+                if isinstance(row, dict):
+                    yield _record(index, row, fields)
+                else:
+                    yield CallRecord(index=index, id=str(index), error="Record is not an object")
+            index += 1
@@ -0,0 +1,296 @@
+"""
+Checkpointed File-to-File Batch Triage.
+
+Streams call records through an agent in the batch LM lane at a fixed
+concurrency and appends one JSONL result per record as it finishes.
+Progress is checkpointed next to the output, so an interrupted run
+resumes where it stopped. Memory is bounded by the in-flight window,
+not by the size of the input.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from stcc_triage.batch.records import CallRecord
+from stcc_triage.lm.scheduler import Lane, lm_lane
+from stcc_triage.lm.usage import get_usage_ledger, track_usage
+
+# Records allowed to finish ahead of the oldest unfinished one, per worker
+_REORDER_WINDOW_PER_WORKER = 64
+
+
+def _new_stats() -> Dict[str, float]:
+    return {
+        "records": 0,
+        "ok": 0,
+        "errors": 0,
+        "degraded": 0,
+        "cache_hits": 0,
+        "latency_ms_total": 0.0,
+        "latency_ms_max": 0.0,
+    }
+
+
+@dataclass
+class BatchCheckpoint:
+    """
+    Progress of one batch run.
+
+    Every record below `watermark` and every index in `done` has its
+    result in the first `output_bytes` bytes of the output file; anything
+    after that offset is discarded on resume and triaged again.
+    """
+
+    input: str
+    input_size: int
+    role: str
+    watermark: int = 0
+    done: Set[int] = field(default_factory=set)
+    output_bytes: int = 0
+    complete: bool = False
+    stats: Dict[str, float] = field(default_factory=_new_stats)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BatchCheckpoint"]:
+        """Read a checkpoint, or None if there is none."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        data["done"] = set(data.get("done", []))
+        return cls(**data)
+
+    def save(self, path: Path):
+        """Write the checkpoint atomically."""
+        data = asdict(self)
+        data["done"] = sorted(self.done)
+        tmp_path = Path(path).with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    def mark(self, index: int):
+        """Record a written result and advance the watermark past finished records."""
+        self.done.add(index)
+        while self.watermark in self.done:
+            self.done.discard(self.watermark)
+            self.watermark += 1
+
+    def matches(self, input_path: Path, role: str) -> bool:
+        """True if the checkpoint belongs to a run over this input and role."""
+        input_path = Path(input_path)
+        return (
+            self.input == str(input_path.resolve())
+            and self.input_size == input_path.stat().st_size
+            and self.role == role
+        )
+
+
+class BatchRunner:
+    """Triages a stream of call records into a JSONL file with checkpoints."""
+
+    def __init__(
+        self,
+        agent,
+        role: str = "general",
+        concurrency: int = 8,
+        checkpoint_every: int = 100,
+        progress: Optional[Callable[[Dict[str, float]], None]] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            agent: STCCTriageAgent (or a compiled nurse) to triage with
+            role: Nurse role name, recorded in results' usage and the checkpoint
+            concurrency: Records triaged at once
+            checkpoint_every: Results written between checkpoints
+            progress: Called with the run's stats after every periodic checkpoint
+        """
+        self.agent = agent
+        self.role = role
+        self.concurrency = max(1, concurrency)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.progress = progress
+
+    def triage_record(self, record: CallRecord) -> Dict:
+        """
+        Triage one record in the batch LM lane.
+
+        Returns:
+            Result line: index, id, status, latency_ms, cache_hit and either
+            result (TriageResponse fields plus usage) or error
+        """
+        line = {"index": record.index, "id": record.id}
+        if record.error:
+            line.update(status="error", error=record.error, latency_ms=0.0, cache_hit=False)
+            return line
+
+        start = time.perf_counter()
+        with lm_lane(Lane.BATCH), track_usage() as usage:
+            try:
+                result = self.agent.triage(
+                    symptoms=record.symptoms,
+                    conversation_history=record.conversation_history,
+                )
+            except Exception as e:
+                result, error = None, str(e)
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        snapshot = usage.snapshot()
+        get_usage_ledger().record("batch", self.role, snapshot)
+        # A record is a cache hit when no LM call went to the provider
+        cache_hit = 0 < snapshot["calls"] == snapshot["cache_hits"]
+        line.update(latency_ms=latency_ms, cache_hit=cache_hit)
+        if result is None:
+            line.update(status="error", error=error)
+            return line
+
+        degraded = bool(getattr(result, "degraded", False))
+        # ChainOfThought names the field `reasoning` (older DSPy used `rationale`)
+        rationale = getattr(result, "reasoning", None) or getattr(result, "rationale", None)
+        line.update(
+            status="ok",
+            result={
+                "triage_level": result.triage_level,
+                "clinical_justification": result.clinical_justification,
+                "rationale": rationale,
+                "degraded": degraded,
+                "mode": "rules" if degraded else getattr(result, "quality_mode", "full"),
+                "usage": snapshot,
+            },
+        )
+        return line
+
+    def run(
+        self,
+        records: Iterable[CallRecord],
+        input_path: Path,
+        output_path: Path,
+        checkpoint_path: Optional[Path] = None,
+        restart: bool = False,
+    ) -> BatchCheckpoint:
+        """
+        Triage every record not already done, appending results to the output.
+
+        Args:
+            records: Records read from input_path (e.g. read_records())
+            input_path: Input file (identifies the run in the checkpoint)
+            output_path: JSONL results file
+            checkpoint_path: Checkpoint file (default: <output>.checkpoint.json)
+            restart: Ignore an existing checkpoint and overwrite the output
+
+        Returns:
+            The final checkpoint (complete, with cumulative stats)
+
+        Raises:
+            ValueError: If the output or checkpoint belongs to another run
+        """
+        output_path = Path(output_path)
+        checkpoint_path = Path(checkpoint_path or f"{output_path}.checkpoint.json")
+        checkpoint = None if restart else BatchCheckpoint.load(checkpoint_path)
+
+        if checkpoint is not None and not checkpoint.matches(input_path, self.role):
+            raise ValueError(
+                f"{checkpoint_path} belongs to another input or role; use --restart to start over"
+            )
+        if checkpoint is None:
+            if not restart and output_path.exists() and output_path.stat().st_size:
+                raise ValueError(f"{output_path} exists; use --restart to overwrite it")
+            checkpoint = BatchCheckpoint(
+                input=str(Path(input_path).resolve()),
+                input_size=Path(input_path).stat().st_size,
+                role=self.role,
+            )
+        if checkpoint.complete:
+            return checkpoint
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        window = self.concurrency * _REORDER_WINDOW_PER_WORKER
+        pending: Set[Future] = set()
+        unsaved = 0
+
+        with open(output_path, "ab") as out:
+            # Drop results written after the last checkpoint; they are redone
+            out.truncate(checkpoint.output_bytes)
+            out.seek(checkpoint.output_bytes)
+
+            def save():
+                nonlocal unsaved
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.output_bytes = out.tell()
+                checkpoint.save(checkpoint_path)
+                unsaved = 0
+
+            def drain(futures: Iterable[Future]):
+                nonlocal unsaved
+                for future in futures:
+                    pending.discard(future)
+                    line = future.result()
+                    out.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+                    checkpoint.mark(line["index"])
+                    self._count(checkpoint.stats, line)
+                    unsaved += 1
+                    if unsaved >= self.checkpoint_every:
+                        save()
+                        if self.progress is not None:
+                            self.progress(checkpoint.stats)
+
+            executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="stcc-batch")
+            try:
+                for record in records:
+                    if checkpoint.is_done(record.index):
+                        continue
+                    # Bound memory: in-flight work and results held for reordering
+                    while len(pending) >= 2 * self.concurrency or (
+                        pending and record.index - checkpoint.watermark >= window
+                    ):
+                        drain(wait(pending, return_when=FIRST_COMPLETED).done)
+                    pending.add(executor.submit(self.triage_record, record))
+                while pending:
+                    drain(wait(pending, return_when=FIRST_COMPLETED).done)
+                checkpoint.complete = True
+            finally:
+                executor.shutdown(wait=checkpoint.complete, cancel_futures=True)
+                save()
+                get_usage_ledger().flush()
+        return checkpoint
+
+    @staticmethod
+    def _count(stats: Dict[str, float], line: Dict):
+        stats["records"] += 1
+        stats["ok" if line["status"] == "ok" else "errors"] += 1
+        stats["degraded"] += int(bool(line.get("result", {}).get("degraded")))
+        stats["cache_hits"] += int(line["cache_hit"])
+        stats["latency_ms_total"] = round(stats["latency_ms_total"] + line["latency_ms"], 1)
+        stats["latency_ms_max"] = max(stats["latency_ms_max"], line["latency_ms"])
+
+
+def format_stats(stats: Dict[str, float]) -> str:
+    """One-line summary of a run's stats."""
+    records = int(stats["records"])
+    mean = stats["latency_ms_total"] / records if records else 0.0
+    return (
+        f"{records} records: {int(stats['ok'])} ok, {int(stats['errors'])} errors, "
+        f"{int(stats['degraded'])} degraded, {int(stats['cache_hits'])} cache hits; "
+        f"latency mean {mean:.0f}ms, max {stats['latency_ms_max']:.0f}ms"
+    )
+
+
+def read_results(path: Path) -> Iterable[Dict]:
+    """Stream result lines back from a batch output file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
@@ -0,0 +1,58 @@
+"""
+Benchmarks: load generation against the API, CPU micro-benchmarks,
+profiling targets and import-time budgets.
+"""
+
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .imports import ImportBudget, format_import_results, run_import_budgets
+    from .load import (
+        LoadCase,
+        LoadGenerator,
+        bundled_cases,
+        format_summary,
+        load_jsonl_cases,
+        parse_server_timing,
+    )
+    from .micro import compare, list_benchmarks, run_benchmarks
+    from .profile import list_targets, profile_target
+
+__all__ = [
+    "LoadCase",
+    "LoadGenerator",
+    "bundled_cases",
+    "format_summary",
+    "load_jsonl_cases",
+    "parse_server_timing",
+    "compare",
+    "list_benchmarks",
+    "run_benchmarks",
+    "list_targets",
+    "profile_target",
+    "ImportBudget",
+    "format_import_results",
+    "run_import_budgets",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "LoadCase": ".load",
+        "LoadGenerator": ".load",
+        "bundled_cases": ".load",
+        "format_summary": ".load",
+        "load_jsonl_cases": ".load",
+        "parse_server_timing": ".load",
+        "compare": ".micro",
+        "list_benchmarks": ".micro",
+        "run_benchmarks": ".micro",
+        "list_targets": ".profile",
+        "profile_target": ".profile",
+        "ImportBudget": ".imports",
+        "format_import_results": ".imports",
+        "run_import_budgets": ".imports",
+    },
+)
@@ -0,0 +1,131 @@
+"""
+Import-Time Budgets.
+
+Times `import <module>` in a fresh interpreter for the package, every
+stcc-* entry point and the heavy runtime modules, and checks each
+against a budget. Entry points are also checked not to load DSPy, so a
+stray top-level import that brings back seconds of startup fails
+`stcc-bench imports` instead of going unnoticed.
+"""
+
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from stcc_triage.bench.micro import _format_seconds
+
+# Printed by the child interpreter: import seconds and whether DSPy was loaded
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - start, 'dspy' in sys.modules)\n"
+)
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    """Allowed import time for one module."""
+
+    module: str
+    seconds: float
+    allow_dspy: bool = False
+
+
+# Entry-point budgets leave headroom over a cold laptop run; the DSPy-backed
+# modules are bounded loosely, mainly to catch large regressions
+DEFAULT_BUDGETS: List[ImportBudget] = [
+    ImportBudget("stcc_triage", 0.05),
+    ImportBudget("stcc_triage.cli.api", 0.05),
+    ImportBudget("stcc_triage.cli.batch", 0.05),
+    ImportBudget("stcc_triage.cli.bench", 0.05),
+    ImportBudget("stcc_triage.cli.optimize", 0.3),
+    ImportBudget("stcc_triage.cli.parse", 0.05),
+    ImportBudget("stcc_triage.cli.stub", 0.05),
+    ImportBudget("stcc_triage.lm.stub", 0.1),
+    ImportBudget("stcc_triage.protocols.parser", 0.3),
+    ImportBudget("stcc_triage.core.agent", 2.0, allow_dspy=True),
+    ImportBudget("stcc_triage.api.app", 3.0, allow_dspy=True),
+]
+
+
+@dataclass
+class ImportResult:
+    """Best-of-N import time of one module and its budget check."""
+
+    module: str
+    seconds: float
+    budget: float
+    dspy_loaded: bool
+    allow_dspy: bool
+
+    @property
+    def ok(self) -> bool:
+        return self.seconds <= self.budget and (self.allow_dspy or not self.dspy_loaded)
+
+
+def time_import(module: str, repeats: int = 3) -> ImportResult:
+    """
+    Time importing a module in fresh interpreters.
+
+    Args:
+        module: Dotted module name
+        repeats: Interpreters to start; the fastest run is reported
+
+    Returns:
+        Result with no budget (budget=inf, DSPy allowed)
+
+    Raises:
+        RuntimeError: If the module fails to import
+    """
+    best, dspy_loaded = float("inf"), False
+    for _ in range(max(1, repeats)):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+            raise RuntimeError(f"Importing {module} failed: {last[0]}")
+        seconds, loaded = proc.stdout.split()[-2:]
+        best = min(best, float(seconds))
+        dspy_loaded = loaded == "True"
+    return ImportResult(module, best, float("inf"), dspy_loaded, allow_dspy=True)
+
+
+def run_import_budgets(
+    budgets: Optional[Sequence[ImportBudget]] = None, repeats: int = 3
+) -> List[ImportResult]:
+    """
+    Time every budgeted module.
+
+    Args:
+        budgets: Modules and budgets (default: DEFAULT_BUDGETS)
+        repeats: Interpreters started per module
+
+    Returns:
+        One result per budget, in order
+    """
+    results = []
+    for budget in DEFAULT_BUDGETS if budgets is None else budgets:
+        result = time_import(budget.module, repeats=repeats)
+        result.budget = budget.seconds
+        result.allow_dspy = budget.allow_dspy
+        results.append(result)
+    return results
+
+
+def format_import_results(results: List[ImportResult]) -> str:
+    """Render import times against their budgets as a table."""
+    lines = []
+    for result in results:
+        status = "OK" if result.ok else "OVER BUDGET"
+        if result.dspy_loaded and not result.allow_dspy:
+            status = "LOADS DSPY"
+        lines.append(
+            f"{result.module:<36} {_format_seconds(result.seconds):>10} "
+            f"(budget {_format_seconds(result.budget)})  {status}"
+        )
+    return "\n".join(lines)
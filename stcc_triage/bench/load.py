@@ -0,0 +1,414 @@
+"""
+End-to-End Load Generator.
+
+Replays patient cases against a running stcc-api at a fixed concurrency
+(closed loop) or a fixed arrival rate (open loop) and summarizes
+throughput, latency percentiles, errors and per-stage time.
+"""
+
+import json
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ENDPOINTS = {
+    "triage": "/triage",
+    "specialized": "/triage/specialized",
+}
+
+
+@dataclass
+class LoadCase:
+    """One request body replayed by the load generator."""
+
+    symptoms: str
+    nurse_role: Optional[str] = None
+    conversation_history: Optional[List[str]] = None
+
+    def payload(self) -> Dict:
+        body: Dict[str, Any] = {"symptoms": self.symptoms}
+        if self.nurse_role:
+            body["nurse_role"] = self.nurse_role
+        if self.conversation_history:
+            body["conversation_history"] = self.conversation_history
+        return body
+
+
+@dataclass
+class RequestResult:
+    """Outcome of a single request."""
+
+    status: int
+    latency: float
+    queued: float = 0.0
+    degraded: bool = False
+    error: Optional[str] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+
+
+def bundled_cases() -> List[LoadCase]:
+    """
+    Load the bundled training cases, tagged with their nurse role.
+
+    Returns:
+        One LoadCase per bundled PatientCase
+    """
+    from stcc_triage.datasets import cases as case_modules
+    from stcc_triage.nurses.roles import NurseRole
+
+    role_cases = {
+        NurseRole.WOUND_CARE_NURSE: case_modules.WOUND_CARE_CASES,
+        NurseRole.OB_NURSE: case_modules.OB_CASES,
+        NurseRole.PEDIATRIC_NURSE: case_modules.PEDIATRIC_CASES,
+        NurseRole.NEURO_NURSE: case_modules.NEURO_CASES,
+        NurseRole.GI_NURSE: case_modules.GI_CASES,
+        NurseRole.RESPIRATORY_NURSE: case_modules.RESPIRATORY_CASES,
+        NurseRole.MENTAL_HEALTH_NURSE: case_modules.MENTAL_HEALTH_CASES,
+        NurseRole.CHF_NURSE: case_modules.CHF_CASES,
+        NurseRole.ED_NURSE: case_modules.ED_CASES,
+        NurseRole.PREOP_NURSE: case_modules.PREOP_CASES,
+    }
+    return [
+        LoadCase(symptoms=case.symptoms, nurse_role=role.value)
+        for role, cases in role_cases.items()
+        for case in cases
+    ]
+
+
+def load_jsonl_cases(path: Path) -> List[LoadCase]:
+    """
+    Load request bodies from a JSONL file.
+
+    Each line is a JSON object with "symptoms" and optionally
+    "nurse_role" and "conversation_history".
+
+    Args:
+        path: JSONL file path
+
+    Returns:
+        List of LoadCase objects
+    """
+    cases = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not record.get("symptoms"):
+                raise ValueError(f"{path}:{line_number}: missing 'symptoms'")
+            cases.append(
+                LoadCase(
+                    symptoms=record["symptoms"],
+                    nurse_role=record.get("nurse_role"),
+                    conversation_history=record.get("conversation_history"),
+                )
+            )
+    return cases
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a Server-Timing header into stage durations in seconds.
+
+    Example:
+        "retrieval;dur=3.1, lm;dur=812.4" -> {"retrieval": 0.0031, "lm": 0.8124}
+    """
+    stages = {}
+    for metric in (header or "").split(","):
+        parts = [p.strip() for p in metric.split(";")]
+        if not parts[0]:
+            continue
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    stages[parts[0]] = float(value) / 1000.0
+                except ValueError:
+                    pass
+    return stages
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for an empty sample)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class LoadGenerator:
+    """
+    Replays cases against a triage endpoint.
+
+    Closed loop: `concurrency` workers each send the next case as soon as
+    their previous request finishes. Open loop: requests start on a fixed
+    schedule of `rps` per second regardless of how fast the server answers,
+    and any delay in starting them is reported as client queue time.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        cases: List[LoadCase],
+        endpoint: str = "triage",
+        concurrency: int = 4,
+        rps: Optional[float] = None,
+        timeout: float = 120.0,
+        headers: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the load generator.
+
+        Args:
+            base_url: API base URL, e.g. http://127.0.0.1:8000
+            cases: Request bodies to replay (cycled in shuffled order)
+            endpoint: "triage" or "specialized"
+            concurrency: Worker count (closed loop) or maximum in-flight
+                requests (open loop)
+            rps: Target arrival rate; enables open-loop mode
+            timeout: Per-request client timeout in seconds
+            headers: Extra HTTP headers sent with every request
+            seed: Random seed for case order
+        """
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint: {endpoint} (use {', '.join(ENDPOINTS)})")
+        if not cases:
+            raise ValueError("No cases to replay")
+        if endpoint == "specialized" and not all(case.nurse_role for case in cases):
+            raise ValueError("Every case needs a nurse_role for /triage/specialized")
+
+        self.url = base_url.rstrip("/") + ENDPOINTS[endpoint]
+        self.endpoint = endpoint
+        self.cases = list(cases)
+        random.Random(seed).shuffle(self.cases)
+        self.concurrency = max(1, concurrency)
+        self.rps = rps
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self._next_index = 0
+
+    def _next_case(self) -> LoadCase:
+        with self._lock:
+            case = self.cases[self._next_index % len(self.cases)]
+            self._next_index += 1
+            return case
+
+    def send(self, case: LoadCase, scheduled: Optional[float] = None) -> RequestResult:
+        """Send one request and time it (from the scheduled start, if given)."""
+        started = time.perf_counter()
+        queued = max(0.0, started - scheduled) if scheduled is not None else 0.0
+        origin = scheduled if scheduled is not None else started
+
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(case.payload()).encode("utf-8"),
+            headers=self.headers,
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.loads(response.read() or b"{}")
+                return RequestResult(
+                    status=response.status,
+                    latency=time.perf_counter() - origin,
+                    queued=queued,
+                    degraded=bool(body.get("degraded", False)),
+                    stages=parse_server_timing(response.headers.get("Server-Timing")),
+                )
+        except urllib.error.HTTPError as e:
+            return RequestResult(
+                status=e.code,
+                latency=time.perf_counter() - origin,
+                queued=queued,
+                error=f"HTTP {e.code}",
+                stages=parse_server_timing(e.headers.get("Server-Timing")),
+            )
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            return RequestResult(
+                status=0,
+                latency=time.perf_counter() - origin,
+                queued=queued,
+                error=type(getattr(e, "reason", e)).__name__,
+            )
+
+    def run(self, requests: Optional[int] = None, duration: Optional[float] = None) -> Dict:
+        """
+        Run the load test.
+
+        Args:
+            requests: Stop after this many requests
+            duration: Stop starting new requests after this many seconds
+                (default when neither is given: one pass over the cases)
+
+        Returns:
+            Result dict with "meta" and "summary" sections
+        """
+        if requests is None and duration is None:
+            requests = len(self.cases)
+
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+        if self.rps:
+            results = self._run_open_loop(start, requests, deadline, self.rps)
+        else:
+            results = self._run_closed_loop(requests, deadline)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "git_commit": _git_commit(),
+                "url": self.url,
+                "endpoint": self.endpoint,
+                "mode": "open" if self.rps else "closed",
+                "concurrency": self.concurrency,
+                "rps": self.rps,
+                "cases": len(self.cases),
+                "seed": self.seed,
+            },
+            "summary": summarize(results, elapsed),
+        }
+
+    def _run_closed_loop(self, requests, deadline) -> List[RequestResult]:
+        results = []
+        remaining = [requests]
+
+        def worker():
+            while True:
+                with self._lock:
+                    if remaining[0] is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                result = self.send(self._next_case())
+                with self._lock:
+                    results.append(result)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _run_open_loop(self, start, requests, deadline, rps: float) -> List[RequestResult]:
+        interval = 1.0 / rps
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            sent = 0
+            while requests is None or sent < requests:
+                scheduled = start + sent * interval
+                if deadline is not None and scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(self.send, self._next_case(), scheduled))
+                sent += 1
+        return [future.result() for future in futures]
+
+
+def summarize(results: List[RequestResult], elapsed: float) -> Dict:
+    """
+    Aggregate request results.
+
+    Args:
+        results: Per-request outcomes
+        elapsed: Wall-clock duration of the run in seconds
+
+    Returns:
+        Throughput, latency percentiles, error counts and per-stage timings
+    """
+    ok = [r for r in results if r.error is None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r.error is not None:
+            errors[r.error] = errors.get(r.error, 0) + 1
+
+    stage_names = sorted({name for r in ok for name in r.stages})
+    stages = {
+        name: _distribution([r.stages[name] for r in ok if name in r.stages])
+        for name in stage_names
+    }
+    if any(r.queued for r in results):
+        stages["client_queue"] = _distribution([r.queued for r in results])
+
+    return {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": errors,
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "degraded_rate": sum(r.degraded for r in ok) / len(ok) if ok else 0.0,
+        "elapsed_seconds": elapsed,
+        "throughput_rps": len(ok) / elapsed if elapsed > 0 else 0.0,
+        "latency_seconds": _distribution([r.latency for r in ok]),
+        "stages_seconds": stages,
+    }
+
+
+def format_summary(result: Dict) -> str:
+    """Render a run result as a short human-readable report."""
+    meta, summary = result["meta"], result["summary"]
+
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}ms"
+
+    mode = f"{meta['rps']} rps" if meta["mode"] == "open" else f"concurrency {meta['concurrency']}"
+    latency = summary["latency_seconds"]
+    lines = [
+        f"{meta['url']} ({mode})",
+        f"  requests:   {summary['requests']} ({summary['succeeded']} ok, "
+        f"error rate {summary['error_rate']:.1%}, degraded {summary['degraded_rate']:.1%})",
+        f"  throughput: {summary['throughput_rps']:.2f} req/s over {summary['elapsed_seconds']:.1f}s",
+        f"  latency:    p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  "
+        f"p99 {ms(latency['p99'])}  max {ms(latency['max'])}",
+    ]
+    if summary["errors"]:
+        lines.append(
+            "  errors:     " + ", ".join(f"{k}: {v}" for k, v in sorted(summary["errors"].items()))
+        )
+    if summary["stages_seconds"]:
+        lines.append("  stages:")
+        for name, dist in summary["stages_seconds"].items():
+            lines.append(
+                f"    {name:<14} mean {ms(dist['mean'])}  p50 {ms(dist['p50'])}  p99 {ms(dist['p99'])}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,330 @@
+"""
+Micro-Benchmarks for CPU Hot Paths.
+
+Times the project's own CPU-bound code in isolation (protocol parsing,
+keyword extraction, protocol context building, metrics, agent setup),
+stores baselines and flags regressions beyond a tolerance.
+"""
+
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Benchmark name -> setup function returning the callable to time
+_REGISTRY: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a setup function that returns the callable to time."""
+
+    def decorator(setup):
+        _REGISTRY[name] = setup
+        return setup
+
+    return decorator
+
+
+@dataclass
+class MicroResult:
+    """Timing of one benchmark (seconds per call)."""
+
+    name: str
+    median: float
+    best: float
+    loops: int
+    repeats: int
+
+
+@contextlib.contextmanager
+def _offline_lm():
+    """Point the agent at the in-process stub LM so setup needs no credentials."""
+    saved = {key: os.environ.get(key) for key in ("DEEPSEEK_BASE_URL", "DEEPSEEK_API_KEY")}
+    os.environ["DEEPSEEK_BASE_URL"] = "stub://"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "stub")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@lru_cache(maxsize=None)
+def _make_agent():
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    with _offline_lm():
+        return STCCTriageAgent()
+
+
+@lru_cache(maxsize=None)
+def _histories() -> Tuple[str, str]:
+    from stcc_triage.bench.load import bundled_cases
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    messages = [case.symptoms for case in bundled_cases()]
+    short = messages[0]
+    long = STCCTriageAgent._build_conversation(messages[-1], messages[:40])
+    return short, long
+
+
+def _prediction_set(size: int = 10000):
+    import dspy
+
+    from stcc_triage.datasets.cases import ED_CASES, GI_CASES, OB_CASES
+
+    golds = ED_CASES + GI_CASES + OB_CASES
+    levels = ["Emergency", "Urgent", "Moderate", "Home Care"]
+    return [
+        (golds[i % len(golds)], dspy.Prediction(triage_level=levels[i % len(levels)]))
+        for i in range(size)
+    ]
+
+
+@benchmark("parser.parse_all_files")
+def _bench_parse_all():
+    from stcc_triage.core.paths import get_protocols_dir
+    from stcc_triage.protocols.parser import parse_stcc_markdown
+
+    files = sorted(get_protocols_dir().glob("*.md"))
+    return lambda: [parse_stcc_markdown(path) for path in files]
+
+
+@benchmark("agent.extract_keywords.short")
+def _bench_keywords_short():
+    agent, (short, _) = _make_agent(), _histories()
+    return lambda: agent._extract_keywords(short)
+
+
+@benchmark("agent.extract_keywords.long")
+def _bench_keywords_long():
+    agent, (_, long) = _make_agent(), _histories()
+    return lambda: agent._extract_keywords(long)
+
+
+@benchmark("agent.find_missing_info.short")
+def _bench_missing_short():
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    short, _ = _histories()
+    return lambda: STCCTriageAgent._find_missing_info(short)
+
+
+@benchmark("agent.find_missing_info.long")
+def _bench_missing_long():
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    _, long = _histories()
+    return lambda: STCCTriageAgent._find_missing_info(long)
+
+
+@benchmark("agent.add_protocol_context.short")
+def _bench_context_short():
+    agent, (short, _) = _make_agent(), _histories()
+    return lambda: agent._add_protocol_context(short)
+
+
+@benchmark("agent.add_protocol_context.long")
+def _bench_context_long():
+    agent, (_, long) = _make_agent(), _histories()
+    return lambda: agent._add_protocol_context(long)
+
+
+@benchmark("metric.protocol_adherence.10k")
+def _bench_adherence():
+    from stcc_triage.optimizers.metric import protocol_adherence_metric
+
+    pairs = _prediction_set()
+    return lambda: [protocol_adherence_metric(gold, pred) for gold, pred in pairs]
+
+
+@benchmark("metric.combined.10k")
+def _bench_combined():
+    from stcc_triage.optimizers.metric import combined_metric
+
+    pairs = _prediction_set()
+    return lambda: [combined_metric(gold, pred) for gold, pred in pairs]
+
+
+@benchmark("agent.construct")
+def _bench_construct():
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    def construct():
+        with _offline_lm():
+            STCCTriageAgent()
+
+    _make_agent()  # Warm imports and the protocol file cache
+    return construct
+
+
+def list_benchmarks() -> List[str]:
+    """Names of all registered benchmarks."""
+    return list(_REGISTRY)
+
+
+def time_callable(
+    func: Callable[[], object], repeats: int = 5, min_time: float = 0.2
+) -> Tuple[float, float, int]:
+    """
+    Time a callable, calibrating the loop count like timeit.
+
+    Args:
+        func: Zero-argument callable
+        repeats: Number of timed repeats
+        min_time: Minimum seconds per repeat used to pick the loop count
+
+    Returns:
+        (median seconds per call, best seconds per call, loops per repeat)
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return statistics.median(samples), min(samples), loops
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, repeats: int = 5, min_time: float = 0.2
+) -> List[MicroResult]:
+    """
+    Run registered benchmarks.
+
+    Args:
+        names: Benchmarks to run; entries match exact names or name prefixes
+            (default: all)
+        repeats: Timed repeats per benchmark
+        min_time: Minimum seconds per repeat
+
+    Returns:
+        One MicroResult per benchmark run
+    """
+    selected = [
+        name
+        for name in _REGISTRY
+        if not names or any(name.startswith(n) for n in names)
+    ]
+    if names and not selected:
+        raise ValueError(f"No benchmarks match: {', '.join(names)}")
+
+    results = []
+    for name in selected:
+        func = _REGISTRY[name]()
+        median, best, loops = time_callable(func, repeats=repeats, min_time=min_time)
+        results.append(MicroResult(name, median, best, loops, repeats))
+    return results
+
+
+def save_baseline(results: List[MicroResult], path: Path):
+    """Write results as the baseline, keeping entries for benchmarks not run."""
+    baseline = load_baseline(path) if path.exists() else {}
+    baseline.update({r.name: asdict(r) for r in results})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "benchmarks": dict(sorted(baseline.items())),
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_baseline(path: Path) -> Dict[str, Dict]:
+    """Read a baseline file (benchmark name -> result dict)."""
+    with open(path, "r", encoding="utf-8") as f:
+        baseline: Dict[str, Dict] = json.load(f)["benchmarks"]
+    return baseline
+
+
+def compare(
+    results: List[MicroResult], baseline: Dict[str, Dict], tolerance: float = 0.2
+) -> List[Dict]:
+    """
+    Compare results against a baseline.
+
+    A benchmark regresses when its median is more than `tolerance`
+    (a fraction, 0.2 = 20%) slower than the baseline median.
+
+    Args:
+        results: Current results
+        baseline: Baseline from load_baseline()
+        tolerance: Allowed slowdown before flagging a regression
+
+    Returns:
+        One row per result with baseline, ratio and status
+        ("ok", "faster", "regression" or "new")
+    """
+    rows = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            rows.append({"name": result.name, "median": result.median, "status": "new"})
+            continue
+        ratio = result.median / previous["median"] if previous["median"] else float("inf")
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": result.name,
+                "median": result.median,
+                "baseline": previous["median"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def _format_seconds(value: float) -> str:
+    if value >= 1:
+        return f"{value:.2f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value * 1e6:.1f}us"
+
+
+def format_results(results: List[MicroResult], rows: Optional[List[Dict]] = None) -> str:
+    """Render results (and an optional baseline comparison) as a table."""
+    by_name = {row["name"]: row for row in rows or []}
+    lines = []
+    for result in results:
+        line = (
+            f"{result.name:<36} {_format_seconds(result.median):>10} "
+            f"(best {_format_seconds(result.best)}, {result.loops} loops)"
+        )
+        row = by_name.get(result.name)
+        if row and "ratio" in row:
+            line += f"  {row['ratio']:.2f}x baseline  {row['status'].upper()}"
+        elif row:
+            line += "  NEW"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+"""
+Profiling Targets.
+
+Profiles the known startup and per-request hot spots on demand: the
+import chain, STCCTriageAgent construction, protocol context building
+and a full triage call against the offline stub LM.
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from stcc_triage.bench.micro import _histories, _make_agent, _offline_lm
+from stcc_triage.telemetry.profiling import Profiler, profile_imports
+
+
+def _construct():
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    with _offline_lm():
+        STCCTriageAgent()
+
+
+def _protocol_context():
+    agent = _make_agent()
+    short, long = _histories()
+    agent._add_protocol_context(short)
+    agent._add_protocol_context(long)
+
+
+def _triage():
+    agent = _make_agent()
+    short, _ = _histories()
+    agent.triage(short)
+
+
+PROFILE_TARGETS: Dict[str, Callable[[], None]] = {
+    "agent.init": _construct,
+    "agent.add_protocol_context": _protocol_context,
+    "agent.triage": _triage,
+}
+
+
+def list_targets() -> List[str]:
+    """Names of all profiling targets (plus "imports")."""
+    return ["imports"] + list(PROFILE_TARGETS)
+
+
+def profile_target(
+    name: str,
+    kind: str = "cprofile",
+    repeat: int = 1,
+    output_dir: Optional[Path] = None,
+    module: str = "stcc_triage.core.agent",
+) -> Path:
+    """
+    Profile one target, ignoring the production rate limit.
+
+    Args:
+        name: Target from list_targets()
+        kind: "cprofile" or "sample"
+        repeat: Times to run the target inside the profile
+        output_dir: Profile directory (default: user_data/profiles/)
+        module: Module whose import chain is profiled for the "imports" target
+
+    Returns:
+        Path to the written profile
+
+    Raises:
+        ValueError: If the target is unknown
+    """
+    if name == "imports":
+        return profile_imports(module, output_dir)
+    if name not in PROFILE_TARGETS:
+        raise ValueError(f"Unknown profiling target: {name} (choose from {', '.join(list_targets())})")
+
+    func = PROFILE_TARGETS[name]
+    if name != "agent.init":
+        _make_agent()  # Keep one-time setup out of the profile
+
+    profiler = Profiler(output_dir=output_dir, kind=kind, max_per_minute=None)
+    with profiler.profile(name) as written:
+        for _ in range(repeat):
+            func()
+    if not written:
+        raise RuntimeError("Another profile is already running in this process")
+    return written[0]
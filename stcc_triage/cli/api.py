@@ -5,6 +5,7 @@ Entry point for stcc-api command.
 """
 
 import argparse
+import sys
 
 
 def main():
@@ -29,8 +30,44 @@ def main():
         action="store_true",
         help="Enable auto-reload for development",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes forked from one preloaded master (default: 1)",
+    )
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="With --workers > 1, load protocols and compiled nurses once in the "
+        "master and share them copy-on-write (default: --preload)",
+    )
 
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and args.reload:
+        parser.error("--reload cannot be combined with --workers")
+
+    if args.workers > 1:
+        from stcc_triage.api.server import serve_workers
+
+        # Workers accept on one shared socket, so any worker may get any request
+        print(
+            "Warning: sessions, /chat resumes and Idempotency-Key replays are kept per "
+            "worker process; with --workers > 1 a follow-up request can reach a worker "
+            "that does not know them. Run single-worker instances behind a sticky load "
+            "balancer if clients rely on them.",
+            file=sys.stderr,
+        )
+
+        try:
+            serve_workers(args.host, args.port, args.workers, preload=args.preload)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
 
     # Launch uvicorn server
     import uvicorn
@@ -0,0 +1,139 @@
+"""
+CLI command for offline file-to-file batch triage.
+
+Entry point for stcc-triage-batch command.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def main():
+    """Triage a CSV or JSONL file of call records into a JSONL results file."""
+    from stcc_triage.nurses.roles import NurseRole
+
+    parser = argparse.ArgumentParser(
+        description="Triage a CSV or JSONL file of call records with checkpoint/resume"
+    )
+    parser.add_argument("input", type=Path, help="CSV (with header) or JSONL call records")
+    parser.add_argument("output", type=Path, help="JSONL results file, appended as records finish")
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["csv", "jsonl"],
+        default=None,
+        help="Input format (default: from the file extension)",
+    )
+    parser.add_argument(
+        "--role",
+        type=str,
+        choices=[r.value for r in NurseRole],
+        default=None,
+        help="Compiled nurse role to triage with (default: the general agent)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Records triaged at once (default: 8)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Checkpoint file (default: <output>.checkpoint.json)",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=100,
+        help="Results written between checkpoints (default: 100)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore an existing checkpoint and overwrite the output",
+    )
+    parser.add_argument(
+        "--id-field",
+        type=str,
+        default="id",
+        help="Column/key holding the record id (default: id, else the record index)",
+    )
+    parser.add_argument(
+        "--symptoms-field",
+        type=str,
+        default="symptoms",
+        help="Column/key holding the symptoms (default: symptoms)",
+    )
+    parser.add_argument(
+        "--history-field",
+        type=str,
+        default="conversation_history",
+        help="Column/key holding earlier messages as a list or JSON array "
+        "(default: conversation_history)",
+    )
+
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not args.input.exists():
+        parser.error(f"Input not found: {args.input}")
+
+    # Imported after argument parsing so --help does not load DSPy
+    from stcc_triage.batch.records import detect_format, read_records
+    from stcc_triage.batch.runner import BatchRunner, format_stats
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    try:
+        fmt = args.format or detect_format(args.input)
+    except ValueError as e:
+        parser.error(str(e))
+
+    agent, role = STCCTriageAgent(), "general"
+    if args.role:
+        from stcc_triage.nurses.pool import NursePool
+
+        role = args.role
+        try:
+            agent = NursePool(agent).get(NurseRole(role))
+        except FileNotFoundError as e:
+            print(
+                f"Error: compiled nurse not found ({e}); run stcc-optimize --role {role}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    runner = BatchRunner(
+        agent,
+        role=role,
+        concurrency=args.concurrency,
+        checkpoint_every=args.checkpoint_every,
+        progress=lambda stats: print(format_stats(stats), file=sys.stderr, flush=True),
+    )
+    records = read_records(
+        args.input,
+        fmt,
+        id_field=args.id_field,
+        symptoms_field=args.symptoms_field,
+        history_field=args.history_field,
+    )
+
+    try:
+        checkpoint = runner.run(
+            records, args.input, args.output, args.checkpoint, restart=args.restart
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume", file=sys.stderr)
+        sys.exit(130)
+
+    print(format_stats(checkpoint.stats))
+    print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+CLI command for benchmarking the STCC Triage service.
+
+Entry point for stcc-bench command.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+def run_load(args):
+    """Run the end-to-end load generator against a running stcc-api."""
+    from stcc_triage.bench.load import (
+        LoadGenerator,
+        bundled_cases,
+        format_summary,
+        load_jsonl_cases,
+    )
+
+    cases = load_jsonl_cases(args.cases) if args.cases else bundled_cases()
+    headers = dict(h.split(":", 1) for h in args.header)
+    generator = LoadGenerator(
+        base_url=args.url,
+        cases=cases,
+        endpoint=args.endpoint,
+        concurrency=args.concurrency,
+        rps=args.rps,
+        timeout=args.timeout,
+        headers={k.strip(): v.strip() for k, v in headers.items()},
+        seed=args.seed,
+    )
+    result = generator.run(requests=args.requests, duration=args.duration)
+    print(format_summary(result))
+
+    output = args.output
+    if output is None:
+        from stcc_triage.core.paths import get_user_data_dir
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = get_user_data_dir() / "bench" / f"load-{args.endpoint}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+
+def run_micro(args):
+    """Run CPU micro-benchmarks and compare them with the stored baseline."""
+    from stcc_triage.bench.micro import (
+        compare,
+        format_results,
+        list_benchmarks,
+        load_baseline,
+        run_benchmarks,
+        save_baseline,
+    )
+
+    if args.list:
+        print("\n".join(list_benchmarks()))
+        return
+
+    baseline_path = args.baseline
+    if baseline_path is None:
+        from stcc_triage.core.paths import get_user_data_dir
+
+        baseline_path = get_user_data_dir() / "bench" / "micro-baseline.json"
+
+    results = run_benchmarks(args.only or None, repeats=args.repeats, min_time=args.min_time)
+
+    rows = None
+    if baseline_path.exists() and not args.save_baseline:
+        rows = compare(results, load_baseline(baseline_path), tolerance=args.tolerance)
+    print(format_results(results, rows))
+
+    if args.save_baseline:
+        save_baseline(results, baseline_path)
+        print(f"\nBaseline saved to: {baseline_path}")
+    elif rows is None:
+        print(f"\nNo baseline at {baseline_path} (create one with --save-baseline)")
+    else:
+        regressions = [row["name"] for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(
+                f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: "
+                + ", ".join(regressions)
+            )
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+def run_profile(args):
+    """Profile startup and protocol context hot spots into user_data/profiles/."""
+    from stcc_triage.bench.profile import list_targets, profile_target
+
+    if args.list:
+        print("\n".join(list_targets()))
+        return
+
+    for target in args.targets:
+        path = profile_target(
+            target,
+            kind=args.profiler,
+            repeat=args.repeat,
+            output_dir=args.output_dir,
+            module=args.module,
+        )
+        print(f"{target:30s} → {path}")
+
+
+def run_imports(args):
+    """Time package and entry-point imports against their budgets."""
+    from stcc_triage.bench.imports import (
+        DEFAULT_BUDGETS,
+        format_import_results,
+        run_import_budgets,
+    )
+
+    budgets = [
+        budget
+        for budget in DEFAULT_BUDGETS
+        if not args.only or any(budget.module.startswith(prefix) for prefix in args.only)
+    ]
+    if args.list:
+        print("\n".join(f"{b.module:<36} {b.seconds:g}s" for b in budgets))
+        return
+
+    results = run_import_budgets(budgets, repeats=args.repeats)
+    print(format_import_results(results))
+
+    failures = [result.module for result in results if not result.ok]
+    if failures:
+        print(f"\n{len(failures)} import(s) over budget: " + ", ".join(failures))
+        sys.exit(1)
+    print("\nAll imports within budget")
+
+
+def main():
+    """Run STCC Triage benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the STCC Triage service")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load = subparsers.add_parser(
+        "load", help="Replay patient cases against a running stcc-api"
+    )
+    load.add_argument(
+        "--url",
+        type=str,
+        default="http://127.0.0.1:8000",
+        help="API base URL (default: http://127.0.0.1:8000)",
+    )
+    load.add_argument(
+        "--endpoint",
+        type=str,
+        choices=["triage", "specialized"],
+        default="triage",
+        help="Endpoint to load: /triage or /triage/specialized (default: triage)",
+    )
+    load.add_argument(
+        "--cases",
+        type=Path,
+        default=None,
+        help="JSONL file of request bodies (default: bundled nurse training cases)",
+    )
+    load.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent workers, or max in-flight requests with --rps (default: 4)",
+    )
+    load.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Open-loop arrival rate in requests per second (default: closed loop)",
+    )
+    load.add_argument(
+        "--requests",
+        type=int,
+        default=None,
+        help="Total requests to send (default: one pass over the cases)",
+    )
+    load.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Stop starting new requests after this many seconds",
+    )
+    load.add_argument(
+        "--timeout",
+        type=float,
+        default=120.0,
+        help="Per-request client timeout in seconds (default: 120)",
+    )
+    load.add_argument(
+        "--header",
+        action="append",
+        default=[],
+        metavar="NAME:VALUE",
+        help="Extra HTTP header sent with every request (repeatable)",
+    )
+    load.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for case order",
+    )
+    load.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Result JSON path (default: user_data/bench/load-<endpoint>-<time>.json)",
+    )
+    load.set_defaults(func=run_load)
+
+    micro = subparsers.add_parser(
+        "micro", help="Time CPU hot paths and flag regressions against a baseline"
+    )
+    micro.add_argument(
+        "--only",
+        nargs="+",
+        default=[],
+        metavar="NAME",
+        help="Benchmarks to run, by name or prefix (e.g. parser agent.extract_keywords)",
+    )
+    micro.add_argument(
+        "--list",
+        action="store_true",
+        help="List available benchmarks and exit",
+    )
+    micro.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="Timed repeats per benchmark; the median is reported (default: 5)",
+    )
+    micro.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Minimum seconds per repeat used to calibrate loops (default: 0.2)",
+    )
+    micro.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Baseline JSON path (default: user_data/bench/micro-baseline.json)",
+    )
+    micro.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of comparing",
+    )
+    micro.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown before a regression is flagged (default: 0.2 = 20%%)",
+    )
+    micro.set_defaults(func=run_micro)
+
+    profile = subparsers.add_parser(
+        "profile", help="Write flamegraph-ready profiles of startup and request hot paths"
+    )
+    profile.add_argument(
+        "targets",
+        nargs="*",
+        default=["imports", "agent.init", "agent.add_protocol_context"],
+        metavar="TARGET",
+        help="Targets to profile (default: imports agent.init agent.add_protocol_context)",
+    )
+    profile.add_argument(
+        "--list",
+        action="store_true",
+        help="List available targets and exit",
+    )
+    profile.add_argument(
+        "--profiler",
+        type=str,
+        choices=["cprofile", "sample"],
+        default="cprofile",
+        help="cprofile writes .prof, sample writes collapsed .folded stacks (default: cprofile)",
+    )
+    profile.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Run each target this many times inside the profile (default: 1)",
+    )
+    profile.add_argument(
+        "--module",
+        type=str,
+        default="stcc_triage.core.agent",
+        help="Module whose import chain the imports target profiles (default: stcc_triage.core.agent)",
+    )
+    profile.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Profile directory (default: user_data/profiles/)",
+    )
+    profile.set_defaults(func=run_profile)
+
+    imports = subparsers.add_parser(
+        "imports", help="Check package and stcc-* entry-point import times against budgets"
+    )
+    imports.add_argument(
+        "--only",
+        nargs="+",
+        default=[],
+        metavar="MODULE",
+        help="Modules to time, by name or prefix (e.g. stcc_triage.cli)",
+    )
+    imports.add_argument(
+        "--list",
+        action="store_true",
+        help="List budgeted modules and exit",
+    )
+    imports.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Fresh interpreters per module; the fastest run is reported (default: 3)",
+    )
+    imports.set_defaults(func=run_imports)
+
+    args = parser.parse_args()
+
+    try:
+        args.func(args)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ Entry point for stcc-optimize command.
 
 import argparse
 from stcc_triage.nurses.roles import NurseRole
-from stcc_triage.optimizers.compiler import optimize_nurse
 
 
 def main():
@@ -28,6 +27,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help does not load DSPy
+    from stcc_triage.optimizers.compiler import optimize_nurse
+
     # Run optimization
     optimize_nurse(role=args.role, regenerate_data=args.regenerate_data)
 
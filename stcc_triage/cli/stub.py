@@ -0,0 +1,85 @@
+"""
+CLI command for launching the offline stub LM server.
+
+Entry point for stcc-stub-lm command.
+"""
+
+import argparse
+
+
+def main():
+    """Launch the OpenAI-compatible stub LM server."""
+    parser = argparse.ArgumentParser(
+        description="Launch an offline OpenAI-compatible stub LM for load and latency testing"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Host to bind to (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8089,
+        help="Port to bind to (default: 8089)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=str,
+        default="lognormal:800,0.6",
+        help="Latency in ms: constant:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA "
+        "(default: lognormal:800,0.6)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability of an injected 500 error (default: 0.0)",
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Probability of an injected 429 error (default: 0.0)",
+    )
+    parser.add_argument(
+        "--completion-tokens",
+        type=int,
+        default=None,
+        help="Completion tokens reported per response (default: ~chars/4)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible latency and errors",
+    )
+
+    args = parser.parse_args()
+
+    from stcc_triage.lm.stub import StubResponder, create_stub_server
+
+    responder = StubResponder(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+    server = create_stub_server(args.host, args.port, responder)
+
+    print(f"Stub LM listening on http://{args.host}:{args.port}/v1")
+    print(f"  export DEEPSEEK_BASE_URL=http://{args.host}:{args.port}/v1")
+    print("  export DEEPSEEK_API_KEY=stub")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
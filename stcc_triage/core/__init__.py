@@ -1,13 +1,41 @@
 """Core triage agent functionality."""
 
-from .agent import STCCTriageAgent
-from .signatures import TriageSignature, FollowUpSignature
-from .settings import DeepSeekConfig, get_deepseek_config
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .agent import STCCTriageAgent
+    from .signatures import TriageSignature, FollowUpSignature
+    from .settings import (
+        APIConfig,
+        DeepSeekConfig,
+        LMCallConfig,
+        TelemetryConfig,
+        get_deepseek_config,
+    )
 
 __all__ = [
     "STCCTriageAgent",
     "TriageSignature",
     "FollowUpSignature",
+    "APIConfig",
     "DeepSeekConfig",
+    "LMCallConfig",
+    "TelemetryConfig",
     "get_deepseek_config",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "STCCTriageAgent": ".agent",
+        "TriageSignature": ".signatures",
+        "FollowUpSignature": ".signatures",
+        "APIConfig": ".settings",
+        "DeepSeekConfig": ".settings",
+        "LMCallConfig": ".settings",
+        "TelemetryConfig": ".settings",
+        "get_deepseek_config": ".settings",
+    },
+)
@@ -4,18 +4,31 @@ STCC Triage Agent with DSPy ChainOfThought.
 Main triage agent using DeepSeek for medical reasoning.
 """
 
+import copy
 import json
+import math
+import time
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 try:
     import dspy
-    from dspy import ChainOfThought
+    from dspy import ChainOfThought, Predict
+    from dspy.streaming import StreamListener, StreamResponse
 except ImportError:
     raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
 
 from .signatures import TriageSignature, FollowUpSignature
-from .settings import get_deepseek_config
+from .settings import LMCallConfig, get_deepseek_config
+from stcc_triage.lm.breaker import CircuitOpenError
+from stcc_triage.lm.deadline import expired as deadline_expired
+from stcc_triage.lm.deadline import remaining as deadline_remaining
+from stcc_triage.lm.quality import QualityMode, get_quality_controller
+from stcc_triage.lm.scheduler import red_flag_priority
+from stcc_triage.protocols.rules import RuleBasedTriage
+from stcc_triage.telemetry.profiling import profiled
+from stcc_triage.telemetry.timing import annotate_request, get_stage_callback, stage
+from stcc_triage.telemetry.tracing import current_span, get_tracing_callback, traced
 
 # Keywords that indicate critical info is present
 _INFO_KEYWORDS = {
@@ -39,6 +52,9 @@ _INFO_KEYWORDS = {
 # Minimum missing categories to trigger follow-up questions
 _FOLLOWUP_THRESHOLD = 3
 
+# Triage output fields streamed by stream_triage (in generation order)
+STREAM_FIELDS = ("reasoning", "triage_level", "clinical_justification")
+
 
 class STCCTriageAgent:
     """
@@ -49,9 +65,13 @@ class STCCTriageAgent:
     - STCC protocol context enhancement
     - DeepSeek-powered reasoning engine
     - Structured output with clinical justification
+    - Rule-based degraded fallback while the LM circuit breaker is open
+    - Direct Predict triage (no rationale) for non-red-flag requests under load
+    - Per-request deadlines: the richest strategy that fits the time left
     """
 
-    def __init__(self, protocols_path: str = None):
+    @profiled("agent.init")
+    def __init__(self, protocols_path: Optional[str] = None):
         """
         Initialize triage agent.
 
@@ -59,9 +79,14 @@ class STCCTriageAgent:
             protocols_path: Path to digitized STCC protocols JSON file.
                           If None, uses default path from package data.
         """
-        # Configure DeepSeek via DSPy
+        # Configure DeepSeek via DSPy (with per-stage timing and tracing of LM calls)
         config = get_deepseek_config()
-        dspy.configure(lm=config.lm)
+        callbacks = list(dspy.settings.get("callbacks") or [])
+        for callback in (get_stage_callback(), get_tracing_callback()):
+            if callback not in callbacks:
+                callbacks.append(callback)
+        dspy.configure(lm=config.lm, callbacks=callbacks)
+        self.lm_timeout = LMCallConfig().timeout
 
         # Load digitized protocols
         if protocols_path is None:
@@ -82,15 +107,75 @@ class STCCTriageAgent:
         # Create ChainOfThought modules
         self.triage_module = ChainOfThought(TriageSignature)
         self.followup_module = ChainOfThought(FollowUpSignature)
+        self.fast_triage_module = self._fast_module(self.triage_module)
+
+        # Conservative protocol rules for when the LM is unavailable
+        self.rules = RuleBasedTriage(self.protocols)
 
         print(f"Triage agent initialized with {len(self.protocols)} protocols")
 
+    def with_triage_module(self, triage_module: dspy.Module) -> "STCCTriageAgent":
+        """
+        Return a copy of this agent that triages with another module.
+
+        The copy shares protocols, rules and the follow-up module with this
+        agent, so a compiled nurse costs only its own program. Neither agent
+        is modified, which keeps concurrent requests for different roles apart.
+
+        Args:
+            triage_module: Triage program to use, e.g. a compiled nurse
+
+        Returns:
+            New STCCTriageAgent sharing this agent's protocol state
+        """
+        agent = copy.copy(self)
+        agent.triage_module = triage_module
+        agent.fast_triage_module = self._fast_module(triage_module)
+        return agent
+
+    @staticmethod
+    def _fast_module(triage_module: dspy.Module) -> Predict:
+        """Direct (no rationale) triage program reusing the module's few-shot demos."""
+        fast = Predict(TriageSignature)
+        predictors = triage_module.predictors()
+        if predictors:
+            fast.demos = list(predictors[0].demos)
+        return fast
+
+    def _select_module(self, suspected: bool):
+        """
+        Pick the triage strategy for the current load and deadline.
+
+        Returns:
+            Tuple of (mode, triage program or None for rules, LM config)
+        """
+        quality = get_quality_controller()
+        mode = quality.choose(red_flag=suspected)
+        budget = deadline_remaining()
+        if budget is not None:
+            mode = quality.fit(mode, budget)
+        if mode == QualityMode.RULES:
+            return mode, None, {}
+
+        config = {}
+        if budget is not None and budget < self.lm_timeout:
+            # Whole seconds keep the number of distinct LM cache keys small
+            config["timeout"] = math.ceil(budget)
+        if mode == QualityMode.FAST:
+            if quality.fast_max_tokens:
+                config["max_tokens"] = quality.fast_max_tokens
+            return mode, self.fast_triage_module, config
+        return mode, self.triage_module, config
+
+    @traced("agent.ask_or_triage")
+    @profiled("agent.ask_or_triage")
     def ask_or_triage(
         self,
         symptoms: str,
-        conversation_history: List[str] = None,
+        conversation_history: Optional[List[str]] = None,
         question_rounds: int = 0,
         max_rounds: int = 3,
+        missing_info: Optional[List[str]] = None,
     ) -> dict:
         """
         Decide whether to ask follow-up questions or perform triage.
@@ -103,36 +188,109 @@ class STCCTriageAgent:
             conversation_history: Previous patient messages
             question_rounds: How many rounds of questions already asked
             max_rounds: Maximum follow-up rounds before forcing triage
+            missing_info: Categories still missing after conversation_history
+                (from the previous turn); only the new message is scanned
 
         Returns:
             Dict with either:
                 - {"action": "ask", "questions": str} for follow-up
                 - {"action": "triage", "result": Prediction} for triage
+            and "missing_info", the categories still missing after this turn
+        """
+        response = self.ask_followup(
+            symptoms,
+            conversation_history=conversation_history,
+            question_rounds=question_rounds,
+            max_rounds=max_rounds,
+            missing_info=missing_info,
+        )
+        if response["action"] == "triage":
+            response["result"] = self.triage(symptoms, conversation_history=conversation_history)
+        return response
+
+    @traced("agent.ask_followup")
+    def ask_followup(
+        self,
+        symptoms: str,
+        conversation_history: Optional[List[str]] = None,
+        question_rounds: int = 0,
+        max_rounds: int = 3,
+        missing_info: Optional[List[str]] = None,
+    ) -> dict:
+        """
+        Ask follow-up questions if needed, without triaging.
+
+        The decision half of ask_or_triage, for callers that run (or
+        stream) the triage step themselves.
+
+        Args:
+            symptoms: Current patient message
+            conversation_history: Previous patient messages
+            question_rounds: How many rounds of questions already asked
+            max_rounds: Maximum follow-up rounds before forcing triage
+            missing_info: Categories still missing after conversation_history
+
+        Returns:
+            Dict with either:
+                - {"action": "ask", "questions": str} for follow-up
+                - {"action": "triage"} when it is time to triage
+            and "missing_info", the categories still missing after this turn
         """
         full_text = symptoms
         if conversation_history:
             full_text = " ".join(conversation_history) + " " + symptoms
 
-        missing = self._find_missing_info(full_text)
+        with stage("missing_info"):
+            if missing_info is None:
+                missing = self._find_missing_info(full_text)
+            else:
+                missing = self._find_missing_info(symptoms, missing_info)
+        current_span().set_attributes(
+            history_messages=len(conversation_history or []),
+            question_rounds=question_rounds,
+            missing_info=", ".join(missing),
+        )
 
         # Ask follow-up if too much info is missing and under round limit
         if len(missing) >= _FOLLOWUP_THRESHOLD and question_rounds < max_rounds:
-            prediction = self.followup_module(
-                patient_message=full_text,
-                missing_categories=", ".join(missing),
-            )
-            return {"action": "ask", "questions": prediction.follow_up_questions}
+            try:
+                annotate_request(action="ask")
+                current_span().set_attribute("action", "ask")
+                prediction = self.followup_module(
+                    patient_message=full_text,
+                    missing_categories=", ".join(missing),
+                )
+                return {
+                    "action": "ask",
+                    "questions": prediction.follow_up_questions,
+                    "missing_info": missing,
+                }
+            except CircuitOpenError:
+                # LM unavailable: skip questions and triage conservatively
+                current_span().set_attribute("circuit_open", True)
+            except Exception as e:
+                # The breaker wrapper has already counted the failed LM call;
+                # triage with what is known rather than failing the turn
+                current_span().set_attribute("lm_error", type(e).__name__)
 
         # Otherwise triage with what we have
-        result = self.triage(symptoms, conversation_history=conversation_history)
-        return {"action": "triage", "result": result}
+        annotate_request(action="triage")
+        current_span().set_attribute("action", "triage")
+        return {"action": "triage", "missing_info": missing}
 
+    @traced("agent.triage")
+    @profiled("agent.triage")
     def triage(
-        self, symptoms: str, conversation_history: List[str] = None
+        self, symptoms: str, conversation_history: Optional[List[str]] = None
     ) -> dspy.Prediction:
         """
         Perform triage on patient symptoms.
 
+        Under a request deadline (see stcc_triage.lm.request_deadline) the
+        richest strategy expected to fit is used: ChainOfThought, direct
+        Predict, or the rule engine once the LM cannot answer in time.
+        LM errors and an open circuit breaker also fall back to the rules.
+
         Args:
             symptoms: Patient symptom description (natural language)
             conversation_history: Previous patient messages for context
@@ -141,24 +299,157 @@ class STCCTriageAgent:
             DSPy Prediction with:
                 - triage_level: Emergency/Urgent/Moderate/Home Care
                 - clinical_justification: Reasoning
-                - rationale: Chain-of-thought steps (added by ChainOfThought)
+                - reasoning: Chain-of-thought steps (added by ChainOfThought)
+                - degraded: True if the rule-based fallback was used
+                - quality_mode: "full", "fast" (direct Predict under load) or "rules"
         """
         # Build context from conversation history
-        if conversation_history:
-            context = "Patient Conversation:\n"
-            for i, msg in enumerate(conversation_history, 1):
-                context += f"Message {i}: {msg}\n"
-            context += f"Latest message: {symptoms}"
-            symptoms = context
+        symptoms = self._build_conversation(symptoms, conversation_history)
+        if deadline_expired():
+            return self.fallback_triage(symptoms)
 
         # Add protocol context to symptoms
         enhanced_prompt = self._add_protocol_context(symptoms)
 
-        # Run ChainOfThought reasoning
-        prediction = self.triage_module(symptoms=enhanced_prompt)
-
+        # Run ChainOfThought reasoning (suspected red flags jump the LM queue)
+        with stage("red_flags"):
+            suspected = bool(self.rules.red_flags(symptoms))
+        span = current_span()
+        try:
+            mode, module, config = self._select_module(suspected)
+        except Exception as e:
+            # A failing load controller must not fail the request
+            span.set_attribute("quality_error", type(e).__name__)
+            return self.fallback_triage(symptoms)
+        span.set_attributes(
+            history_messages=len(conversation_history or []),
+            red_flag_suspected=suspected,
+            quality_mode=mode.value,
+        )
+        if module is None:
+            return self.fallback_triage(symptoms)
+        kwargs = {"config": config} if config else {}
+        start = time.perf_counter()
+        try:
+            with red_flag_priority(suspected):
+                prediction = module(symptoms=enhanced_prompt, **kwargs)
+        except CircuitOpenError:
+            span.set_attribute("circuit_open", True)
+            return self.fallback_triage(symptoms)
+        except Exception as e:
+            # The breaker wrapper has already counted the failed LM call
+            if deadline_expired():
+                span.set_attribute("deadline_exceeded", True)
+            else:
+                span.set_attribute("lm_error", type(e).__name__)
+            return self.fallback_triage(symptoms)
+
+        self._record_mode(prediction, mode, time.perf_counter() - start)
+        span.set_attribute("triage_level", prediction.triage_level)
         return prediction
 
+    @staticmethod
+    def _record_mode(prediction: dspy.Prediction, mode: QualityMode, seconds: Optional[float] = None):
+        """Tag a prediction with its quality mode and feed the load controller."""
+        quality = get_quality_controller()
+        if seconds is not None:
+            quality.record(mode, seconds)
+        quality.count(mode)
+        prediction.quality_mode = mode.value
+
+    async def stream_triage(
+        self, symptoms: str, conversation_history: Optional[List[str]] = None
+    ) -> AsyncIterator:
+        """
+        Perform triage, streaming output fields while the LM generates them.
+
+        Same pipeline as triage(). Fields arrive in generation order
+        (reasoning, triage_level, clinical_justification). LMs that cannot
+        stream (or cache hits) yield only the final prediction.
+
+        Args:
+            symptoms: Patient symptom description (natural language)
+            conversation_history: Previous patient messages for context
+
+        Yields:
+            (field_name, text) chunks, then the final dspy.Prediction
+            (rule-based and degraded if the LM failed or the breaker is open)
+        """
+        symptoms = self._build_conversation(symptoms, conversation_history)
+        if deadline_expired():
+            yield self.fallback_triage(symptoms)
+            return
+        enhanced_prompt = self._add_protocol_context(symptoms)
+
+        with stage("red_flags"):
+            suspected = bool(self.rules.red_flags(symptoms))
+        try:
+            mode, module, config = self._select_module(suspected)
+        except Exception as e:
+            current_span().set_attribute("quality_error", type(e).__name__)
+            module = None
+        if module is None:
+            yield self.fallback_triage(symptoms)
+            return
+        # Fast mode answers directly, so there is no reasoning field to stream
+        fields = STREAM_FIELDS if mode == QualityMode.FULL else STREAM_FIELDS[1:]
+        listeners = [StreamListener(signature_field_name=name) for name in fields]
+        program = dspy.streamify(
+            module,
+            stream_listeners=listeners,
+            include_final_prediction_in_output_stream=True,
+        )
+        kwargs = {"config": config} if config else {}
+        start = time.perf_counter()
+        try:
+            with red_flag_priority(suspected):
+                async for value in program(symptoms=enhanced_prompt, **kwargs):
+                    if isinstance(value, StreamResponse):
+                        if value.chunk:
+                            yield value.signature_field_name, value.chunk
+                    elif isinstance(value, dspy.Prediction):
+                        self._record_mode(value, mode, time.perf_counter() - start)
+                        yield value
+        except Exception:
+            # Open breaker, LM error or missed deadline: answer from the rules
+            yield self.fallback_triage(symptoms)
+
+    @traced("agent.fallback_triage")
+    def fallback_triage(
+        self, symptoms: str, conversation_history: Optional[List[str]] = None
+    ) -> dspy.Prediction:
+        """
+        Perform conservative rule-based triage without calling the LM.
+
+        Args:
+            symptoms: Patient symptom description
+            conversation_history: Previous patient messages for context
+
+        Returns:
+            DSPy Prediction flagged with degraded=True
+        """
+        annotate_request(degraded=True)
+        with stage("rules"):
+            result = self.rules.triage(
+                self._build_conversation(symptoms, conversation_history)
+            )
+        self._record_mode(result, QualityMode.RULES)
+        current_span().set_attribute("triage_level", result.triage_level)
+        return result
+
+    @staticmethod
+    def _build_conversation(symptoms: str, conversation_history: Optional[List[str]] = None) -> str:
+        """Combine conversation history and the latest message into one text."""
+        if not conversation_history:
+            return symptoms
+
+        context = "Patient Conversation:\n"
+        for i, msg in enumerate(conversation_history, 1):
+            context += f"Message {i}: {msg}\n"
+        context += f"Latest message: {symptoms}"
+        return context
+
+    @profiled("agent.add_protocol_context")
     def _add_protocol_context(self, symptoms: str) -> str:
         """
         Add relevant STCC protocol context to symptoms.
@@ -173,16 +464,39 @@ class STCCTriageAgent:
             Enhanced prompt with relevant protocol context
         """
         # Extract keywords from symptoms
-        keywords = self._extract_keywords(symptoms)
+        with stage("keywords"):
+            keywords = self._extract_keywords(symptoms)
 
         # Find matching protocols
-        relevant_protocols = []
-        for protocol in self.protocols:
-            protocol_name_lower = protocol["protocol_name"].lower()
-            if any(kw in protocol_name_lower for kw in keywords):
-                relevant_protocols.append(protocol)
+        with stage("retrieval"):
+            relevant_protocols = []
+            for protocol in self.protocols:
+                protocol_name_lower = protocol["protocol_name"].lower()
+                if any(kw in protocol_name_lower for kw in keywords):
+                    relevant_protocols.append(protocol)
+
+        with stage("prompt"):
+            prompt = self._build_prompt(symptoms, relevant_protocols)
+
+        current_span().set_attributes(
+            keywords=", ".join(keywords),
+            protocols_matched=len(relevant_protocols),
+            prompt_chars=len(prompt),
+        )
+        return prompt
 
-        # Build enhanced prompt
+    @staticmethod
+    def _build_prompt(symptoms: str, relevant_protocols: List[dict]) -> str:
+        """
+        Build the enhanced prompt from symptoms and matched protocols.
+
+        Args:
+            symptoms: Raw patient symptom description
+            relevant_protocols: Protocols whose names match the symptom keywords
+
+        Returns:
+            Enhanced prompt with relevant protocol context
+        """
         context = f"Patient Presentation:\n{symptoms}\n\n"
 
         if relevant_protocols:
@@ -249,20 +563,21 @@ class STCCTriageAgent:
         return keywords if keywords else ["general"]
 
     @staticmethod
-    def _find_missing_info(text: str) -> List[str]:
+    def _find_missing_info(text: str, categories: Optional[List[str]] = None) -> List[str]:
         """
         Check which critical info categories are missing from text.
 
         Args:
             text: Combined patient messages
+            categories: Only check these categories (default: all)
 
         Returns:
             List of missing category names
         """
         text_lower = text.lower()
         missing = []
-        for category, keywords in _INFO_KEYWORDS.items():
-            if not any(kw in text_lower for kw in keywords):
+        for category in categories if categories is not None else _INFO_KEYWORDS:
+            if not any(kw in text_lower for kw in _INFO_KEYWORDS[category]):
                 missing.append(category)
         return missing
 
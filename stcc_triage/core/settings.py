@@ -4,6 +4,8 @@ DeepSeek Configuration Settings.
 Environment-based configuration for DeepSeek API with python-dotenv.
 """
 
+from typing import Optional
+
 from dotenv import load_dotenv
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -27,6 +29,103 @@ class DeepSeekConfig(BaseSettings):
         extra = "ignore"  # Allow extra fields from .env
 
 
+class LMCallConfig(BaseSettings):
+    """LM call-layer tuning (timeouts, rate limits, hedging, circuit breaker, adaptive quality, pricing) from environment variables."""
+
+    timeout: float = Field(default=30.0, alias="STCC_LM_TIMEOUT")
+    cache: bool = Field(default=True, alias="STCC_LM_CACHE")
+
+    requests_per_minute: float = Field(default=0, alias="STCC_LM_RPM")
+    tokens_per_minute: float = Field(default=0, alias="STCC_LM_TPM")
+    rate_limit_dir: Optional[str] = Field(default=None, alias="STCC_LM_RATE_LIMIT_DIR")
+    hedge_enabled: bool = Field(default=False, alias="STCC_LM_HEDGE")
+    hedge_percentile: float = Field(default=95.0, alias="STCC_LM_HEDGE_PERCENTILE")
+    hedge_initial_delay: float = Field(
+        default=2.0, alias="STCC_LM_HEDGE_INITIAL_DELAY"
+    )
+    hedge_min_delay: float = Field(default=0.2, alias="STCC_LM_HEDGE_MIN_DELAY")
+    hedge_max_delay: float = Field(default=10.0, alias="STCC_LM_HEDGE_MAX_DELAY")
+    breaker_enabled: bool = Field(default=True, alias="STCC_LM_BREAKER")
+    breaker_failure_threshold: int = Field(
+        default=5, alias="STCC_LM_BREAKER_FAILURES"
+    )
+    breaker_reset_timeout: float = Field(
+        default=30.0, alias="STCC_LM_BREAKER_RESET"
+    )
+    adaptive_enabled: bool = Field(default=False, alias="STCC_LM_ADAPTIVE")
+    adaptive_queue: int = Field(default=8, alias="STCC_LM_ADAPTIVE_QUEUE")
+    adaptive_latency: float = Field(default=8.0, alias="STCC_LM_ADAPTIVE_LATENCY")
+    adaptive_hold: float = Field(default=30.0, alias="STCC_LM_ADAPTIVE_HOLD")
+    fast_max_tokens: int = Field(default=512, alias="STCC_LM_FAST_MAX_TOKENS")
+    # USD per million tokens (DeepSeek-chat list prices)
+    price_prompt: float = Field(default=0.27, alias="STCC_LM_PRICE_PROMPT")
+    price_cached_prompt: float = Field(
+        default=0.07, alias="STCC_LM_PRICE_CACHED_PROMPT"
+    )
+    price_completion: float = Field(
+        default=1.10, alias="STCC_LM_PRICE_COMPLETION"
+    )
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
+class APIConfig(BaseSettings):
+    """FastAPI service tuning from environment variables."""
+
+    triage_timeout: float = Field(default=45.0, alias="STCC_API_TRIAGE_TIMEOUT")
+    specialized_timeout: float = Field(
+        default=45.0, alias="STCC_API_SPECIALIZED_TIMEOUT"
+    )
+    prewarm: bool = Field(default=True, alias="STCC_API_PREWARM")
+    max_inflight: int = Field(default=32, alias="STCC_API_MAX_INFLIGHT")
+    max_queue: int = Field(default=128, alias="STCC_API_MAX_QUEUE")
+    queue_timeout: float = Field(default=10.0, alias="STCC_API_QUEUE_TIMEOUT")
+    overload_policy: str = Field(default="reject", alias="STCC_API_OVERLOAD_POLICY")
+    batch_max_size: int = Field(default=100, alias="STCC_API_BATCH_MAX_SIZE")
+    batch_concurrency: int = Field(default=8, alias="STCC_API_BATCH_CONCURRENCY")
+    jobs_db: Optional[str] = Field(default=None, alias="STCC_API_JOBS_DB")
+    jobs_workers: int = Field(default=2, alias="STCC_API_JOBS_WORKERS")
+    jobs_max_items: int = Field(default=10000, alias="STCC_API_JOBS_MAX_ITEMS")
+    jobs_max_attempts: int = Field(default=3, alias="STCC_API_JOBS_MAX_ATTEMPTS")
+    session_ttl: float = Field(default=1800.0, alias="STCC_API_SESSION_TTL")
+    session_max: int = Field(default=10000, alias="STCC_API_SESSION_MAX")
+    session_max_messages: int = Field(default=20, alias="STCC_API_SESSION_MAX_MESSAGES")
+    session_spill: Optional[str] = Field(default=None, alias="STCC_API_SESSION_SPILL")
+    ws_idle_timeout: float = Field(default=300.0, alias="STCC_API_WS_IDLE_TIMEOUT")
+    ws_send_timeout: float = Field(default=30.0, alias="STCC_API_WS_SEND_TIMEOUT")
+    idempotency_ttl: float = Field(default=3600.0, alias="STCC_API_IDEMPOTENCY_TTL")
+    idempotency_max: int = Field(default=10000, alias="STCC_API_IDEMPOTENCY_MAX")
+    idempotency_wait: float = Field(default=60.0, alias="STCC_API_IDEMPOTENCY_WAIT")
+    protocols_max_age: int = Field(default=0, alias="STCC_API_PROTOCOLS_MAX_AGE")
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
+class TelemetryConfig(BaseSettings):
+    """Tracing, profiling and instrumentation settings from environment variables."""
+
+    trace_exporter: str = Field(default="none", alias="STCC_TRACE")
+    trace_file: Optional[str] = Field(default=None, alias="STCC_TRACE_FILE")
+    profile_mode: str = Field(default="off", alias="STCC_PROFILE")
+    profile_targets: str = Field(default="", alias="STCC_PROFILE_TARGETS")
+    profiler: str = Field(default="cprofile", alias="STCC_PROFILER")
+    profile_max_per_minute: float = Field(
+        default=6, alias="STCC_PROFILE_MAX_PER_MINUTE"
+    )
+    profile_dir: Optional[str] = Field(default=None, alias="STCC_PROFILE_DIR")
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
 def get_deepseek_config():
     """
     Get configured DeepSeek LM for DSPy.
@@ -42,14 +141,80 @@ def get_deepseek_config():
         )
 
     config = DeepSeekConfig()
+    call_config = LMCallConfig()
 
     # Configure DeepSeek as OpenAI-compatible endpoint
-    lm = dspy.LM(
-        model=f"openai/{config.model}",
-        api_key=config.api_key,
-        api_base=config.base_url,
+    if config.base_url.startswith("stub://"):
+        # Offline in-process stand-in for load and latency testing
+        from stcc_triage.lm.stub_lm import StubLM
+
+        lm = StubLM.from_url(config.base_url)
+    else:
+        lm = dspy.LM(
+            model=f"openai/{config.model}",
+            api_key=config.api_key,
+            api_base=config.base_url,
+            timeout=call_config.timeout,
+            cache=call_config.cache,
+        )
+
+    # Count tokens on the innermost LM so hedged duplicates are included
+    from stcc_triage.lm.usage import Pricing, UsageTrackingLM
+
+    lm = UsageTrackingLM(
+        lm,
+        Pricing(
+            prompt_per_million=call_config.price_prompt,
+            completion_per_million=call_config.price_completion,
+            cached_prompt_per_million=call_config.price_cached_prompt,
+        ),
     )
 
+    # Wrap the LM with optional call-layer features
+    if call_config.requests_per_minute or call_config.tokens_per_minute:
+        from stcc_triage.lm.scheduler import (
+            RateLimitedLM,
+            configure_rate_limit_scheduler,
+            get_rate_limit_scheduler,
+        )
+
+        scheduler = get_rate_limit_scheduler()
+        if scheduler is None:
+            scheduler = configure_rate_limit_scheduler(
+                requests_per_minute=call_config.requests_per_minute,
+                tokens_per_minute=call_config.tokens_per_minute,
+                state_dir=call_config.rate_limit_dir,
+            )
+        lm = RateLimitedLM(lm, scheduler)
+
+    if call_config.hedge_enabled:
+        from stcc_triage.lm.hedging import HedgedLM
+
+        lm = HedgedLM(
+            lm,
+            percentile=call_config.hedge_percentile,
+            initial_delay=call_config.hedge_initial_delay,
+            min_delay=call_config.hedge_min_delay,
+            max_delay=call_config.hedge_max_delay,
+        )
+
+    if call_config.breaker_enabled:
+        from stcc_triage.lm.breaker import CircuitBreakerLM, get_circuit_breaker
+
+        breaker = get_circuit_breaker()
+        breaker.failure_threshold = call_config.breaker_failure_threshold
+        breaker.reset_timeout = call_config.breaker_reset_timeout
+        lm = CircuitBreakerLM(lm, breaker)
+
+    from stcc_triage.lm.quality import get_quality_controller
+
+    quality = get_quality_controller()
+    quality.enabled = call_config.adaptive_enabled
+    quality.queue_high = call_config.adaptive_queue
+    quality.latency_high = call_config.adaptive_latency
+    quality.hold_seconds = call_config.adaptive_hold
+    quality.fast_max_tokens = call_config.fast_max_tokens
+
     # Return a simple object with both the LM and config
     class ConfiguredLM:
         def __init__(self, lm, config):
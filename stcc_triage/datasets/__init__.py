@@ -1,10 +1,24 @@
 """Dataset generation and management."""
 
-from .schema import PatientCase
-from .generator import generate_specialized_dataset, generate_all_specialized_datasets
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .schema import PatientCase
+    from .generator import generate_specialized_dataset, generate_all_specialized_datasets
 
 __all__ = [
     "PatientCase",
     "generate_specialized_dataset",
     "generate_all_specialized_datasets",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "PatientCase": ".schema",
+        "generate_specialized_dataset": ".generator",
+        "generate_all_specialized_datasets": ".generator",
+    },
+)
@@ -23,8 +23,10 @@ from stcc_triage.datasets.cases import (
     RESPIRATORY_CASES,
 )
 from stcc_triage.core.paths import get_datasets_dir
+from stcc_triage.telemetry.tracing import current_span, traced
 
 
+@traced("datasets.generate")
 def generate_specialized_dataset(
     role: NurseRole, output_dir: Path = None
 ) -> List[PatientCase]:
@@ -83,6 +85,8 @@ def generate_specialized_dataset(
     if output_dir is None:
         output_dir = get_datasets_dir()
 
+    current_span().set_attributes(role=role.value, cases=len(cases))
+
     output_file = output_dir / f"cases_{role.value}.json"
     output_dir.mkdir(exist_ok=True, parents=True)
 
@@ -0,0 +1,99 @@
+"""LM call layer: wrappers around the DeepSeek DSPy LM."""
+
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .breaker import CircuitBreaker, CircuitBreakerLM, CircuitOpenError, get_circuit_breaker
+    from .deadline import request_deadline
+    from .hedging import HedgedLM, HedgingStats, get_hedging_stats
+    from .quality import QualityController, QualityMode, get_quality_controller
+    from .scheduler import (
+        Lane,
+        RateLimitedLM,
+        RateLimitScheduler,
+        configure_rate_limit_scheduler,
+        current_lane,
+        get_rate_limit_scheduler,
+        lm_lane,
+        red_flag_priority,
+    )
+    from .stub import StubResponder, create_stub_server
+    from .stub_lm import StubLM
+    from .usage import (
+        Pricing,
+        UsageLedger,
+        UsageTotals,
+        UsageTrackingLM,
+        extract_usage,
+        get_usage_ledger,
+        track_usage,
+    )
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitBreakerLM",
+    "CircuitOpenError",
+    "get_circuit_breaker",
+    "request_deadline",
+    "HedgedLM",
+    "HedgingStats",
+    "get_hedging_stats",
+    "QualityController",
+    "QualityMode",
+    "get_quality_controller",
+    "Lane",
+    "RateLimitedLM",
+    "RateLimitScheduler",
+    "configure_rate_limit_scheduler",
+    "current_lane",
+    "get_rate_limit_scheduler",
+    "lm_lane",
+    "red_flag_priority",
+    "StubResponder",
+    "create_stub_server",
+    "StubLM",
+    "Pricing",
+    "UsageLedger",
+    "UsageTotals",
+    "UsageTrackingLM",
+    "extract_usage",
+    "get_usage_ledger",
+    "track_usage",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "CircuitBreaker": ".breaker",
+        "CircuitBreakerLM": ".breaker",
+        "CircuitOpenError": ".breaker",
+        "get_circuit_breaker": ".breaker",
+        "request_deadline": ".deadline",
+        "HedgedLM": ".hedging",
+        "HedgingStats": ".hedging",
+        "get_hedging_stats": ".hedging",
+        "QualityController": ".quality",
+        "QualityMode": ".quality",
+        "get_quality_controller": ".quality",
+        "Lane": ".scheduler",
+        "RateLimitedLM": ".scheduler",
+        "RateLimitScheduler": ".scheduler",
+        "configure_rate_limit_scheduler": ".scheduler",
+        "current_lane": ".scheduler",
+        "get_rate_limit_scheduler": ".scheduler",
+        "lm_lane": ".scheduler",
+        "red_flag_priority": ".scheduler",
+        "StubResponder": ".stub",
+        "create_stub_server": ".stub",
+        "StubLM": ".stub_lm",
+        "Pricing": ".usage",
+        "UsageLedger": ".usage",
+        "UsageTotals": ".usage",
+        "UsageTrackingLM": ".usage",
+        "extract_usage": ".usage",
+        "get_usage_ledger": ".usage",
+        "track_usage": ".usage",
+    },
+)
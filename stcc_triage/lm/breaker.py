@@ -0,0 +1,187 @@
+"""
+Circuit Breaker for LM Calls.
+
+Stops sending requests to DeepSeek while it is failing, so callers can
+switch to the rule-based fallback in milliseconds instead of timing out.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional, TypedDict
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+from stcc_triage.lm.deadline import expired as deadline_expired
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an LM call is refused because the breaker is open."""
+
+
+class BreakerSnapshot(TypedDict):
+    """Breaker state and counters."""
+
+    state: str
+    consecutive_failures: int
+    times_opened: int
+    rejected: int
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open circuit breaker.
+
+    - closed: calls pass; consecutive failures are counted
+    - open: calls are refused until reset_timeout has elapsed
+    - half_open: one probe call passes; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before allowing a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._reset_elapsed():
+                return self.HALF_OPEN
+            return self._state
+
+    def _reset_elapsed(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed (reserving the probe if half-open)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._reset_elapsed():
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Release a reserved probe without counting an outcome (e.g. on cancel)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> BreakerSnapshot:
+        """Export breaker state and counters."""
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+# Shared so every agent in the process sees the same DeepSeek health
+_circuit_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide LM circuit breaker."""
+    return _circuit_breaker
+
+
+class CircuitBreakerLM(dspy.BaseLM):
+    """DSPy LM wrapper that fails fast with CircuitOpenError while open."""
+
+    def __init__(self, lm: dspy.BaseLM, breaker: Optional[CircuitBreaker] = None):
+        """
+        Wrap an LM with a circuit breaker.
+
+        Args:
+            lm: The underlying DSPy LM
+            breaker: Breaker to use (default: process-wide breaker)
+        """
+        super().__init__(
+            model=lm.model,
+            model_type=lm.model_type,
+            cache=False,
+            num_retries=0,
+        )
+        self.lm = lm
+        self.kwargs = dict(lm.kwargs)
+        self.breaker = breaker or get_circuit_breaker()
+
+    def _refuse(self):
+        raise CircuitOpenError(
+            f"LM circuit breaker is open for {self.model}; "
+            f"retrying after {self.breaker.reset_timeout:.0f}s"
+        )
+
+    def _record_failure(self):
+        # A call cut short by the caller's own deadline says nothing about DeepSeek
+        if deadline_expired():
+            self.breaker.release_probe()
+        else:
+            self.breaker.record_failure()
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        if not self.breaker.allow_request():
+            self._refuse()
+        try:
+            response = self.lm.forward(prompt=prompt, messages=messages, **kwargs)
+        except Exception:
+            self._record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        if not self.breaker.allow_request():
+            self._refuse()
+        try:
+            response = await self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self._record_failure()
+            raise
+        self.breaker.record_success()
+        return response
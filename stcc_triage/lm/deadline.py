@@ -0,0 +1,52 @@
+"""
+Per-Request Deadlines.
+
+A caller-supplied time budget carried in a context variable, so retrieval,
+strategy selection, LM calls and fallbacks made for one request all see
+how much time is left without threading it through every signature.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "stcc_deadline", default=None
+)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """
+    Run the block under a deadline `seconds` from now (None = no deadline).
+
+    A nested deadline never extends an outer one.
+
+    Example:
+        with request_deadline(2.5):
+            agent.triage("chest pain")
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (None without one, never negative)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    """True if the current context has a deadline and it has passed."""
+    return remaining() == 0.0
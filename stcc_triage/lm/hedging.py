@@ -0,0 +1,278 @@
+"""
+Hedged LM Requests.
+
+Cuts DeepSeek tail latency by sending one duplicate request when the first
+has not returned within a delay learned from recent latencies.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Deque, Iterable, Optional, TypedDict
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+
+def latency_percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of a sample.
+
+    Args:
+        values: Latency samples in seconds
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile value, or None for an empty sample
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class HedgingSnapshot(TypedDict):
+    """Hedging counters and p99 latencies (seconds; None without samples)."""
+
+    calls: int
+    hedges: int
+    hedge_wins: int
+    hedge_rate: float
+    p99_primary_seconds: Optional[float]
+    p99_effective_seconds: Optional[float]
+    p99_improvement_seconds: Optional[float]
+
+
+class HedgingStats:
+    """
+    Thread-safe counters and latency windows for hedged LM calls.
+
+    Primary latencies are recorded even when the duplicate wins, so they
+    describe what callers would have seen without hedging. A primary
+    cancelled by a winning duplicate (async path) is recorded at its
+    elapsed time, a lower bound on its true latency. The hedge delay is
+    learned from the same window.
+    """
+
+    def __init__(self, window: int = 500):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.primary_latencies: Deque[float] = deque(maxlen=window)
+        self.effective_latencies: Deque[float] = deque(maxlen=window)
+
+    def record_primary(self, latency: float):
+        with self._lock:
+            self.primary_latencies.append(latency)
+
+    def record_call(self, latency: float, hedged: bool, hedge_won: bool):
+        with self._lock:
+            self.calls += 1
+            self.hedges += int(hedged)
+            self.hedge_wins += int(hedge_won)
+            self.effective_latencies.append(latency)
+
+    def primary_percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self.primary_latencies)
+        return latency_percentile(samples, pct)
+
+    def snapshot(self) -> HedgingSnapshot:
+        """
+        Export hedging metrics.
+
+        Returns:
+            Dict with call and hedge counts, hedge rate, p99 latency with and
+            without hedging (seconds) and the p99 improvement
+        """
+        with self._lock:
+            primary = list(self.primary_latencies)
+            effective = list(self.effective_latencies)
+            calls, hedges, wins = self.calls, self.hedges, self.hedge_wins
+
+        p99_primary = latency_percentile(primary, 99)
+        p99_effective = latency_percentile(effective, 99)
+        improvement = None
+        if p99_primary is not None and p99_effective is not None:
+            improvement = p99_primary - p99_effective
+
+        return {
+            "calls": calls,
+            "hedges": hedges,
+            "hedge_wins": wins,
+            "hedge_rate": hedges / calls if calls else 0.0,
+            "p99_primary_seconds": p99_primary,
+            "p99_effective_seconds": p99_effective,
+            "p99_improvement_seconds": improvement,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.hedges = self.hedge_wins = 0
+            self.primary_latencies.clear()
+            self.effective_latencies.clear()
+
+
+# Shared across every HedgedLM so metrics survive agent re-initialization
+_hedging_stats = HedgingStats()
+
+
+def get_hedging_stats() -> HedgingStats:
+    """Get the process-wide hedging statistics."""
+    return _hedging_stats
+
+
+class HedgedLM(dspy.BaseLM):
+    """
+    DSPy LM wrapper that hedges slow requests.
+
+    If the first request has not returned within the learned delay (the
+    configured percentile of recent primary latencies), one duplicate is sent.
+    Whichever finishes first wins and the other is cancelled. A request that
+    fails is never preferred over one that is still running. Streamed calls
+    (inside dspy.streamify) are passed through unhedged: their chunks must
+    come from one request, sent from the caller's own worker thread.
+    """
+
+    def __init__(
+        self,
+        lm: dspy.BaseLM,
+        percentile: float = 95.0,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.2,
+        max_delay: float = 10.0,
+        min_samples: int = 20,
+        max_workers: int = 32,
+        stats: Optional[HedgingStats] = None,
+    ):
+        """
+        Wrap an LM with request hedging.
+
+        Args:
+            lm: The underlying DSPy LM (e.g. DeepSeek via dspy.LM)
+            percentile: Latency percentile used as the hedge delay
+            initial_delay: Delay in seconds until min_samples are observed
+            min_delay: Lower bound on the hedge delay in seconds
+            max_delay: Upper bound on the hedge delay in seconds
+            min_samples: Latency samples needed before the delay is learned
+            max_workers: Thread pool size for in-flight requests
+            stats: Statistics sink (default: process-wide stats)
+        """
+        super().__init__(
+            model=lm.model,
+            model_type=lm.model_type,
+            cache=False,
+            num_retries=0,
+        )
+        self.lm = lm
+        self.kwargs = dict(lm.kwargs)
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.stats = stats or get_hedging_stats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="stcc-hedge"
+        )
+
+    def hedge_delay(self) -> float:
+        """Current hedge delay in seconds."""
+        if len(self.stats.primary_latencies) < self.min_samples:
+            return self.initial_delay
+        delay = self.stats.primary_percentile(self.percentile)
+        if delay is None:
+            return self.initial_delay
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def _primary_recorder(self, start: float):
+        def record(future):
+            # Cancelled primaries still count (censored at their elapsed
+            # time) so the slow calls that caused hedging stay in the tail
+            self.stats.record_primary(time.perf_counter() - start)
+
+        return record
+
+    def _submit(self, prompt, messages, kwargs):
+        # Copy the caller's context so dspy.context() overrides and request
+        # scoped context variables follow the call into the worker thread
+        ctx = contextvars.copy_context()
+        return self._executor.submit(
+            ctx.run, self.lm.forward, prompt=prompt, messages=messages, **kwargs
+        )
+
+    @staticmethod
+    def _streaming() -> bool:
+        return dspy.settings.send_stream is not None
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        if self._streaming():
+            return self.lm.forward(prompt=prompt, messages=messages, **kwargs)
+        start = time.perf_counter()
+        delay = self.hedge_delay()
+
+        primary = self._submit(prompt, messages, kwargs)
+        primary.add_done_callback(self._primary_recorder(start))
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            self.stats.record_call(time.perf_counter() - start, False, False)
+            return primary.result()
+
+        hedge = self._submit(prompt, messages, kwargs)
+        pending = {primary, hedge}
+        winner = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [f for f in done if f.exception() is None]
+            if succeeded or not pending:
+                winner = succeeded[0] if succeeded else next(iter(done))
+                break
+
+        for future in pending:
+            # Running threads cannot be interrupted; their result is discarded
+            future.cancel()
+
+        self.stats.record_call(time.perf_counter() - start, True, winner is hedge)
+        return winner.result()
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        if self._streaming():
+            return await self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        start = time.perf_counter()
+        delay = self.hedge_delay()
+
+        primary = asyncio.ensure_future(
+            self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        )
+        primary.add_done_callback(self._primary_recorder(start))
+
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done:
+            self.stats.record_call(time.perf_counter() - start, False, False)
+            return primary.result()
+
+        hedge = asyncio.ensure_future(
+            self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        )
+        pending = {primary, hedge}
+        winner = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [f for f in done if f.exception() is None]
+            if succeeded or not pending:
+                winner = succeeded[0] if succeeded else next(iter(done))
+                break
+
+        for task in pending:
+            task.cancel()
+
+        self.stats.record_call(time.perf_counter() - start, True, winner is hedge)
+        return winner.result()
@@ -0,0 +1,203 @@
+"""
+Load-Adaptive Triage Quality.
+
+Under load, full ChainOfThought triage (a rationale before every answer)
+is what blows latency SLOs. The controller watches the admission queue
+and recent full-mode LM latency. Under pressure it sends requests without
+suspected red flags down a direct Predict path with capped output tokens,
+and switches back once pressure falls. Per-mode latency estimates also
+pick the richest mode that fits a request's deadline.
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional, Tuple, TypedDict
+
+from .hedging import latency_percentile
+
+
+class QualityMode(str, Enum):
+    """How a triage decision was produced (reported in every response)."""
+
+    FULL = "full"  # ChainOfThought: rationale, then answer
+    FAST = "fast"  # Predict: answer directly, capped output tokens
+    RULES = "rules"  # Rule-based fallback, no LM
+
+
+class QualitySnapshot(TypedDict):
+    """Quality mode, pressure signals and decision counts."""
+
+    enabled: bool
+    mode: str
+    queue_depth: int
+    latency_p90_seconds: Optional[float]
+    fast_latency_p90_seconds: Optional[float]
+    switches: int
+    decisions: Dict[str, int]
+
+
+class QualityController:
+    """
+    Chooses the triage mode from queue depth and recent LM latency.
+
+    Pressure starts when the queue reaches queue_high or the p90 of recent
+    full-mode latencies reaches latency_high. It ends once both are back
+    under half of those thresholds (hysteresis). A mode is kept for at
+    least hold_seconds. Only full-mode samples drive pressure, so once fast
+    mode takes over they age out (after sample_ttl) and the controller falls
+    back to full quality when the surge is over. Suspected red flags always
+    get full quality under load (deadlines still apply to them).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        queue_high: int = 8,
+        latency_high: float = 8.0,
+        hold_seconds: float = 30.0,
+        fast_max_tokens: int = 512,
+        window: int = 50,
+        sample_ttl: float = 60.0,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            enabled: Switch modes at all (False always answers in full mode)
+            queue_high: Queued requests that start pressure (0 disables)
+            latency_high: p90 full-mode LM seconds that start pressure (0 disables)
+            hold_seconds: Minimum time between mode switches
+            fast_max_tokens: Output token cap in fast mode (0 = no cap)
+            window: Latency samples kept per mode
+            sample_ttl: Seconds after which a latency sample is ignored
+        """
+        self.enabled = enabled
+        self.queue_high = queue_high
+        self.latency_high = latency_high
+        self.hold_seconds = hold_seconds
+        self.fast_max_tokens = fast_max_tokens
+        self.sample_ttl = sample_ttl
+        self.queue_depth: Callable[[], int] = lambda: 0
+        self._lock = threading.Lock()
+        # (monotonic time, seconds) per finished triage
+        self._samples: Dict[QualityMode, Deque[Tuple[float, float]]] = {
+            mode: deque(maxlen=window) for mode in (QualityMode.FULL, QualityMode.FAST)
+        }
+        self._pressure = False
+        self._switched_at = float("-inf")
+        self.switches = 0
+        self.decisions = {mode.value: 0 for mode in QualityMode}
+
+    def set_queue_source(self, queue_depth: Callable[[], int]):
+        """Set the callable reporting how many requests wait for an LM slot."""
+        self.queue_depth = queue_depth
+
+    def record(self, mode: QualityMode, seconds: float):
+        """Record the LM time of a finished triage in full or fast mode."""
+        if mode in self._samples:
+            with self._lock:
+                self._samples[mode].append((time.monotonic(), seconds))
+
+    def latency_p90(
+        self, mode: QualityMode = QualityMode.FULL, now: Optional[float] = None
+    ) -> Optional[float]:
+        """p90 of recent LM latencies in a mode, or None without fresh samples."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            recent = [s for t, s in self._samples[mode] if now - t <= self.sample_ttl]
+        return latency_percentile(recent, 90)
+
+    def _under_pressure(self, now: float) -> bool:
+        if now - self._switched_at < self.hold_seconds:
+            return self._pressure
+        depth = self.queue_depth()
+        p90 = self.latency_p90(QualityMode.FULL, now) or 0.0
+        enter = (self.queue_high > 0 and depth >= self.queue_high) or (
+            self.latency_high > 0 and p90 >= self.latency_high
+        )
+        stay = (self.queue_high > 0 and depth >= self.queue_high / 2) or (
+            self.latency_high > 0 and p90 >= self.latency_high / 2
+        )
+        with self._lock:
+            if now - self._switched_at >= self.hold_seconds and (
+                enter if not self._pressure else not stay
+            ):
+                self._pressure = not self._pressure
+                self._switched_at = now
+                self.switches += 1
+            return self._pressure
+
+    def choose(self, red_flag: bool = False) -> QualityMode:
+        """
+        Pick the mode for one triage call.
+
+        Args:
+            red_flag: True if rule-based screening suspects a red flag
+
+        Returns:
+            QualityMode.FAST under pressure for non-red-flag requests, else FULL
+        """
+        mode = QualityMode.FULL
+        if self.enabled and not red_flag and self._under_pressure(time.monotonic()):
+            mode = QualityMode.FAST
+        return mode
+
+    def fit(self, mode: QualityMode, budget: float) -> QualityMode:
+        """
+        Downgrade a mode until it is expected to finish within a time budget.
+
+        Modes without recent samples are assumed to fit; the LM timeout
+        and rule-based fallback cover a wrong guess.
+
+        Args:
+            mode: Mode chosen from load (full or fast)
+            budget: Seconds left before the request's deadline
+
+        Returns:
+            The richest mode, no richer than `mode`, whose p90 fits the budget
+        """
+        if budget <= 0:
+            return QualityMode.RULES
+        candidates = [QualityMode.FULL, QualityMode.FAST]
+        for candidate in candidates[candidates.index(mode):]:
+            expected = self.latency_p90(candidate)
+            if expected is None or expected <= budget:
+                return candidate
+        return QualityMode.RULES
+
+    def count(self, mode: QualityMode):
+        """Count a triage answered in the given mode."""
+        with self._lock:
+            self.decisions[mode.value] += 1
+
+    def snapshot(self) -> QualitySnapshot:
+        """Current mode, pressure signals and decision counts."""
+        return {
+            "enabled": self.enabled,
+            "mode": (QualityMode.FAST if self._pressure else QualityMode.FULL).value,
+            "queue_depth": self.queue_depth(),
+            "latency_p90_seconds": self.latency_p90(QualityMode.FULL),
+            "fast_latency_p90_seconds": self.latency_p90(QualityMode.FAST),
+            "switches": self.switches,
+            "decisions": dict(self.decisions),
+        }
+
+    def reset(self):
+        with self._lock:
+            for samples in self._samples.values():
+                samples.clear()
+            self._pressure = False
+            self._switched_at = float("-inf")
+            self.switches = 0
+            self.decisions = {mode.value: 0 for mode in QualityMode}
+
+
+# Shared so the API can feed queue depth to every agent's triage calls
+_quality_controller = QualityController()
+
+
+def get_quality_controller() -> QualityController:
+    """Get the process-wide triage quality controller."""
+    return _quality_controller
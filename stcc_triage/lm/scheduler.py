@@ -0,0 +1,360 @@
+"""
+Shared LM Rate Limiter with Priority Lanes.
+
+Token-bucket limits on DeepSeek requests per minute and tokens per minute,
+shared by every process on the host through a file lock. Callers are
+served by lane: suspected red flags first, then live patient triage, then
+batch jobs, then compilation.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, Optional, TypedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process budget
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+from stcc_triage.lm.usage import extract_usage
+
+
+class Lane(IntEnum):
+    """Priority lanes for LM calls (lower value is served first)."""
+
+    RED_FLAG = 0
+    LIVE = 1
+    BATCH = 2
+    COMPILE = 3
+
+
+_current_lane: contextvars.ContextVar[Lane] = contextvars.ContextVar(
+    "stcc_lm_lane", default=Lane.LIVE
+)
+
+
+def current_lane() -> Lane:
+    """Get the lane for LM calls made from the current context."""
+    return _current_lane.get()
+
+
+@contextmanager
+def lm_lane(lane: Lane):
+    """
+    Run LM calls in the block under the given priority lane.
+
+    Example:
+        with lm_lane(Lane.COMPILE):
+            teleprompter.compile(...)
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+@contextmanager
+def red_flag_priority(suspected: bool):
+    """Move live calls to the red-flag lane when red flags are suspected."""
+    if suspected and current_lane() == Lane.LIVE:
+        with lm_lane(Lane.RED_FLAG):
+            yield
+    else:
+        yield
+
+
+class RateLimitSnapshot(TypedDict):
+    """Remaining budget, waiters and per-lane grants and wait seconds."""
+
+    remaining: Dict[str, float]
+    waiting: Dict[str, int]
+    granted: Dict[str, int]
+    wait_seconds: Dict[str, float]
+
+
+class RateLimitScheduler:
+    """
+    Host-wide token buckets for requests and tokens per minute.
+
+    State lives in a small JSON file guarded by an exclusive flock, so
+    several worker processes draw from one budget. Waiting callers register
+    their lane in the same file; a caller only takes budget when no caller
+    in a higher-priority lane is waiting. Waiter entries expire if their
+    process stops refreshing them.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        state_dir: Optional[Path] = None,
+        poll_interval: float = 0.05,
+        waiter_ttl: float = 5.0,
+        completion_estimate: int = 512,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Request budget per minute (0 = unlimited)
+            tokens_per_minute: Token budget per minute (0 = unlimited)
+            state_dir: Directory for the shared state and lock files
+                (default: user_data/ratelimit/)
+            poll_interval: Maximum sleep between budget checks in seconds
+            waiter_ttl: Seconds before an unrefreshed waiter is dropped
+            completion_estimate: Completion tokens assumed before the response
+        """
+        if state_dir is None:
+            from stcc_triage.core.paths import get_user_data_dir
+            state_dir = get_user_data_dir() / "ratelimit"
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.poll_interval = poll_interval
+        self.waiter_ttl = waiter_ttl
+        self.completion_estimate = completion_estimate
+        self.state_path = state_dir / "buckets.json"
+        self.lock_path = state_dir / "buckets.lock"
+
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.granted = {lane.name.lower(): 0 for lane in Lane}
+        self.wait_seconds = {lane.name.lower(): 0.0 for lane in Lane}
+
+    @contextmanager
+    def _locked_state(self):
+        with self._thread_lock, open(self.lock_path, "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                state = self._read_state()
+                yield state
+                self._write_state(state)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state: dict = json.load(f)
+                return state
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {
+                "requests": self.requests_per_minute,
+                "tokens": self.tokens_per_minute,
+                "updated": time.time(),
+                "waiters": {},
+            }
+
+    def _write_state(self, state: dict):
+        tmp_path = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _refill(self, state: dict, now: float):
+        elapsed = max(0.0, now - state["updated"])
+        state["updated"] = now
+        if self.requests_per_minute:
+            state["requests"] = min(
+                self.requests_per_minute,
+                state["requests"] + elapsed * self.requests_per_minute / 60.0,
+            )
+        if self.tokens_per_minute:
+            state["tokens"] = min(
+                self.tokens_per_minute,
+                state["tokens"] + elapsed * self.tokens_per_minute / 60.0,
+            )
+
+    def _seconds_until_available(self, state: dict, tokens: int) -> float:
+        wait = 0.0
+        if self.requests_per_minute and state["requests"] < 1:
+            wait = max(wait, (1 - state["requests"]) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute and state["tokens"] < tokens:
+            wait = max(wait, (tokens - state["tokens"]) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def estimate_tokens(self, prompt=None, messages=None, max_tokens=None) -> int:
+        """Rough token estimate for a request before it is sent."""
+        text = prompt or ""
+        for message in messages or []:
+            content = message.get("content") if isinstance(message, dict) else None
+            text += content if isinstance(content, str) else json.dumps(content, default=str)
+        return len(text) // 3 + (max_tokens or self.completion_estimate)
+
+    def acquire(self, tokens: int, lane: Optional[Lane] = None) -> float:
+        """
+        Block until one request and `tokens` tokens are available.
+
+        Args:
+            tokens: Estimated tokens for the request
+            lane: Priority lane (default: lane of the current context)
+
+        Returns:
+            Seconds spent waiting
+        """
+        lane = current_lane() if lane is None else lane
+        if self.tokens_per_minute:
+            tokens = int(min(tokens, self.tokens_per_minute))
+        waiter_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        start = time.monotonic()
+
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                self._refill(state, now)
+                waiters = {
+                    key: value
+                    for key, value in state["waiters"].items()
+                    if value[1] > now and key != waiter_id
+                }
+                blocked = any(other_lane < lane for other_lane, _ in waiters.values())
+                wait = self._seconds_until_available(state, tokens)
+
+                if not blocked and wait == 0.0:
+                    if self.requests_per_minute:
+                        state["requests"] -= 1
+                    if self.tokens_per_minute:
+                        state["tokens"] -= tokens
+                    state["waiters"] = waiters
+                    break
+
+                waiters[waiter_id] = [int(lane), now + self.waiter_ttl]
+                state["waiters"] = waiters
+
+            # Jitter so waiting processes do not retry in lockstep
+            sleep = min(wait or self.poll_interval, self.poll_interval)
+            time.sleep(sleep * random.uniform(0.5, 1.0))
+
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self.granted[lane.name.lower()] += 1
+            self.wait_seconds[lane.name.lower()] += waited
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: int, cache_hit: bool = False):
+        """
+        Correct the buckets once the real usage is known.
+
+        Args:
+            estimated_tokens: Tokens reserved by acquire()
+            actual_tokens: Tokens reported by the provider
+            cache_hit: True if the response came from the DSPy cache, in
+                which case the whole reservation is returned
+        """
+        if not cache_hit and (not self.tokens_per_minute or not actual_tokens):
+            return
+        with self._locked_state() as state:
+            self._refill(state, time.time())
+            if cache_hit:
+                if self.requests_per_minute:
+                    state["requests"] = min(self.requests_per_minute, state["requests"] + 1)
+                if self.tokens_per_minute:
+                    state["tokens"] = min(
+                        self.tokens_per_minute, state["tokens"] + estimated_tokens
+                    )
+            else:
+                state["tokens"] -= actual_tokens - estimated_tokens
+
+    def snapshot(self) -> RateLimitSnapshot:
+        """
+        Export remaining budget, waiters and per-lane grants and wait time.
+
+        Read-only: the state file is replaced atomically, so it is read
+        without the flock and the refill is applied to the in-memory copy.
+        """
+        state = self._read_state()
+        now = time.time()
+        self._refill(state, now)
+        waiting = [lane for lane, expires in state["waiters"].values() if expires > now]
+        remaining = {"requests": state["requests"], "tokens": state["tokens"]}
+        with self._stats_lock:
+            return {
+                "remaining": remaining,
+                "waiting": {lane.name.lower(): waiting.count(int(lane)) for lane in Lane},
+                "granted": dict(self.granted),
+                "wait_seconds": dict(self.wait_seconds),
+            }
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+
+
+def get_rate_limit_scheduler() -> Optional[RateLimitScheduler]:
+    """Get the process-wide scheduler (None if rate limiting is disabled)."""
+    return _scheduler
+
+
+def configure_rate_limit_scheduler(**kwargs) -> RateLimitScheduler:
+    """Create (or replace) the process-wide scheduler."""
+    global _scheduler
+    _scheduler = RateLimitScheduler(**kwargs)
+    return _scheduler
+
+
+class RateLimitedLM(dspy.BaseLM):
+    """DSPy LM wrapper that waits for shared rate-limit budget before each call."""
+
+    def __init__(self, lm: dspy.BaseLM, scheduler: RateLimitScheduler):
+        """
+        Wrap an LM with the shared rate limiter.
+
+        Args:
+            lm: The underlying DSPy LM
+            scheduler: Host-wide rate limit scheduler
+        """
+        super().__init__(
+            model=lm.model,
+            model_type=lm.model_type,
+            cache=False,
+            num_retries=0,
+        )
+        self.lm = lm
+        self.kwargs = dict(lm.kwargs)
+        self.scheduler = scheduler
+
+    def _estimate(self, prompt, messages, kwargs) -> int:
+        max_tokens = kwargs.get("max_tokens") or self.kwargs.get("max_tokens")
+        return self.scheduler.estimate_tokens(prompt, messages, max_tokens)
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        estimate = self._estimate(prompt, messages, kwargs)
+        self.scheduler.acquire(estimate)
+        response = self.lm.forward(prompt=prompt, messages=messages, **kwargs)
+        self.scheduler.settle(
+            estimate,
+            extract_usage(response)["total_tokens"],
+            cache_hit=bool(getattr(response, "cache_hit", False)),
+        )
+        return response
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        estimate = self._estimate(prompt, messages, kwargs)
+        lane = current_lane()
+        await asyncio.to_thread(self.scheduler.acquire, estimate, lane)
+        response = await self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        await asyncio.to_thread(
+            self.scheduler.settle,
+            estimate,
+            extract_usage(response)["total_tokens"],
+            bool(getattr(response, "cache_hit", False)),
+        )
+        return response
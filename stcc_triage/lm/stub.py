@@ -0,0 +1,318 @@
+"""
+Offline Stub LM Backend.
+
+A stand-in for DeepSeek for load and latency testing without network
+access or API credits. Available as:
+
+- an OpenAI-compatible HTTP server (`stcc-stub-lm`), used by pointing
+  DEEPSEEK_BASE_URL at it, e.g. http://127.0.0.1:8089/v1
+- an in-process DSPy LM (`StubLM`, in stub_lm), selected with
+  DEEPSEEK_BASE_URL=stub://
+
+Both return well-formed DSPy ChatAdapter output (triage_level,
+clinical_justification, reasoning/rationale, follow_up_questions) with
+configurable latency distributions, error rates and token counts. The
+HTTP server also answers "stream": true requests with word-sized SSE
+chunks spread over the sampled latency.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+_FIELD_MARKER = re.compile(r"`\[\[ ## (\w+) ## \]\]`")
+_OUTPUT_FIELDS = re.compile(r"Your output fields are:\n((?:\d+\. `\w+`.*\n?)+)")
+_FIELD_NAME = re.compile(r"\d+\. `(\w+)`")
+
+
+class StubLMError(RuntimeError):
+    """Injected failure from the stub backend."""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyModel:
+    """
+    Latency distribution parsed from a spec string (milliseconds).
+
+    Specs:
+        constant:200            always 200 ms
+        uniform:100,500         uniform between 100 and 500 ms
+        lognormal:800,0.6       median 800 ms, sigma 0.6 (long tail)
+    """
+
+    def __init__(self, spec: str = "constant:0", rng: Optional[random.Random] = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v.strip()]
+        if kind == "constant" and len(values) == 1:
+            self._sample = lambda: values[0]
+        elif kind == "uniform" and len(values) == 2:
+            self._sample = lambda: self.rng.uniform(values[0], values[1])
+        elif kind == "lognormal" and len(values) == 2:
+            mu = math.log(max(values[0], 1e-6))
+            self._sample = lambda: self.rng.lognormvariate(mu, values[1])
+        else:
+            raise ValueError(
+                f"Invalid latency spec: {spec!r} "
+                "(use constant:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA)"
+            )
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        return max(0.0, self._sample()) / 1000.0
+
+
+class StubResponder:
+    """
+    Builds chat completion responses for DSPy triage and follow-up prompts.
+
+    The triage level comes from the rule-based protocol triage, so answers
+    are stable for a given input and roughly realistic.
+    """
+
+    def __init__(
+        self,
+        latency: str = "constant:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        completion_tokens: Optional[int] = None,
+        seed: Optional[int] = None,
+        model: str = "deepseek-chat",
+    ):
+        """
+        Initialize the responder.
+
+        Args:
+            latency: Latency distribution spec (see LatencyModel)
+            error_rate: Probability of an injected 500 error
+            rate_limit_rate: Probability of an injected 429 error
+            completion_tokens: Reported completion tokens (default: ~chars/4)
+            seed: Random seed for reproducible latency and errors
+            model: Model name reported in responses
+        """
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.completion_tokens = completion_tokens
+        self.model = model
+        self._rules = None
+
+    @property
+    def rules(self):
+        if self._rules is None:
+            from stcc_triage.protocols.context import load_protocols
+            from stcc_triage.protocols.rules import RuleBasedTriage
+            self._rules = RuleBasedTriage(load_protocols())
+        return self._rules
+
+    def draw(self):
+        """Draw (latency seconds, injected error or None) for one request."""
+        with self._rng_lock:
+            latency = self.latency.sample()
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return latency, StubLMError("Rate limit exceeded (stub)", status=429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, StubLMError("Internal server error (stub)", status=500)
+        return latency, None
+
+    @staticmethod
+    def _output_fields(messages: List[Dict]) -> List[str]:
+        user: Dict = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+        fields = [f for f in _FIELD_MARKER.findall(str(user.get("content", ""))) if f != "completed"]
+        if fields:
+            return fields
+        system: Dict = next((m for m in messages if m.get("role") == "system"), {})
+        section = _OUTPUT_FIELDS.search(str(system.get("content", "")))
+        return _FIELD_NAME.findall(section.group(1)) if section else ["output"]
+
+    @staticmethod
+    def _patient_text(messages: List[Dict]) -> str:
+        user: Dict = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+        text = str(user.get("content", ""))
+        # Drop protocol context so red-flag lists in the prompt do not count
+        if "Patient Presentation:" in text:
+            text = text.split("Patient Presentation:", 1)[1]
+        for marker in ("Relevant STCC Protocol", "General Triage Guidelines", "Respond with"):
+            text = text.split(marker, 1)[0]
+        return text
+
+    def _field_value(self, field: str, patient_text: str) -> str:
+        if field == "triage_level":
+            return str(self.rules.triage(patient_text).triage_level)
+        if field == "clinical_justification":
+            result = self.rules.triage(patient_text)
+            return str(result.clinical_justification).split(" Rule-based", 1)[0]
+        if field in ("reasoning", "rationale"):
+            return "Reviewed the presentation against STCC red flags and section criteria."
+        if field == "follow_up_questions":
+            return (
+                "How long have you had these symptoms? How severe are they on a "
+                "scale of 1 to 10? How old is the patient, and is there any "
+                "relevant medical history?"
+            )
+        return "stub"
+
+    def completion_text(self, messages: List[Dict]) -> str:
+        """Render DSPy ChatAdapter output for the requested fields."""
+        patient_text = self._patient_text(messages)
+        parts = [
+            f"[[ ## {field} ## ]]\n{self._field_value(field, patient_text)}"
+            for field in self._output_fields(messages)
+        ]
+        parts.append("[[ ## completed ## ]]")
+        return "\n\n".join(parts)
+
+    def completion(self, messages: List[Dict]) -> Dict:
+        """Build an OpenAI-shaped chat completion payload."""
+        text = self.completion_text(messages)
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+        prompt_tokens = max(1, prompt_chars // 4)
+        completion_tokens = self.completion_tokens or max(1, len(text) // 4)
+        return {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def stream_chunks(self, messages: List[Dict], include_usage: bool = False) -> List[Dict]:
+        """
+        Split a completion into OpenAI-shaped streaming chunks (about one word each).
+
+        Args:
+            messages: Chat messages of the request
+            include_usage: Append a final usage-only chunk (stream_options.include_usage)
+
+        Returns:
+            List of chat.completion.chunk payloads
+        """
+        payload = self.completion(messages)
+        text = payload["choices"][0]["message"]["content"]
+        base = {"id": payload["id"], "object": "chat.completion.chunk", "created": payload["created"], "model": self.model}
+        chunks = [
+            {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}]}
+            for piece in re.findall(r"\S+\s*|\s+", text)
+        ]
+        chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if include_usage:
+            chunks.append({**base, "choices": [], "usage": payload["usage"]})
+        return chunks
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    responder: StubResponder  # Set per server by create_stub_server()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": self.responder.model, "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        latency, error = self.responder.draw()
+        if request.get("stream"):
+            self._stream(request, latency, error)
+            return
+
+        time.sleep(latency)
+        if error is not None:
+            self._send_json(error.status, {"error": {"message": str(error), "type": "stub_error"}})
+            return
+
+        self._send_json(200, self.responder.completion(request.get("messages", [])))
+
+    def _stream(self, request: Dict, latency: float, error: Optional[StubLMError]):
+        # First token after a fifth of the latency, the rest spread evenly
+        time.sleep(latency / 5)
+        if error is not None:
+            self._send_json(error.status, {"error": {"message": str(error), "type": "stub_error"}})
+            return
+
+        include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+        chunks = self.responder.stream_chunks(request.get("messages", []), include_usage)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        delay = latency * 4 / 5 / len(chunks)
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def create_stub_server(
+    host: str = "127.0.0.1", port: int = 8089, responder: Optional[StubResponder] = None
+) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) the OpenAI-compatible stub server.
+
+    Args:
+        host: Host to bind to
+        port: Port to bind to (0 picks a free port)
+        responder: Response generator (default: zero latency, no errors)
+
+    Returns:
+        Server instance; call serve_forever() or run it in a thread
+    """
+    handler = type("StubHandler", (_StubHandler,), {"responder": responder or StubResponder()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def __getattr__(name):
+    # StubLM subclasses dspy.BaseLM; loading it lazily keeps stcc-stub-lm free of dspy
+    if name == "StubLM":
+        from .stub_lm import StubLM
+
+        return StubLM
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,81 @@
+"""
+In-Process Stub LM.
+
+A DSPy LM that answers from StubResponder without a network round trip,
+selected with DEEPSEEK_BASE_URL=stub://. Kept apart from the stub HTTP
+server so `stcc-stub-lm` starts without importing DSPy.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+from .stub import StubResponder
+
+
+def _to_namespace(payload: Dict) -> SimpleNamespace:
+    # Attribute access like litellm responses; DSPy reads usage as a mapping
+    response: SimpleNamespace = json.loads(
+        json.dumps(payload), object_hook=lambda d: SimpleNamespace(**d)
+    )
+    response.usage = dict(payload["usage"])
+    return response
+
+
+class StubLM(dspy.BaseLM):
+    """In-process DSPy LM backed by StubResponder (no network)."""
+
+    def __init__(
+        self, responder: Optional[StubResponder] = None, model: str = "stub/deepseek-chat"
+    ):
+        """
+        Initialize the in-process stub LM.
+
+        Args:
+            responder: Response generator (default: zero latency, no errors)
+            model: Model name recorded in DSPy history
+        """
+        super().__init__(model=model, cache=False, num_retries=0)
+        self.responder = responder or StubResponder()
+
+    @classmethod
+    def from_url(cls, url: str) -> "StubLM":
+        """
+        Build a stub LM from a stub:// URL.
+
+        Example:
+            stub://?latency=lognormal:800,0.6&error_rate=0.01&seed=7
+        """
+        params = {k: v[-1] for k, v in parse_qs(urlparse(url).query).items()}
+        responder = StubResponder(
+            latency=params.get("latency", "constant:0"),
+            error_rate=float(params.get("error_rate", 0.0)),
+            rate_limit_rate=float(params.get("rate_limit_rate", 0.0)),
+            completion_tokens=int(params["completion_tokens"]) if "completion_tokens" in params else None,
+            seed=int(params["seed"]) if "seed" in params else None,
+        )
+        return cls(responder)
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        latency, error = self.responder.draw()
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        return _to_namespace(self.responder.completion(messages))
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        latency, error = self.responder.draw()
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        return _to_namespace(self.responder.completion(messages))
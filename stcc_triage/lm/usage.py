@@ -0,0 +1,322 @@
+"""
+LM Token Usage and Cost Accounting.
+
+Reads prompt/completion token counts from OpenAI-shaped LM responses,
+aggregates them per request, nurse role and compile run, and persists
+daily rollups.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: rollups are merged without a file lock
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+
+def _read(container, key):
+    if isinstance(container, dict):
+        return container.get(key)
+    return getattr(container, key, None)
+
+
+def extract_usage(response) -> Dict[str, int]:
+    """
+    Read token usage from an LM response.
+
+    Handles both attribute-style (litellm/OpenAI objects) and dict-style
+    usage payloads.
+
+    Args:
+        response: OpenAI-shaped provider response
+
+    Returns:
+        Dict with prompt_tokens, completion_tokens, total_tokens and
+        cached_prompt_tokens (zeros if the provider did not report usage)
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get("usage")
+
+    counts = {}
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        counts[key] = int(_read(usage, key) or 0)
+
+    if not counts["total_tokens"]:
+        counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+
+    # DeepSeek reports prompt_cache_hit_tokens; OpenAI uses prompt_tokens_details
+    cached = _read(usage, "prompt_cache_hit_tokens")
+    if cached is None:
+        cached = _read(_read(usage, "prompt_tokens_details"), "cached_tokens")
+    counts["cached_prompt_tokens"] = int(cached or 0)
+    return counts
+
+
+class Pricing:
+    """Token prices in USD per million tokens."""
+
+    def __init__(
+        self,
+        prompt_per_million: float = 0.27,
+        completion_per_million: float = 1.10,
+        cached_prompt_per_million: float = 0.07,
+    ):
+        """
+        Initialize prices (defaults: DeepSeek-chat list prices).
+
+        Args:
+            prompt_per_million: Price of uncached prompt tokens
+            completion_per_million: Price of completion tokens
+            cached_prompt_per_million: Price of provider-cached prompt tokens
+        """
+        self.prompt_per_million = prompt_per_million
+        self.completion_per_million = completion_per_million
+        self.cached_prompt_per_million = cached_prompt_per_million
+
+    def cost(self, counts: Dict[str, int]) -> float:
+        """Cost in USD of one response's token counts."""
+        cached = counts.get("cached_prompt_tokens", 0)
+        uncached = max(0, counts.get("prompt_tokens", 0) - cached)
+        return (
+            uncached * self.prompt_per_million
+            + cached * self.cached_prompt_per_million
+            + counts.get("completion_tokens", 0) * self.completion_per_million
+        ) / 1_000_000
+
+
+class UsageTotals:
+    """Running token and cost totals (thread-safe)."""
+
+    FIELDS = (
+        "calls",
+        "cache_hits",
+        "prompt_tokens",
+        "completion_tokens",
+        "cached_prompt_tokens",
+        "total_tokens",
+        "cost_usd",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {field: 0 for field in self.FIELDS}
+        self._values["cost_usd"] = 0.0
+
+    def add(self, counts: Dict[str, float], cache_hit: bool = False, cost: float = 0.0):
+        """Add one LM response."""
+        with self._lock:
+            self._values["calls"] += 1
+            self._values["cache_hits"] += int(cache_hit)
+            for key in ("prompt_tokens", "completion_tokens", "cached_prompt_tokens", "total_tokens"):
+                self._values[key] += int(counts.get(key, 0))
+            self._values["cost_usd"] += cost
+
+    def merge(self, other: Dict[str, float]):
+        """Add totals from a snapshot of another UsageTotals."""
+        with self._lock:
+            for field in self.FIELDS:
+                self._values[field] += other.get(field, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = dict(self._values)
+        values["cost_usd"] = round(values["cost_usd"], 6)
+        return values
+
+
+_current_usage: contextvars.ContextVar[Optional[UsageTotals]] = contextvars.ContextVar(
+    "stcc_lm_usage", default=None
+)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTotals]:
+    """
+    Accumulate LM usage for every call made in the block.
+
+    Blocks may nest; each enclosing block sees the calls of inner ones.
+
+    Example:
+        with track_usage() as usage:
+            agent.triage(symptoms)
+        print(usage.snapshot()["total_tokens"])
+    """
+    totals = UsageTotals()
+    parent = _current_usage.get()
+    token = _current_usage.set(totals)
+    try:
+        yield totals
+    finally:
+        _current_usage.reset(token)
+        if parent is not None:
+            parent.merge(totals.snapshot())
+
+
+class UsageLedger:
+    """
+    Daily usage rollups by source (api, compile, batch) and nurse role.
+
+    Records accumulate in memory and are merged into
+    user_data/usage/YYYY-MM-DD.json every few seconds and at exit, under a
+    file lock so several worker processes can share one ledger.
+    """
+
+    def __init__(self, usage_dir: Optional[Path] = None, flush_interval: float = 5.0):
+        """
+        Initialize the ledger.
+
+        Args:
+            usage_dir: Directory for daily rollup files (default: user_data/usage/)
+            flush_interval: Minimum seconds between automatic flushes
+        """
+        if usage_dir is None:
+            from stcc_triage.core.paths import get_user_data_dir
+            usage_dir = get_user_data_dir() / "usage"
+        self.usage_dir = Path(usage_dir)
+        self.usage_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Dict[str, UsageTotals]]] = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, source: str, role: Optional[str], usage: Dict[str, float]):
+        """
+        Add a request's or run's usage to today's rollup.
+
+        Args:
+            source: What consumed the tokens, e.g. "api" or "compile"
+            role: Nurse role (None for the general agent)
+            usage: UsageTotals snapshot
+        """
+        if not usage.get("calls"):
+            return
+        role = role or "general"
+        day = date.today().isoformat()
+        with self._lock:
+            by_source = self._pending.setdefault(day, {}).setdefault(source, {})
+            by_source.setdefault(role, UsageTotals()).merge(usage)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Merge pending records into the daily rollup files."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        for day, sources in pending.items():
+            with self._locked_day(day) as rollup:
+                for source, roles in sources.items():
+                    for role, totals in roles.items():
+                        entry = rollup.setdefault(source, {}).setdefault(role, {})
+                        for field, value in totals.snapshot().items():
+                            entry[field] = round(entry.get(field, 0) + value, 6)
+
+    @contextmanager
+    def _locked_day(self, day: str):
+        path = self.usage_dir / f"{day}.json"
+        with open(self.usage_dir / ".lock", "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    rollup = json.loads(path.read_text(encoding="utf-8"))
+                except (FileNotFoundError, json.JSONDecodeError):
+                    rollup = {}
+                yield rollup
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(rollup, indent=2, sort_keys=True), encoding="utf-8")
+                os.replace(tmp_path, path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load_day(self, day: Optional[str] = None) -> Dict:
+        """Read a day's rollup (default: today), including unflushed records."""
+        self.flush()
+        day = day or date.today().isoformat()
+        path = self.usage_dir / f"{day}.json"
+        if not path.exists():
+            return {}
+        rollup: Dict = json.loads(path.read_text(encoding="utf-8"))
+        return rollup
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get the process-wide usage ledger (flushed at interpreter exit)."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = UsageLedger()
+                atexit.register(_ledger.flush)
+    return _ledger
+
+
+class UsageTrackingLM(dspy.BaseLM):
+    """DSPy LM wrapper that records token usage and cost of every provider response."""
+
+    def __init__(self, lm: dspy.BaseLM, pricing: Optional[Pricing] = None):
+        """
+        Wrap an LM with usage accounting.
+
+        Args:
+            lm: The underlying DSPy LM (innermost, so hedged duplicates count)
+            pricing: Token prices (default: DeepSeek-chat list prices)
+        """
+        super().__init__(
+            model=lm.model,
+            model_type=lm.model_type,
+            cache=False,
+            num_retries=0,
+        )
+        self.lm = lm
+        self.kwargs = dict(lm.kwargs)
+        self.pricing = pricing or Pricing()
+
+    def _record(self, response):
+        counts = extract_usage(response)
+        cache_hit = bool(getattr(response, "cache_hit", False))
+        cost = self.pricing.cost(counts)
+
+        totals = _current_usage.get()
+        if totals is not None:
+            totals.add(counts, cache_hit=cache_hit, cost=cost)
+
+        from stcc_triage.telemetry.tracing import current_span
+
+        span = current_span()
+        for key in ("prompt_tokens", "completion_tokens"):
+            span.set_attribute(key, span.attributes.get(key, 0) + counts[key])
+        if cache_hit:
+            span.set_attribute("cache_hit", True)
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        response = self.lm.forward(prompt=prompt, messages=messages, **kwargs)
+        self._record(response)
+        return response
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        response = await self.lm.aforward(prompt=prompt, messages=messages, **kwargs)
+        self._record(response)
+        return response
+
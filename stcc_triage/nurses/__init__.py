@@ -1,20 +1,26 @@
-"""Specialized nurse roles and classes."""
+"""Specialized nurse roles, classes and the compiled nurse pool."""
 
-from .roles import NurseRole, NurseSpecialization, get_specialization, list_available_roles
-from .specialized import (
-    SpecializedNurse,
-    WoundCareNurse,
-    OBNurse,
-    PediatricNurse,
-    NeuroNurse,
-    GINurse,
-    RespiratoryNurse,
-    MentalHealthNurse,
-    CHFNurse,
-    EDNurse,
-    PreOpNurse,
-    GeneralNurse,
-)
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .roles import NurseRole, NurseSpecialization, get_specialization, list_available_roles
+    from .specialized import (
+        SpecializedNurse,
+        WoundCareNurse,
+        OBNurse,
+        PediatricNurse,
+        NeuroNurse,
+        GINurse,
+        RespiratoryNurse,
+        MentalHealthNurse,
+        CHFNurse,
+        EDNurse,
+        PreOpNurse,
+        GeneralNurse,
+    )
+    from .pool import NursePool
 
 __all__ = [
     "NurseRole",
@@ -33,4 +39,28 @@ __all__ = [
     "EDNurse",
     "PreOpNurse",
     "GeneralNurse",
+    "NursePool",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "NurseRole": ".roles",
+        "NurseSpecialization": ".roles",
+        "get_specialization": ".roles",
+        "list_available_roles": ".roles",
+        "SpecializedNurse": ".specialized",
+        "WoundCareNurse": ".specialized",
+        "OBNurse": ".specialized",
+        "PediatricNurse": ".specialized",
+        "NeuroNurse": ".specialized",
+        "GINurse": ".specialized",
+        "RespiratoryNurse": ".specialized",
+        "MentalHealthNurse": ".specialized",
+        "CHFNurse": ".specialized",
+        "EDNurse": ".specialized",
+        "PreOpNurse": ".specialized",
+        "GeneralNurse": ".specialized",
+        "NursePool": ".pool",
+    },
+)
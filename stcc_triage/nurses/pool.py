@@ -0,0 +1,101 @@
+"""
+Compiled Nurse Pool.
+
+Loads each role's compiled triage program once and serves it as its own
+agent sharing the base agent's protocols and rules, so concurrent
+requests for different roles never see each other's program.
+"""
+
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from stcc_triage.core.agent import STCCTriageAgent
+from stcc_triage.core.paths import get_compiled_dir
+from stcc_triage.nurses.roles import NurseRole
+from stcc_triage.optimizers.compiler import load_compiled_nurse
+
+
+class NursePool:
+    """Per-role compiled nurses, loaded once and never mutated afterwards."""
+
+    def __init__(self, agent: STCCTriageAgent, compiled_dir: Optional[Path] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            agent: Base agent whose protocols and rules every nurse shares
+            compiled_dir: Directory containing compiled agents (default: user_data/compiled/)
+        """
+        self.agent = agent
+        self.compiled_dir = Path(compiled_dir) if compiled_dir is not None else get_compiled_dir()
+        self._nurses: Mapping[NurseRole, STCCTriageAgent] = MappingProxyType({})
+        self._lock = threading.Lock()
+
+    def get(self, role: NurseRole) -> STCCTriageAgent:
+        """
+        Get the agent for a nurse role, loading its compiled program on first use.
+
+        Args:
+            role: The nurse role
+
+        Returns:
+            Agent that triages with the role's compiled program
+
+        Raises:
+            FileNotFoundError: If no compiled agent exists for the role
+        """
+        nurse = self._nurses.get(role)
+        if nurse is not None:
+            return nurse
+
+        with self._lock:
+            nurse = self._nurses.get(role)
+            if nurse is None:
+                module = load_compiled_nurse(role, self.compiled_dir)
+                nurse = self.agent.with_triage_module(module)
+                # Publish a new read-only mapping; readers never take the lock
+                nurses: Dict[NurseRole, STCCTriageAgent] = dict(self._nurses)
+                nurses[role] = nurse
+                self._nurses = MappingProxyType(nurses)
+        return nurse
+
+    def preload(self, roles: Optional[List[NurseRole]] = None) -> List[NurseRole]:
+        """
+        Load compiled programs ahead of the first request.
+
+        Args:
+            roles: Roles to load (default: every role with a compiled agent on disk)
+
+        Returns:
+            Roles now loaded
+        """
+        if roles is None:
+            roles = [
+                role
+                for role in NurseRole
+                if (self.compiled_dir / f"compiled_{role.value}_agent.json").exists()
+            ]
+        for role in roles:
+            self.get(role)
+        return self.loaded_roles()
+
+    def loaded_roles(self) -> List[NurseRole]:
+        """Roles whose compiled program is loaded."""
+        return list(self._nurses)
+
+    def reload(self, role: Optional[NurseRole] = None):
+        """
+        Drop loaded programs so the next request reads them from disk again.
+
+        Args:
+            role: Role to drop (default: all roles)
+        """
+        with self._lock:
+            if role is None:
+                self._nurses = MappingProxyType({})
+            else:
+                nurses = dict(self._nurses)
+                nurses.pop(role, None)
+                self._nurses = MappingProxyType(nurses)
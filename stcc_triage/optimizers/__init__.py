@@ -1,13 +1,18 @@
 """Optimization and compilation for specialized nurses."""
 
-from .metric import protocol_adherence_metric, red_flag_detection_metric, combined_metric
-from .optimizer import get_optimizer
-from .compiler import (
-    compile_specialized_agent,
-    compile_all_specializations,
-    load_compiled_nurse,
-    optimize_nurse,
-)
+from typing import TYPE_CHECKING
+
+from stcc_triage._lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .metric import protocol_adherence_metric, red_flag_detection_metric, combined_metric
+    from .optimizer import get_optimizer
+    from .compiler import (
+        compile_specialized_agent,
+        compile_all_specializations,
+        load_compiled_nurse,
+        optimize_nurse,
+    )
 
 __all__ = [
     "protocol_adherence_metric",
@@ -19,3 +24,17 @@ __all__ = [
     "load_compiled_nurse",
     "optimize_nurse",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "protocol_adherence_metric": ".metric",
+        "red_flag_detection_metric": ".metric",
+        "combined_metric": ".metric",
+        "get_optimizer": ".optimizer",
+        "compile_specialized_agent": ".compiler",
+        "compile_all_specializations": ".compiler",
+        "load_compiled_nurse": ".compiler",
+        "optimize_nurse": ".compiler",
+    },
+)
@@ -16,8 +16,13 @@ from stcc_triage.nurses.roles import NurseRole, get_specialization
 from stcc_triage.datasets.generator import generate_specialized_dataset
 from stcc_triage.datasets.schema import PatientCase
 from stcc_triage.optimizers.optimizer import get_optimizer
+from stcc_triage.lm.scheduler import Lane, lm_lane
+from stcc_triage.lm.usage import get_usage_ledger, track_usage
+from stcc_triage.telemetry.metrics import observe_usage
+from stcc_triage.telemetry.tracing import current_span, traced
 
 
+@traced("optimizer.compile")
 def compile_specialized_agent(
     role: NurseRole,
     force_regenerate_data: bool = False,
@@ -59,6 +64,8 @@ def compile_specialized_agent(
 
     patient_cases = [PatientCase(**case) for case in cases_data]
 
+    current_span().set_attributes(role=role.value, trainset_size=len(patient_cases))
+
     print(f"\nTraining set: {len(patient_cases)} specialized cases")
     distribution = {}
     for case in patient_cases:
@@ -91,10 +98,27 @@ def compile_specialized_agent(
 
     teleprompter = get_optimizer()
 
-    # Compile with domain-specific training data
-    compiled_agent = teleprompter.compile(
-        student=agent.triage_module,
-        trainset=trainset,
+    # Compile with domain-specific training data (lowest LM priority lane)
+    with lm_lane(Lane.COMPILE), track_usage() as usage:
+        compiled_agent = teleprompter.compile(
+            student=agent.triage_module,
+            trainset=trainset,
+        )
+
+    compile_usage = usage.snapshot()
+    observe_usage("compile", role.value, compile_usage)
+    get_usage_ledger().record("compile", role.value, compile_usage)
+    current_span().set_attributes(
+        prompt_tokens=compile_usage["prompt_tokens"],
+        completion_tokens=compile_usage["completion_tokens"],
+        cost_usd=compile_usage["cost_usd"],
+    )
+    print(
+        f"\nLM usage: {compile_usage['calls']} calls "
+        f"({compile_usage['cache_hits']} cached), "
+        f"{compile_usage['prompt_tokens']:,} prompt + "
+        f"{compile_usage['completion_tokens']:,} completion tokens, "
+        f"~${compile_usage['cost_usd']:.4f}"
     )
 
     # Step 4: Save compiled agent
@@ -0,0 +1,177 @@
+"""
+Rule-Based Protocol Triage.
+
+Conservative triage derived directly from STCC Section A/B criteria.
+Used as a degraded fallback when the LM path is unavailable.
+"""
+
+import re
+from typing import List, NamedTuple, Optional
+
+try:
+    import dspy
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+# Red flags that always mean Emergency, regardless of protocol matches
+_RED_FLAG_TERMS = [
+    "chest pain", "crushing", "not breathing", "can't breathe", "cannot breathe",
+    "difficulty breathing", "shortness of breath", "unconscious", "unresponsive",
+    "seizure", "stroke", "slurred speech", "facial droop", "severe bleeding",
+    "heavy bleeding", "suicid", "overdose", "anaphyla", "blue lips", "choking",
+    "worst headache", "cold sweat",
+    "胸痛", "呼吸困难", "昏迷", "抽搐", "大出血", "流血不止", "嘴唇发紫",
+    "自杀", "窒息",
+]
+
+# Terms that warrant at least Urgent care
+_URGENT_TERMS = [
+    "high fever", "vomiting blood", "blood in stool", "severe pain", "fracture",
+    "deep cut", "burn", "pregnan", "dehydrat", "confus", "faint", "bleeding",
+    "高烧", "吐血", "便血", "剧痛", "骨折", "烧伤", "怀孕", "晕厥",
+]
+
+# Protocol sections consulted, most urgent first
+_SECTION_LEVELS = [("A", "Emergency"), ("B", "Urgent")]
+
+# Shorter clauses (e.g. "头痛") are too generic to match on their own
+_MIN_CLAUSE_LENGTH = 3
+
+# Share of a clause's character bigrams that must appear in the text
+_CLAUSE_COVERAGE = 0.6
+
+
+class RuleMatch(NamedTuple):
+    """A protocol criterion found in the patient text."""
+
+    triage_level: str
+    protocol_name: str
+    section_id: str
+    condition: str
+
+
+def _bigrams(text: str) -> set:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _split_clauses(condition: str) -> List[str]:
+    clauses = re.split(r"[，。、；：,.;:（）()\s]+", condition)
+    return [c for c in clauses if len(c) >= _MIN_CLAUSE_LENGTH]
+
+
+class RuleBasedTriage:
+    """
+    Protocol-derived triage that needs no LM call.
+
+    Matches patient text against Section A (emergency) and Section B
+    (urgent) criteria. It is biased toward over-triage: when nothing
+    matches it answers Urgent rather than Moderate or Home Care, since
+    missing an emergency is the costliest error under
+    protocol_adherence_metric.
+    """
+
+    def __init__(self, protocols: List[dict]):
+        """
+        Precompute clause bigrams for every Section A/B criterion.
+
+        Args:
+            protocols: Parsed STCC protocol dictionaries
+        """
+        self._criteria = []
+        for protocol in protocols:
+            for section in protocol["sections"]:
+                for section_id, level in _SECTION_LEVELS:
+                    if section["section_id"] != section_id:
+                        continue
+                    for condition in section["conditions"]:
+                        clauses = [
+                            (clause, _bigrams(clause))
+                            for clause in _split_clauses(condition)
+                        ]
+                        if clauses:
+                            match = RuleMatch(
+                                level, protocol["protocol_name"], section_id, condition
+                            )
+                            self._criteria.append((match, clauses))
+
+        # Most urgent criteria are checked first
+        self._criteria.sort(key=lambda item: item[0].section_id)
+
+    def red_flags(self, text: str) -> List[str]:
+        """
+        Find red-flag terms in patient text.
+
+        Args:
+            text: Patient symptom description
+
+        Returns:
+            List of red-flag terms found (empty if none)
+        """
+        text_lower = text.lower()
+        return [term for term in _RED_FLAG_TERMS if term in text_lower]
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        """
+        Find the most urgent Section A/B criterion present in the text.
+
+        Args:
+            text: Patient symptom description
+
+        Returns:
+            The first matching criterion, or None
+        """
+        text_lower = text.lower()
+        text_bigrams = _bigrams(text_lower)
+
+        for match, clauses in self._criteria:
+            for clause, clause_bigrams in clauses:
+                if clause in text_lower:
+                    return match
+                if len(clause_bigrams) >= 2:
+                    coverage = len(clause_bigrams & text_bigrams) / len(clause_bigrams)
+                    if coverage >= _CLAUSE_COVERAGE:
+                        return match
+        return None
+
+    def triage(self, symptoms: str) -> dspy.Prediction:
+        """
+        Perform conservative rule-based triage.
+
+        Args:
+            symptoms: Patient symptom description (may include history)
+
+        Returns:
+            DSPy Prediction with triage_level, clinical_justification,
+            rationale and degraded=True
+        """
+        red_flags = self.red_flags(symptoms)
+        match = self.match(symptoms)
+
+        if red_flags:
+            level = "Emergency"
+            reason = f"Red-flag symptoms detected: {', '.join(red_flags)}."
+        elif match is not None:
+            level = match.triage_level
+            reason = (
+                f"Matched STCC protocol '{match.protocol_name}' "
+                f"Section {match.section_id}: {match.condition}"
+            )
+        elif any(term in symptoms.lower() for term in _URGENT_TERMS):
+            level = "Urgent"
+            reason = "Symptoms suggest a condition needing prompt medical care."
+        else:
+            level = "Urgent"
+            reason = (
+                "No protocol criteria matched. Defaulting to Urgent because "
+                "a full assessment is not available."
+            )
+
+        return dspy.Prediction(
+            triage_level=level,
+            clinical_justification=(
+                f"{reason} Rule-based assessment only (degraded mode); "
+                "a nurse should confirm as soon as possible."
+            ),
+            rationale="Conservative rule-based fallback biased toward over-triage.",
+            degraded=True,
+        )
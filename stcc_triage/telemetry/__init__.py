@@ -0,0 +1,75 @@
+"""Telemetry: per-stage request timing, Prometheus metrics, tracing and profiling."""
+
+from .metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    get_registry,
+    observe_request,
+    observe_usage,
+)
+from .profiling import (
+    Profiler,
+    StackSampler,
+    configure_profiling,
+    get_profiler,
+    profile_imports,
+    profile_request,
+    profiled,
+)
+from .timing import (
+    StageTimer,
+    annotate_request,
+    current_timer,
+    get_stage_callback,
+    stage,
+    track_stages,
+)
+from .tracing import (
+    JSONLExporter,
+    NoopExporter,
+    OTelExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    configure_tracing,
+    current_span,
+    get_tracer,
+    trace_span,
+    traced,
+)
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "get_registry",
+    "observe_request",
+    "observe_usage",
+    "Profiler",
+    "StackSampler",
+    "configure_profiling",
+    "get_profiler",
+    "profile_imports",
+    "profile_request",
+    "profiled",
+    "StageTimer",
+    "annotate_request",
+    "current_timer",
+    "get_stage_callback",
+    "stage",
+    "track_stages",
+    "JSONLExporter",
+    "NoopExporter",
+    "OTelExporter",
+    "Span",
+    "SpanExporter",
+    "Tracer",
+    "configure_tracing",
+    "current_span",
+    "get_tracer",
+    "trace_span",
+    "traced",
+]
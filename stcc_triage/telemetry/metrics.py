@@ -0,0 +1,399 @@
+"""
+Prometheus Metrics.
+
+Minimal in-process counters, gauges and histograms rendered in the
+Prometheus text exposition format for the API's /metrics route.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+# Latency buckets (seconds): sub-millisecond CPU stages up to slow LM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Stored per label set: a float for counters and gauges, bucket state for histograms
+V = TypeVar("V")
+
+
+class _Metric(Generic[V]):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], V] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {list(self.labelnames)}, got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _sample_lines(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._sample_lines())
+        return "\n".join(lines)
+
+
+class Counter(_Metric[float]):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _sample_lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric[float]):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _sample_lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class _HistogramState:
+    """Bucket counts, sum and count for one label set."""
+
+    def __init__(self, buckets: int):
+        self.counts: List[int] = [0] * buckets
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric[_HistogramState]):
+    """Cumulative bucketed distribution with sum and count."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = _HistogramState(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state.counts[i] += 1
+                    break
+            state.total += value
+            state.count += 1
+
+    def _sample_lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(s.counts), s.total, s.count)) for key, s in self._values.items()
+            )
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class MetricsRegistry:
+    """Registered metrics plus collectors evaluated at scrape time."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: M) -> M:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        """Add a function that builds fresh metrics on every scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            metrics.extend(collector())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+STAGE_SECONDS = _registry.histogram(
+    "stcc_triage_stage_duration_seconds",
+    "Time spent in each stage of a triage request",
+    ["stage", "role", "action"],
+)
+REQUEST_SECONDS = _registry.histogram(
+    "stcc_triage_request_duration_seconds",
+    "End-to-end triage request latency",
+    ["endpoint", "role", "action"],
+)
+REQUESTS_TOTAL = _registry.counter(
+    "stcc_triage_requests_total",
+    "Triage requests by HTTP status",
+    ["endpoint", "role", "action", "status"],
+)
+DEGRADED_TOTAL = _registry.counter(
+    "stcc_triage_degraded_total",
+    "Triage responses served by the rule-based fallback",
+    ["endpoint", "role"],
+)
+
+ADMISSION_INFLIGHT = _registry.gauge(
+    "stcc_admission_inflight",
+    "Triage requests holding an LM slot in this process",
+)
+ADMISSION_QUEUE_DEPTH = _registry.gauge(
+    "stcc_admission_queue_depth",
+    "Triage requests waiting for an LM slot in this process",
+)
+ADMISSION_WAIT_SECONDS = _registry.histogram(
+    "stcc_admission_wait_seconds",
+    "Time triage requests waited for an LM slot",
+)
+ADMISSION_TOTAL = _registry.counter(
+    "stcc_admission_total",
+    "Admission decisions: admitted, queued, rejected, or rules (rule-based fast path)",
+    ["outcome"],
+)
+
+LM_TOKENS_TOTAL = _registry.counter(
+    "stcc_lm_tokens_total",
+    "LM tokens consumed by source, nurse role and kind",
+    ["source", "role", "kind"],
+)
+LM_COST_TOTAL = _registry.counter(
+    "stcc_lm_cost_usd_total",
+    "Estimated LM spend in USD by source and nurse role",
+    ["source", "role"],
+)
+LM_CACHE_HITS_TOTAL = _registry.counter(
+    "stcc_lm_cache_hits_total",
+    "LM calls answered from the local DSPy cache",
+    ["source", "role"],
+)
+
+
+def observe_usage(source: str, role: Optional[str], usage: Dict[str, float]):
+    """
+    Record LM token usage and cost for a request or run.
+
+    Args:
+        source: What consumed the tokens, e.g. "api" or "compile"
+        role: Nurse role (None for the general agent)
+        usage: UsageTotals snapshot
+    """
+    role = role or "general"
+    for kind in ("prompt", "completion", "cached_prompt"):
+        LM_TOKENS_TOTAL.inc(usage.get(f"{kind}_tokens", 0), source=source, role=role, kind=kind)
+    LM_COST_TOTAL.inc(usage.get("cost_usd", 0.0), source=source, role=role)
+    LM_CACHE_HITS_TOTAL.inc(usage.get("cache_hits", 0), source=source, role=role)
+
+
+def observe_request(timer, endpoint: str, status: int, total: Optional[float] = None):
+    """
+    Record a finished triage request and its stages.
+
+    Args:
+        timer: StageTimer for the request
+        endpoint: Route path, e.g. /triage
+        status: HTTP status code
+        total: Request seconds (default: timer elapsed)
+    """
+    role = timer.role or "general"
+    action = timer.action or "triage"
+    total = timer.elapsed() if total is None else total
+
+    REQUEST_SECONDS.observe(total, endpoint=endpoint, role=role, action=action)
+    REQUESTS_TOTAL.inc(endpoint=endpoint, role=role, action=action, status=str(status))
+    if timer.degraded:
+        DEGRADED_TOTAL.inc(endpoint=endpoint, role=role)
+    for name, seconds in list(timer.stages.items()):
+        STAGE_SECONDS.observe(seconds, stage=name, role=role, action=action)
+
+
+def _lm_layer_metrics() -> List[_Metric]:
+    """Snapshot hedging, circuit breaker, adaptive quality and rate limiter state."""
+    from stcc_triage.lm.breaker import get_circuit_breaker
+    from stcc_triage.lm.hedging import get_hedging_stats
+    from stcc_triage.lm.quality import get_quality_controller
+    from stcc_triage.lm.scheduler import get_rate_limit_scheduler
+
+    metrics: List[_Metric] = []
+
+    hedging = get_hedging_stats().snapshot()
+    calls = Counter("stcc_lm_hedged_calls_total", "LM calls made through the hedging wrapper")
+    calls.inc(hedging["calls"])
+    hedges = Counter("stcc_lm_hedges_total", "Duplicate LM requests sent by hedging")
+    hedges.inc(hedging["hedges"])
+    wins = Counter("stcc_lm_hedge_wins_total", "Hedged requests that answered first")
+    wins.inc(hedging["hedge_wins"])
+    rate = Gauge("stcc_lm_hedge_rate", "Fraction of hedging-wrapper LM calls that sent a duplicate")
+    rate.set(hedging["hedge_rate"])
+    p99 = Gauge(
+        "stcc_lm_hedging_p99_seconds",
+        "p99 LM latency without (primary) and with (effective) hedging",
+        ["latency"],
+    )
+    improvement = Gauge(
+        "stcc_lm_hedging_p99_improvement_seconds", "p99 LM latency saved by hedging"
+    )
+    for name, seconds in (
+        ("primary", hedging["p99_primary_seconds"]),
+        ("effective", hedging["p99_effective_seconds"]),
+    ):
+        if seconds is not None:
+            p99.set(seconds, latency=name)
+    saved = hedging["p99_improvement_seconds"]
+    if saved is not None:
+        improvement.set(saved)
+    metrics.extend([calls, hedges, wins, rate, p99, improvement])
+
+    breaker = get_circuit_breaker().snapshot()
+    state = Gauge("stcc_lm_breaker_state", "LM circuit breaker state (1 = current)", ["state"])
+    for name in ("closed", "open", "half_open"):
+        state.set(1 if breaker["state"] == name else 0, state=name)
+    opened = Counter("stcc_lm_breaker_opened_total", "Times the LM circuit breaker opened")
+    opened.inc(breaker["times_opened"])
+    rejected = Counter("stcc_lm_breaker_rejected_total", "LM calls refused while open")
+    rejected.inc(breaker["rejected"])
+    metrics.extend([state, opened, rejected])
+
+    quality = get_quality_controller().snapshot()
+    mode = Gauge("stcc_triage_quality_mode", "Adaptive triage quality mode (1 = current)", ["mode"])
+    for name in ("full", "fast"):
+        mode.set(1 if quality["mode"] == name else 0, mode=name)
+    switches = Counter("stcc_triage_quality_switches_total", "Adaptive quality mode switches")
+    switches.inc(quality["switches"])
+    decisions = Counter(
+        "stcc_triage_quality_decisions_total", "Triage decisions by quality mode", ["mode"]
+    )
+    for name, count in quality["decisions"].items():
+        decisions.inc(count, mode=name)
+    metrics.extend([mode, switches, decisions])
+
+    scheduler = get_rate_limit_scheduler()
+    if scheduler is not None:
+        limits = scheduler.snapshot()
+        remaining = Gauge(
+            "stcc_lm_ratelimit_remaining", "Remaining host-wide LM budget", ["bucket"]
+        )
+        for bucket, value in limits["remaining"].items():
+            remaining.set(value, bucket=bucket)
+        waiting = Gauge("stcc_lm_ratelimit_waiting", "Callers waiting for LM budget", ["lane"])
+        granted = Counter("stcc_lm_ratelimit_granted_total", "LM calls granted budget", ["lane"])
+        waited = Counter(
+            "stcc_lm_ratelimit_wait_seconds_total", "Time spent waiting for LM budget", ["lane"]
+        )
+        for lane, count in limits["waiting"].items():
+            waiting.set(count, lane=lane)
+            granted.inc(limits["granted"][lane], lane=lane)
+            waited.inc(limits["wait_seconds"][lane], lane=lane)
+        metrics.extend([remaining, waiting, granted, waited])
+
+    return metrics
+
+
+_registry.add_collector(_lm_layer_metrics)
@@ -0,0 +1,353 @@
+"""
+On-Demand Profiling.
+
+Opt-in cProfile or stack-sampling profiles of live triage requests and
+CLI runs, written under user_data/profiles/ in flamegraph-ready formats:
+.prof (pstats; open with snakeviz or flameprof) and .folded (collapsed
+stacks for flamegraph.pl or speedscope). A per-minute cap and a single
+active profile at a time keep it safe to leave enabled in production.
+"""
+
+import contextvars
+import cProfile
+import functools
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar, cast
+
+PROFILE_HEADER = "X-STCC-Profile"
+PROFILERS = ("cprofile", "sample")
+
+
+class ProfileRateLimiter:
+    """Allows at most max_per_minute profiles in any sliding 60 second window."""
+
+    def __init__(self, max_per_minute: Optional[float] = 6):
+        self.max_per_minute = max_per_minute
+        self._starts: deque = deque()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.max_per_minute is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._starts and now - self._starts[0] >= 60.0:
+                self._starts.popleft()
+            if len(self._starts) >= self.max_per_minute:
+                return False
+            self._starts.append(now)
+            return True
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            thread_id: Thread to sample (default: the calling thread)
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stcc-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        """Collapsed stacks: one "root;...;leaf count" line per unique stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class RequestProfile:
+    """Profile requested for one API request; holds the written file once captured."""
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+
+
+_active = threading.Lock()
+_request_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "stcc_request_profile", default=None
+)
+
+
+class Profiler:
+    """Writes rate-limited cProfile or sampling profiles to a directory."""
+
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        kind: str = "cprofile",
+        mode: str = "off",
+        targets: Optional[List[str]] = None,
+        max_per_minute: Optional[float] = 6,
+        interval: float = 0.005,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Profile directory (default: user_data/profiles/)
+            kind: "cprofile" (deterministic, .prof) or "sample" (stack sampling, .folded)
+            mode: API requests to profile: "off", "header" (only requests
+                sending X-STCC-Profile: 1) or "all"
+            targets: Hook names profiled on every call, e.g. agent.init ("*" for all)
+            max_per_minute: Cap on profiles written per minute (None: no cap)
+            interval: Seconds between stack samples for kind="sample"
+        """
+        if kind not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {kind} (use {' or '.join(PROFILERS)})")
+        if mode not in ("off", "header", "all"):
+            raise ValueError(f"Unknown STCC_PROFILE mode: {mode} (use off, header or all)")
+        if output_dir is None:
+            from stcc_triage.core.paths import get_user_data_dir
+            output_dir = get_user_data_dir() / "profiles"
+        self.output_dir = Path(output_dir)
+        self.kind = kind
+        self.mode = mode
+        self.targets = frozenset(targets or ())
+        self.limiter = ProfileRateLimiter(max_per_minute)
+        self.interval = interval
+
+    def wants(self, name: str) -> bool:
+        """Whether a hook with this name should start a profile now."""
+        if name in self.targets or "*" in self.targets:
+            return True
+        request = _request_profile.get()
+        return request is not None and request.path is None
+
+    def wants_request(self, header_value: Optional[str]) -> bool:
+        """Whether an API request (with its X-STCC-Profile header) should be profiled."""
+        if self.mode == "all":
+            return True
+        return self.mode == "header" and (header_value or "").lower() in ("1", "true", "yes")
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[List[Path]]:
+        """
+        Profile the block and write the result.
+
+        A no-op when another profile is running or the per-minute cap is
+        reached. The yielded list holds the output path once the block ends.
+
+        Example:
+            with profiler.profile("agent.init") as written:
+                STCCTriageAgent()
+            print(written[0] if written else "skipped")
+        """
+        written: List[Path] = []
+        if not _active.acquire(blocking=False):
+            yield written
+            return
+        try:
+            if not self.limiter.allow():
+                yield written
+                return
+            if self.kind == "sample":
+                sampler = StackSampler(interval=self.interval)
+                sampler.start()
+                try:
+                    yield written
+                finally:
+                    sampler.stop()
+                    written.append(self._write(name, ".folded", sampler.folded()))
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    yield written
+                finally:
+                    profile.disable()
+                    path = self._path(name, ".prof")
+                    profile.dump_stats(str(path))
+                    written.append(path)
+        finally:
+            _active.release()
+
+    def _path(self, name: str, suffix: str) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return self.output_dir / f"{stamp}-{name}-{os.getpid()}{suffix}"
+
+    def _write(self, name: str, suffix: str, text: str) -> Path:
+        path = self._path(name, suffix)
+        path.write_text(text, encoding="utf-8")
+        return path
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def _profiler_from_settings() -> Profiler:
+    from stcc_triage.core.settings import TelemetryConfig
+
+    config = TelemetryConfig()
+    targets = [name.strip() for name in config.profile_targets.split(",") if name.strip()]
+    return Profiler(
+        output_dir=Path(config.profile_dir) if config.profile_dir else None,
+        kind=config.profiler.lower(),
+        mode=config.profile_mode.lower(),
+        targets=targets,
+        max_per_minute=config.profile_max_per_minute or None,
+    )
+
+
+def get_profiler() -> Profiler:
+    """Get the process-wide profiler (configured by STCC_PROFILE* on first use)."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = _profiler_from_settings()
+    return _profiler
+
+
+def configure_profiling(profiler: Optional[Profiler] = None) -> Profiler:
+    """Replace the process-wide profiler (None: re-read the environment)."""
+    global _profiler
+    with _profiler_lock:
+        _profiler = profiler or _profiler_from_settings()
+    return _profiler
+
+
+@contextmanager
+def profile_request(requested: bool) -> Iterator[Optional[RequestProfile]]:
+    """
+    Mark the current request for profiling by the first profiled hook it reaches.
+
+    Yields None when the request is not profiled.
+    """
+    if not requested:
+        yield None
+        return
+    request = RequestProfile()
+    token = _request_profile.set(request)
+    try:
+        yield request
+    finally:
+        _request_profile.reset(token)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Decorator marking a function as a profiling hook (no-op unless enabled)."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = get_profiler()
+            if not profiler.wants(name):
+                return func(*args, **kwargs)
+            with profiler.profile(name) as written:
+                result = func(*args, **kwargs)
+            request = _request_profile.get()
+            if written and request is not None and request.path is None:
+                request.path = written[0]
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \|( +)(\S+)")
+
+
+def importtime_to_folded(output: str) -> str:
+    """
+    Convert `python -X importtime` output to collapsed stacks (microseconds).
+
+    Args:
+        output: stderr of a `python -X importtime` run
+
+    Returns:
+        Folded stacks with each module's self time as the count
+    """
+    pending: Dict[int, list] = {}
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, indent, module = int(match.group(1)), match.group(2), match.group(3)
+        depth = (len(indent) - 1) // 2
+        # importtime lists children before their parent
+        children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append((module, self_us, children))
+
+    lines = []
+
+    def walk(node, prefix):
+        module, self_us, children = node
+        path = f"{prefix};{module}" if prefix else module
+        if self_us:
+            lines.append(f"{path} {self_us}\n")
+        for child in children:
+            walk(child, path)
+
+    for root in pending.get(0, []):
+        walk(root, "")
+    return "".join(lines)
+
+
+def profile_imports(module: str = "stcc_triage.core.agent", output_dir: Optional[Path] = None) -> Path:
+    """
+    Profile the import chain of a module in a fresh interpreter.
+
+    Args:
+        module: Module to import
+        output_dir: Profile directory (default: user_data/profiles/)
+
+    Returns:
+        Path to the .folded file (counts are microseconds of self time)
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()[-2000:]}")
+    profiler = Profiler(output_dir=output_dir, kind="sample", max_per_minute=None)
+    return profiler._write(f"imports-{module}", ".folded", importtime_to_folded(proc.stderr))
@@ -0,0 +1,149 @@
+"""
+Per-Stage Request Timing.
+
+Collects how long each stage of a triage request takes (keyword
+extraction, protocol retrieval, prompt building, LM call, output
+parsing) for the Server-Timing header and Prometheus histograms.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    from dspy.utils.callback import BaseCallback
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+
+class StageTimer:
+    """Accumulated stage durations (seconds) for one request."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.role: Optional[str] = None
+        self.action: Optional[str] = None
+        self.degraded = False
+        self._pending: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        """Add time to a stage (repeated stages accumulate)."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """
+        Render stages as a Server-Timing header value (milliseconds).
+
+        Args:
+            total: Total request seconds (default: elapsed so far)
+        """
+        total = self.elapsed() if total is None else total
+        # Copy first: a timed-out LM call may still be adding stages
+        metrics = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in list(self.stages.items())
+        ]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current_timer: contextvars.ContextVar[Optional[StageTimer]] = contextvars.ContextVar(
+    "stcc_stage_timer", default=None
+)
+
+
+def current_timer() -> Optional[StageTimer]:
+    """Get the timer for the request being handled (None outside a request)."""
+    return _current_timer.get()
+
+
+@contextmanager
+def track_stages() -> Iterator[StageTimer]:
+    """
+    Collect stage timings for everything run in the block.
+
+    Example:
+        with track_stages() as timer:
+            agent.triage(symptoms)
+        print(timer.server_timing())
+    """
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as a stage of the current request (no-op outside one)."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+def annotate_request(
+    role: Optional[str] = None, action: Optional[str] = None, degraded: Optional[bool] = None
+):
+    """Set metric labels on the current request's timer, if any."""
+    timer = _current_timer.get()
+    if timer is None:
+        return
+    if role is not None:
+        timer.role = role
+    if action is not None:
+        timer.action = action
+    if degraded is not None:
+        timer.degraded = degraded
+
+
+class StageTimingCallback(BaseCallback):
+    """DSPy callback that times adapter formatting, LM calls and parsing."""
+
+    def _start(self, call_id: str):
+        timer = _current_timer.get()
+        if timer is not None:
+            timer._pending[call_id] = time.perf_counter()
+
+    def _end(self, call_id: str, name: str):
+        timer = _current_timer.get()
+        if timer is not None and call_id in timer._pending:
+            timer.add(name, time.perf_counter() - timer._pending.pop(call_id))
+
+    def on_adapter_format_start(self, call_id, instance, inputs):
+        self._start(call_id)
+
+    def on_adapter_format_end(self, call_id, outputs, exception=None):
+        self._end(call_id, "prompt")
+
+    def on_lm_start(self, call_id, instance, inputs):
+        self._start(call_id)
+
+    def on_lm_end(self, call_id, outputs, exception=None):
+        self._end(call_id, "lm")
+
+    def on_adapter_parse_start(self, call_id, instance, inputs):
+        self._start(call_id)
+
+    def on_adapter_parse_end(self, call_id, outputs, exception=None):
+        self._end(call_id, "parse")
+
+
+_stage_callback = StageTimingCallback()
+
+
+def get_stage_callback() -> StageTimingCallback:
+    """Get the process-wide DSPy stage timing callback."""
+    return _stage_callback
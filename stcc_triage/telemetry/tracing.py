@@ -0,0 +1,350 @@
+"""
+Pluggable Tracing.
+
+Start/end span hooks with attributes around agent, optimizer, dataset
+and API work. Spans go to a no-op exporter by default, to a local JSONL
+file, or to OpenTelemetry when it is installed. Only sizes and labels
+are recorded, never patient text.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar, cast
+
+try:
+    from dspy.utils.callback import BaseCallback
+except ImportError:
+    raise ImportError("dspy-ai package not installed. Run: uv add dspy-ai")
+
+
+class Span:
+    """A timed unit of work with attributes."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException):
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+        self.end_time = self.start_time + self.duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan(Span):
+    """Span handed out when tracing is off; discards everything."""
+
+    def __init__(self):
+        super().__init__("noop", "0" * 32, "0" * 16)
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Receives span start/end hooks. The base class does nothing."""
+
+    def on_start(self, span: Span):
+        pass
+
+    def on_end(self, span: Span):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class NoopExporter(SpanExporter):
+    """Default exporter: tracing disabled."""
+
+
+class JSONLExporter(SpanExporter):
+    """Appends one JSON line per finished span to a local file."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: Output file (default: user_data/traces/spans.jsonl)
+        """
+        if path is None:
+            from stcc_triage.core.paths import get_user_data_dir
+            path = get_user_data_dir() / "traces" / "spans.jsonl"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OTelExporter(SpanExporter):
+    """Mirrors spans into OpenTelemetry (configure its SDK and exporters as usual)."""
+
+    def __init__(self, tracer_name: str = "stcc_triage"):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "opentelemetry-api package not installed. Run: uv add opentelemetry-api"
+            )
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+        self._spans: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._spans.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self._tracer.start_span(
+            span.name, context=context, start_time=int(span.start_time * 1e9)
+        )
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span: Span):
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                otel_span.set_attribute(key, value)
+            elif value is not None:
+                otel_span.set_attribute(key, str(value))
+        if span.status == "error":
+            from opentelemetry.trace import Status, StatusCode
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        end_time = span.end_time if span.end_time is not None else time.time()
+        otel_span.end(end_time=int(end_time * 1e9))
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "stcc_current_span", default=None
+)
+
+
+class Tracer:
+    """Creates spans, tracks the current span and forwards hooks to an exporter."""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter or NoopExporter()
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.exporter, NoopExporter)
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """Start a span as a child of the current span and make it current."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+        )
+        span._token = _current_span.set(span)
+        self.exporter.on_start(span)
+        return span
+
+    def end_span(self, span: Span, exc: Optional[BaseException] = None):
+        """Finish a span and restore its parent as the current span."""
+        if span is _NOOP_SPAN:
+            return
+        if exc is not None:
+            span.record_exception(exc)
+        span.finish()
+        try:
+            if span._token is not None:
+                _current_span.reset(span._token)
+        except ValueError:  # Ended from another context (e.g. a callback thread)
+            pass
+        self.exporter.on_end(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Context manager form of start_span/end_span."""
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        self.end_span(span)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _exporter_from_settings() -> SpanExporter:
+    from stcc_triage.core.settings import TelemetryConfig
+
+    config = TelemetryConfig()
+    exporter = config.trace_exporter.lower()
+    if exporter == "jsonl":
+        return JSONLExporter(Path(config.trace_file) if config.trace_file else None)
+    if exporter == "otel":
+        return OTelExporter()
+    if exporter not in ("", "none"):
+        raise ValueError(f"Unknown STCC_TRACE exporter: {config.trace_exporter} (use none, jsonl or otel)")
+    return NoopExporter()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer (exporter chosen by STCC_TRACE on first use)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(_exporter_from_settings())
+    return _tracer
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None) -> Tracer:
+    """Replace the process-wide tracer's exporter (None disables tracing)."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is not None:
+            _tracer.exporter.shutdown()
+        _tracer = Tracer(exporter)
+    return _tracer
+
+
+def current_span() -> Span:
+    """Get the active span (a no-op span outside any trace)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def trace_span(name: str, **attributes):
+    """Shortcut for get_tracer().span(name, **attributes)."""
+    return get_tracer().span(name, **attributes)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator that runs the function inside a span."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def _prompt_size(inputs: Dict[str, Any]) -> Dict[str, int]:
+    messages = inputs.get("messages") or []
+    chars = len(inputs.get("prompt") or "")
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        chars += len(content) if isinstance(content, str) else len(json.dumps(content, default=str))
+    return {"prompt_chars": chars, "prompt_messages": len(messages)}
+
+
+class TracingCallback(BaseCallback):
+    """DSPy callback that records every LM call as an lm.call span."""
+
+    def __init__(self):
+        self._spans: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+
+    def on_lm_start(self, call_id, instance, inputs):
+        tracer = get_tracer()
+        if not tracer.enabled:
+            return
+        from stcc_triage.lm.scheduler import current_lane
+
+        span = tracer.start_span(
+            "lm.call",
+            model=getattr(instance, "model", None),
+            lane=current_lane().name.lower(),
+            **_prompt_size(inputs),
+        )
+        with self._lock:
+            self._spans[call_id] = span
+
+    def on_lm_end(self, call_id, outputs, exception=None):
+        with self._lock:
+            span = self._spans.pop(call_id, None)
+        if span is None:
+            return
+        if outputs:
+            span.set_attribute(
+                "completion_chars",
+                sum(len(o if isinstance(o, str) else json.dumps(o, default=str)) for o in outputs),
+            )
+        get_tracer().end_span(span, exception)
+
+
+_tracing_callback = TracingCallback()
+
+
+def get_tracing_callback() -> TracingCallback:
+    """Get the process-wide DSPy LM tracing callback."""
+    return _tracing_callback
@@ -37,6 +37,8 @@ def render_optimization():
 
     - **Single nurse:** 5-10 minutes, ~$0.50-1.00 in API credits
     - **All nurses:** 1-2 hours, ~$5-10 in API credits
+    - **Actual spend:** each compile run reports its tokens and cost, and daily
+      totals are kept in `user_data/usage/`
 
     ---
     """
@@ -0,0 +1,18 @@
+"""
+Shared test fixtures.
+
+Keeps state the app persists under user_data/ in temporary directories.
+"""
+
+import pytest
+
+from stcc_triage.lm import usage
+from stcc_triage.lm.usage import UsageLedger
+
+
+@pytest.fixture(autouse=True)
+def usage_ledger(monkeypatch, tmp_path_factory):
+    """Process-wide usage ledger writing to a temp dir instead of user_data/usage/."""
+    ledger = UsageLedger(tmp_path_factory.mktemp("usage"))
+    monkeypatch.setattr(usage, "_ledger", ledger)
+    return ledger
@@ -0,0 +1,145 @@
+"""
+Tests for API admission control and back-pressure.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.admission import AdmissionController, OverloadedError
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """No free slot and no queue: every LM-bound request is turned away."""
+    controller = AdmissionController(max_inflight=1, max_queue=0)
+    controller.inflight = 1
+    monkeypatch.setattr(api, "admission", controller)
+    return controller
+
+
+class TestAdmissionController:
+    """Expected use: slots are capped and handed to waiters in arrival order."""
+
+    def test_fifo_handoff(self):
+        async def scenario():
+            controller = AdmissionController(max_inflight=1, max_queue=5)
+            order = []
+
+            async def request(name, hold):
+                async with controller.admit():
+                    order.append(name)
+                    await asyncio.sleep(hold)
+
+            first = asyncio.create_task(request("first", 0.05))
+            await asyncio.sleep(0)
+            waiters = [asyncio.create_task(request(n, 0)) for n in ("second", "third")]
+            await asyncio.sleep(0)
+            assert controller.inflight == 1 and controller.queued == 2
+            await asyncio.gather(first, *waiters)
+            return order, controller.inflight
+
+        order, inflight = asyncio.run(scenario())
+        assert order == ["first", "second", "third"] and inflight == 0
+
+    def test_unlimited_by_default(self):
+        async def scenario():
+            controller = AdmissionController()
+            for _ in range(50):
+                await controller.acquire()
+            return controller
+
+        assert asyncio.run(scenario()).inflight == 50
+
+
+class TestAdmissionEdgeCases:
+    """Edge case: red-flag requests get rule-based triage while overloaded."""
+
+    def test_timed_out_thread_keeps_its_slot(self):
+        """The slot is freed when the thread returns, not when its caller gives up."""
+        async def scenario():
+            controller = AdmissionController(max_inflight=1, max_queue=5)
+            with pytest.raises(asyncio.TimeoutError):
+                await controller.run_in_thread(time.sleep, 0.2, timeout=0.05)
+            held = controller.inflight
+            await asyncio.sleep(0.3)
+            return held, controller.inflight
+
+        assert asyncio.run(scenario()) == (1, 0)
+
+    def test_red_flag_fast_path(self, client, saturated):
+        response = client.post("/triage", json={"symptoms": "crushing chest pain, can't breathe"})
+        assert response.status_code == 200
+        assert response.json()["degraded"] is True
+
+    def test_rules_policy_degrades_everything(self, client, saturated, monkeypatch):
+        monkeypatch.setattr(api.api_config, "overload_policy", "rules")
+        response = client.post("/triage", json={"symptoms": "mild rash on arm"})
+        assert response.status_code == 200 and response.json()["degraded"] is True
+
+
+class TestAdmissionFailures:
+    """Failure case: overloaded requests get 429 with Retry-After."""
+
+    def test_queue_full(self):
+        async def scenario():
+            controller = AdmissionController(max_inflight=1, max_queue=0)
+            await controller.acquire()
+            await controller.acquire()
+
+        with pytest.raises(OverloadedError, match="queue full"):
+            asyncio.run(scenario())
+
+    def test_queue_timeout(self):
+        async def scenario():
+            controller = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=0.01)
+            await controller.acquire()
+            try:
+                await controller.acquire()
+            finally:
+                assert controller.queued == 0 and controller.inflight == 1
+
+        with pytest.raises(OverloadedError, match="queue timeout"):
+            asyncio.run(scenario())
+
+    def test_triage_returns_429(self, client, saturated):
+        response = client.post("/triage", json={"symptoms": "mild rash on arm"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_stream_returns_429_before_streaming(self, client, saturated):
+        response = client.post("/triage/stream", json={"symptoms": "mild rash on arm"})
+        assert response.status_code == 429
+
+    def test_queued_is_a_count(self):
+        """Failure case: timed-out waiters leave the queue depth other threads read."""
+        async def scenario():
+            controller = AdmissionController(max_inflight=1, max_queue=5, queue_timeout=0.05)
+            await controller.acquire()
+            waiters = [asyncio.create_task(controller.acquire()) for _ in range(2)]
+            await asyncio.sleep(0)
+            queued = controller.queued
+            await asyncio.gather(*waiters, return_exceptions=True)
+            return queued, controller.queued
+
+        assert asyncio.run(scenario()) == (2, 0)
@@ -0,0 +1,96 @@
+"""
+Tests for the NDJSON batch triage endpoint.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import json
+
+import pytest
+from dspy import ChainOfThought
+from fastapi.testclient import TestClient
+
+from stcc_triage.core.signatures import TriageSignature
+from stcc_triage.lm.scheduler import Lane, current_lane
+from stcc_triage.nurses.pool import NursePool
+from stcc_triage.nurses.roles import NurseRole
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    ChainOfThought(TriageSignature).save(str(tmp_path / "compiled_ob_nurse_agent.json"))
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    return TestClient(api.app)
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestBatchTriage:
+    """Expected use: every item comes back once, tagged with its index."""
+
+    def test_streams_one_line_per_item(self, client):
+        requests = [
+            {"symptoms": "severe chest pain and shortness of breath"},
+            {"symptoms": "mild rash on forearm for two days"},
+            {"symptoms": "bleeding in pregnancy", "nurse_role": "ob_nurse"},
+        ]
+        response = client.post("/triage/batch", json={"requests": requests})
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = _lines(response)
+        assert sorted(line["index"] for line in lines) == [0, 1, 2]
+        assert all(line["status_code"] == 200 and line["result"]["triage_level"] for line in lines)
+        assert all("usage" in line["result"] for line in lines)
+        assert all(line["result"]["rationale"] for line in lines)
+
+    def test_items_run_in_batch_lane(self, client, monkeypatch):
+        lanes = []
+        agent = api._agent
+        original = agent.triage
+
+        def triage(symptoms, conversation_history=None):
+            lanes.append(current_lane())
+            return original(symptoms, conversation_history)
+
+        monkeypatch.setattr(agent, "triage", triage)
+        client.post("/triage/batch", json={"requests": [{"symptoms": "fever"}] * 3})
+        assert lanes == [Lane.BATCH] * 3
+
+
+class TestBatchItemErrors:
+    """Edge case: a bad item yields an error line without failing the batch."""
+
+    def test_unknown_and_uncompiled_roles(self, client):
+        requests = [
+            {"symptoms": "fever", "nurse_role": "not_a_nurse"},
+            {"symptoms": "headache", "nurse_role": NurseRole.NEURO_NURSE.value},
+            {"symptoms": "cough for three days"},
+        ]
+        lines = {line["index"]: line for line in _lines(client.post("/triage/batch", json={"requests": requests}))}
+
+        assert lines[0]["status_code"] == 400 and "not_a_nurse" in lines[0]["error"]
+        assert lines[1]["status_code"] == 404
+        assert lines[2]["status_code"] == 200
+
+
+class TestBatchLimits:
+    """Failure case: empty and oversized batches are rejected up front."""
+
+    def test_empty_batch(self, client):
+        assert client.post("/triage/batch", json={"requests": []}).status_code == 422
+
+    def test_oversized_batch(self, client, monkeypatch):
+        monkeypatch.setattr(api.api_config, "batch_max_size", 2)
+        response = client.post("/triage/batch", json={"requests": [{"symptoms": "x"}] * 3})
+        assert response.status_code == 413
@@ -0,0 +1,189 @@
+"""
+Tests for stcc-triage-batch file-to-file triage with checkpoint/resume.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from stcc_triage.batch.records import read_records
+from stcc_triage.batch.runner import BatchCheckpoint, BatchRunner, read_results
+from stcc_triage.lm.scheduler import Lane, current_lane
+from stcc_triage.lm.usage import _current_usage
+
+
+class FakeAgent:
+    """Answers instantly; records lanes and can fail or stop at chosen symptoms."""
+
+    def __init__(self, fail=(), interrupt=(), cached=()):
+        self.fail, self.interrupt, self.cached = set(fail), set(interrupt), set(cached)
+        self.lanes, self.calls = set(), 0
+        self._lock = threading.Lock()
+
+    def triage(self, symptoms, conversation_history=None):
+        with self._lock:
+            self.calls += 1
+            self.lanes.add(current_lane())
+        if symptoms in self.interrupt:
+            raise KeyboardInterrupt
+        if symptoms in self.fail:
+            raise RuntimeError("LM exploded")
+        _current_usage.get().add({"total_tokens": 10}, cache_hit=symptoms in self.cached)
+        level = "Emergency" if conversation_history else "Home Care"
+        return SimpleNamespace(
+            triage_level=level, clinical_justification="ok", reasoning=f"thought about {symptoms}"
+        )
+
+
+def _write_jsonl(path, count, extra=()):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"id": f"call-{i}", "symptoms": f"s{i}"}) + "\n")
+        for line in extra:
+            f.write(line + "\n")
+    return path
+
+
+def _run(agent, input_path, output_path, **kwargs):
+    runner = BatchRunner(agent, concurrency=kwargs.pop("concurrency", 4), **kwargs)
+    return runner.run(read_records(input_path), input_path, output_path)
+
+
+class TestBatchRun:
+    """Expected use: every record gets one result line with latency and cache flag."""
+
+    def test_results_and_stats(self, tmp_path, usage_ledger):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 50)
+        agent = FakeAgent(cached={"s3"})
+
+        checkpoint = _run(agent, input_path, tmp_path / "out.jsonl")
+
+        lines = {line["index"]: line for line in read_results(tmp_path / "out.jsonl")}
+        assert sorted(lines) == list(range(50))
+        assert lines[7]["id"] == "call-7" and lines[7]["status"] == "ok"
+        assert lines[7]["result"]["triage_level"] == "Home Care"
+        assert lines[7]["result"]["rationale"] == "thought about s7"
+        assert lines[3]["cache_hit"] and not lines[4]["cache_hit"]
+        assert all(line["latency_ms"] >= 0 for line in lines.values())
+        assert checkpoint.complete and checkpoint.watermark == 50 and not checkpoint.done
+        assert checkpoint.stats["records"] == 50 and checkpoint.stats["cache_hits"] == 1
+        assert agent.lanes == {Lane.BATCH}
+        assert usage_ledger.load_day()["batch"]["general"]["calls"] == 50
+
+    def test_csv_records(self, tmp_path):
+        input_path = tmp_path / "calls.csv"
+        input_path.write_text(
+            'symptoms,conversation_history\nfever,\ncough,"[""earlier""]"\n', encoding="utf-8"
+        )
+        records = list(read_records(input_path))
+        assert [(r.index, r.id) for r in records] == [(0, "0"), (1, "1")]
+        assert records[1].conversation_history == ["earlier"]
+
+        _run(FakeAgent(), input_path, tmp_path / "out.jsonl")
+        results = read_results(tmp_path / "out.jsonl")
+        levels = {line["index"]: line["result"]["triage_level"] for line in results}
+        assert levels == {0: "Home Care", 1: "Emergency"}
+
+
+class TestResume:
+    """Edge case: an interrupted run resumes without losing or repeating records."""
+
+    def test_resume_after_interrupt(self, tmp_path):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 40)
+        output_path = tmp_path / "out.jsonl"
+
+        with pytest.raises(KeyboardInterrupt):
+            _run(
+                FakeAgent(interrupt={"s25"}),
+                input_path,
+                output_path,
+                concurrency=1,
+                checkpoint_every=5,
+            )
+        checkpoint = BatchCheckpoint.load(tmp_path / "out.jsonl.checkpoint.json")
+        assert not checkpoint.complete and checkpoint.watermark == 25
+        written = checkpoint.stats["records"]  # 26 may finish before 25's interrupt is seen
+
+        agent = FakeAgent()
+        checkpoint = _run(agent, input_path, output_path)
+
+        indexes = [line["index"] for line in read_results(output_path)]
+        assert sorted(indexes) == list(range(40))
+        assert agent.calls == 40 - written
+        assert checkpoint.stats["records"] == 40
+
+    def test_uncheckpointed_tail_is_redone(self, tmp_path):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 10)
+        output_path = tmp_path / "out.jsonl"
+        checkpoint_path = tmp_path / "out.jsonl.checkpoint.json"
+        _run(FakeAgent(), input_path, output_path)
+
+        # Simulate a crash after writing a partial line past the checkpoint
+        kept = b"".join(
+            line
+            for line in output_path.read_bytes().splitlines(keepends=True)
+            if json.loads(line)["index"] < 8
+        )
+        output_path.write_bytes(kept + b'{"index": 8, "trunc')
+        checkpoint = BatchCheckpoint.load(checkpoint_path)
+        checkpoint.complete, checkpoint.watermark, checkpoint.output_bytes = False, 8, len(kept)
+        checkpoint.save(checkpoint_path)
+
+        agent = FakeAgent()
+        _run(agent, input_path, output_path)
+        assert agent.calls == 2
+        assert sorted(line["index"] for line in read_results(output_path)) == list(range(10))
+
+    def test_memory_bounded_by_window(self, tmp_path):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 500)
+        pulled = []
+
+        def records():
+            for record in read_records(input_path):
+                pulled.append(record.index)
+                yield record
+
+        agent = FakeAgent()
+        ahead = []
+        original = agent.triage
+
+        def triage(symptoms, conversation_history=None):
+            ahead.append(len(pulled) - agent.calls)
+            return original(symptoms, conversation_history)
+
+        agent.triage = triage
+        BatchRunner(agent, concurrency=2).run(records(), input_path, tmp_path / "out.jsonl")
+        assert max(ahead) <= 2 * 2 + 1
+
+
+class TestFailures:
+    """Failure case: bad records and LM errors are reported, mismatched runs refused."""
+
+    def test_error_lines(self, tmp_path):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 3, extra=["not json", '{"id": "x"}'])
+        checkpoint = _run(FakeAgent(fail={"s1"}), input_path, tmp_path / "out.jsonl")
+
+        lines = {line["index"]: line for line in read_results(tmp_path / "out.jsonl")}
+        assert lines[1] == {**lines[1], "status": "error", "error": "LM exploded"}
+        assert lines[3]["status"] == "error" and "Invalid JSON" in lines[3]["error"]
+        assert lines[4]["error"] == "Missing 'symptoms'" and lines[4]["id"] == "x"
+        assert checkpoint.stats["errors"] == 3 and checkpoint.stats["ok"] == 2
+
+    def test_refuses_other_runs(self, tmp_path):
+        input_path = _write_jsonl(tmp_path / "calls.jsonl", 5)
+        output_path = tmp_path / "out.jsonl"
+        output_path.write_text("old results\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="--restart"):
+            _run(FakeAgent(), input_path, output_path)
+
+        runner = BatchRunner(FakeAgent(), concurrency=2)
+        runner.run(read_records(input_path), input_path, output_path, restart=True)
+        assert len(list(read_results(output_path))) == 5
+
+        other = BatchRunner(FakeAgent(), role="ob_nurse")
+        with pytest.raises(ValueError, match="another input or role"):
+            other.run(read_records(input_path), input_path, output_path)
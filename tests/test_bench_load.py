@@ -0,0 +1,102 @@
+"""
+Tests for the stcc-bench load generator.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from stcc_triage.bench.load import (
+    LoadCase,
+    LoadGenerator,
+    bundled_cases,
+    load_jsonl_cases,
+    parse_server_timing,
+)
+
+
+class _FakeAPI(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = 500 if "fail" in body["symptoms"] else 200
+        payload = json.dumps({"triage_level": "Urgent", "degraded": "slow" in body["symptoms"]})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Server-Timing", "retrieval;dur=2.0, lm;dur=40")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestLoadGenerator:
+    """Expected use: closed- and open-loop runs summarize every request."""
+
+    def test_closed_loop(self, api_url):
+        cases = [LoadCase("cough"), LoadCase("slow headache")]
+        result = LoadGenerator(api_url, cases, concurrency=3).run(requests=10)
+        summary = result["summary"]
+
+        assert result["meta"]["mode"] == "closed"
+        assert summary["requests"] == 10 and summary["succeeded"] == 10
+        assert summary["degraded_rate"] == pytest.approx(0.5)
+        assert summary["latency_seconds"]["p99"] >= summary["latency_seconds"]["p50"]
+        assert summary["stages_seconds"]["lm"]["p50"] == pytest.approx(0.04)
+
+    def test_open_loop_counts_errors(self, api_url):
+        cases = [LoadCase("cough"), LoadCase("fail")]
+        summary = LoadGenerator(api_url, cases, rps=50, seed=1).run(requests=10)["summary"]
+
+        assert summary["requests"] == 10
+        assert summary["errors"] == {"HTTP 500": 5}
+        assert summary["error_rate"] == pytest.approx(0.5)
+
+
+class TestCases:
+    """Edge case: bundled cases carry nurse roles; JSONL lines are validated."""
+
+    def test_bundled_cases_have_roles(self):
+        cases = bundled_cases()
+        assert len(cases) > 50
+        assert all(case.nurse_role for case in cases)
+
+    def test_jsonl_missing_symptoms(self, tmp_path):
+        path = tmp_path / "cases.jsonl"
+        path.write_text('{"symptoms": "fever"}\n\n{"nurse_role": "ob_nurse"}\n')
+        with pytest.raises(ValueError, match=":3:"):
+            load_jsonl_cases(path)
+
+    def test_server_timing_parsing(self):
+        stages = parse_server_timing('lm;dur=812.5;desc="DeepSeek", total;dur=bad, cache')
+        assert stages == {"lm": pytest.approx(0.8125)}
+
+
+class TestFailures:
+    """Failure case: bad configuration and unreachable servers."""
+
+    def test_specialized_requires_roles(self):
+        with pytest.raises(ValueError, match="nurse_role"):
+            LoadGenerator("http://127.0.0.1:1", [LoadCase("cough")], endpoint="specialized")
+
+    def test_connection_refused(self):
+        generator = LoadGenerator("http://127.0.0.1:1", [LoadCase("cough")], timeout=2)
+        summary = generator.run(requests=2)["summary"]
+        assert summary["succeeded"] == 0
+        assert summary["error_rate"] == 1.0
+        assert summary["latency_seconds"]["p50"] is None
@@ -0,0 +1,67 @@
+"""
+Tests for the stcc-bench micro-benchmark harness.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import pytest
+
+from stcc_triage.bench.micro import (
+    MicroResult,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+    time_callable,
+)
+
+
+def _result(name, median):
+    return MicroResult(name=name, median=median, best=median, loops=1, repeats=1)
+
+
+class TestRunBenchmarks:
+    """Expected use: selected benchmarks run and report per-call time."""
+
+    def test_prefix_selection(self):
+        results = run_benchmarks(["agent.find_missing_info"], repeats=2, min_time=0.001)
+        assert [r.name for r in results] == [
+            "agent.find_missing_info.short",
+            "agent.find_missing_info.long",
+        ]
+        assert all(0 < r.best <= r.median for r in results)
+
+    def test_time_callable_calibrates_loops(self):
+        median, best, loops = time_callable(lambda: None, repeats=2, min_time=0.001)
+        assert loops > 1
+        assert best <= median
+
+
+class TestBaseline:
+    """Edge case: baselines merge across partial runs."""
+
+    def test_save_keeps_other_entries(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        save_baseline([_result("a", 1.0), _result("b", 2.0)], path)
+        save_baseline([_result("a", 1.5)], path)
+
+        baseline = load_baseline(path)
+        assert baseline["a"]["median"] == 1.5
+        assert baseline["b"]["median"] == 2.0
+
+
+class TestCompare:
+    """Failure case: slowdowns beyond the tolerance are flagged."""
+
+    def test_statuses(self):
+        baseline = {"slow": {"median": 1.0}, "same": {"median": 1.0}, "fast": {"median": 1.0}}
+        rows = compare(
+            [_result("slow", 1.3), _result("same", 1.1), _result("fast", 0.5), _result("new", 1.0)],
+            baseline,
+            tolerance=0.2,
+        )
+        assert [row["status"] for row in rows] == ["regression", "ok", "faster", "new"]
+
+    def test_unknown_benchmark(self):
+        with pytest.raises(ValueError, match="No benchmarks match"):
+            run_benchmarks(["does.not.exist"])
@@ -0,0 +1,148 @@
+"""
+Tests for the LM circuit breaker and rule-based fallback.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import json
+import time
+
+import dspy
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.core.paths import get_protocols_json_path
+from stcc_triage.lm import breaker as breaker_module
+from stcc_triage.lm.breaker import CircuitBreaker, CircuitBreakerLM, CircuitOpenError
+from stcc_triage.nurses.pool import NursePool
+from stcc_triage.protocols.rules import RuleBasedTriage
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+class FlakyLM(dspy.BaseLM):
+    """Fake LM that fails while `down` is True."""
+
+    def __init__(self):
+        super().__init__(model="flaky")
+        self.down = True
+        self.calls = 0
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("DeepSeek unavailable")
+        return "ok"
+
+
+@pytest.fixture(scope="module")
+def rules():
+    with open(get_protocols_json_path(), encoding="utf-8") as f:
+        return RuleBasedTriage(json.load(f))
+
+
+class TestCircuitBreaker:
+    """Expected use: open after repeated failures, probe after the reset timeout."""
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        inner = FlakyLM()
+        lm = CircuitBreakerLM(inner, CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                lm.forward(prompt="hi")
+
+        with pytest.raises(CircuitOpenError):
+            lm.forward(prompt="hi")
+        assert inner.calls == 2
+        assert lm.breaker.snapshot()["state"] == "open"
+
+    def test_half_open_probe_closes_on_success(self):
+        inner = FlakyLM()
+        lm = CircuitBreakerLM(inner, CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+        with pytest.raises(ConnectionError):
+            lm.forward(prompt="hi")
+
+        time.sleep(0.06)
+        inner.down = False
+        assert lm.forward(prompt="hi") == "ok"
+        assert lm.breaker.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        """Failure case: a failing probe re-opens the breaker."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # only one probe at a time
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+class TestLMErrorFallback:
+    """Failure case: a failing LM answers from the rules, never with a 500."""
+
+    def test_first_failing_call_is_degraded(self, monkeypatch, tmp_path):
+        breaker = CircuitBreaker(failure_threshold=5)
+        monkeypatch.setattr(breaker_module, "_circuit_breaker", breaker)
+        monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://?error_rate=1.0")
+        monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+        monkeypatch.setenv("STCC_LM_CACHE", "false")
+        from stcc_triage.core.agent import STCCTriageAgent
+
+        agent = STCCTriageAgent()
+        monkeypatch.setattr(api, "_agent", agent)
+        monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+        client = TestClient(api.app)
+
+        response = client.post("/triage", json={"symptoms": "severe chest pain"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["degraded"] is True and body["mode"] == "rules"
+        assert body["triage_level"] == "Emergency"
+        assert breaker.snapshot()["consecutive_failures"] == 1
+        assert breaker.state == "closed"
+
+
+class TestRuleBasedTriage:
+    """Edge case: the fallback never under-triages unknown presentations."""
+
+    def test_red_flag_is_emergency(self, rules):
+        result = rules.triage("55-year-old with severe chest pain")
+        assert result.triage_level == "Emergency"
+        assert result.degraded is True
+
+    def test_section_a_condition_is_emergency(self, rules):
+        result = rules.triage("胸口发紧，呼吸短促，皮肤湿冷")
+        assert result.triage_level == "Emergency"
+
+    def test_unmatched_defaults_to_urgent(self, rules):
+        result = rules.triage("mild itchy rash on forearm")
+        assert result.triage_level == "Urgent"
+
+    def test_answers_within_milliseconds(self, rules):
+        start = time.perf_counter()
+        rules.triage("孩子发烧两天，有点咳嗽，精神还可以" * 10)
+        assert time.perf_counter() - start < 0.05
+
+    def test_failing_followup_triages_instead(self, monkeypatch, tmp_path):
+        """Failure case: a follow-up question the LM cannot write still answers the turn."""
+        breaker = CircuitBreaker(failure_threshold=5)
+        monkeypatch.setattr(breaker_module, "_circuit_breaker", breaker)
+        monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://?error_rate=1.0")
+        monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+        monkeypatch.setenv("STCC_LM_CACHE", "false")
+        from stcc_triage.core.agent import STCCTriageAgent
+
+        agent = STCCTriageAgent()
+        monkeypatch.setattr(api, "_agent", agent)
+        monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+        client = TestClient(api.app)
+
+        session_id = client.post("/sessions", json={}).json()["session_id"]
+        response = client.post(f"/sessions/{session_id}/messages", json={"message": "my stomach hurts"})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["action"] == "triage"
+        assert body["result"]["degraded"] is True
+        assert breaker.snapshot()["consecutive_failures"] == 2
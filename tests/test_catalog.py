@@ -0,0 +1,100 @@
+"""
+Tests for the protocol browsing and search API.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import gzip
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.catalog import ProtocolCatalog
+
+api = importlib.import_module("stcc_triage.api.app")
+
+PROTOCOLS = [
+    {
+        "protocol_name": "胸痛",
+        "category": "胸痛",
+        "key_questions": ["年龄"],
+        "sections": [
+            {"section_id": "A", "urgency_level": "emergency", "conditions": ["呼吸困难"], "action": "呼叫120"}
+        ],
+        "red_flags": ["呼吸困难"],
+    },
+    {
+        "protocol_name": "咳嗽",
+        "category": "咳嗽",
+        "key_questions": [],
+        "sections": [
+            {"section_id": "B", "urgency_level": "urgent", "conditions": ["胸痛伴发热"], "action": ""}
+        ],
+        "red_flags": [],
+    },
+    {"protocol_name": "皮疹", "category": "皮疹", "key_questions": [], "sections": [], "red_flags": []},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, "_protocol_catalog", ProtocolCatalog(PROTOCOLS))
+    return TestClient(api.app)
+
+
+class TestProtocolCatalog:
+    """Expected use: list, fetch and search protocols."""
+
+    def test_list_pages(self, client):
+        body = client.get("/protocols?offset=1&limit=1").json()
+        assert body["total"] == 3 and [item["id"] for item in body["items"]] == [1]
+        assert body["items"][0]["urgency_levels"] == ["urgent"]
+
+    def test_get_protocol(self, client):
+        body = client.get("/protocols/0").json()
+        assert body["id"] == 0 and body["sections"][0]["action"] == "呼叫120"
+
+    def test_search_ranks_name_matches_first(self, client):
+        body = client.get("/protocols/search", params={"q": "胸痛"}).json()
+        assert [item["id"] for item in body["items"]] == [0, 1]
+
+
+class TestProtocolCatalogEdgeCases:
+    """Edge case: ETags, 304s and gzip make repeat fetches cheap."""
+
+    def test_etag_revalidation(self, client):
+        first = client.get("/protocols/0")
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and first.headers["Cache-Control"] == "no-cache"
+
+        repeat = client.get("/protocols/0", headers={"If-None-Match": etag})
+        assert repeat.status_code == 304 and repeat.content == b""
+
+    def test_gzip_and_identity(self, client):
+        zipped = client.get("/protocols", headers={"Accept-Encoding": "gzip"})
+        assert zipped.headers["Content-Encoding"] == "gzip"
+        plain = client.get("/protocols", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+        assert plain.headers["ETag"] != zipped.headers["ETag"]
+        assert zipped.json() == plain.json()
+
+    def test_store_change_invalidates_etags(self):
+        catalog = ProtocolCatalog(PROTOCOLS)
+        changed = ProtocolCatalog(PROTOCOLS[:2])
+        assert catalog.get(0).etag != changed.get(0).etag
+        assert json.loads(gzip.decompress(catalog.get(0).gzipped)) == json.loads(catalog.get(0).body)
+
+
+class TestProtocolCatalogFailures:
+    """Failure case: unknown ids and empty queries."""
+
+    def test_unknown_protocol(self, client):
+        assert client.get("/protocols/99").status_code == 404
+
+    def test_missing_query(self, client):
+        assert client.get("/protocols/search").status_code == 422
+
+    def test_no_matches(self, client):
+        assert client.get("/protocols/search", params={"q": "骨折"}).json()["total"] == 0
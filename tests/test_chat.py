@@ -0,0 +1,110 @@
+"""
+Tests for the WebSocket chat endpoint.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from stcc_triage.api.sessions import SessionStore
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    monkeypatch.setattr(api, "_session_store", SessionStore())
+    return agent
+
+
+@pytest.fixture
+def client(agent):
+    return TestClient(api.app)
+
+
+class TestChat:
+    """Expected use: questions and triage are pushed over one connection."""
+
+    def test_ask_then_triage(self, client):
+        with client.websocket_connect("/chat?max_rounds=1") as ws:
+            session = ws.receive_json()
+            assert session["type"] == "session" and session["max_rounds"] == 1
+
+            ws.send_json({"message": "my stomach hurts"})
+            questions = ws.receive_json()
+            assert questions["type"] == "questions" and questions["question_rounds"] == 1
+
+            ws.send_json({"message": "since yesterday, it is severe"})
+            event = ws.receive_json()
+            while event["type"] == "chunk":
+                event = ws.receive_json()
+            assert event["type"] == "triage" and event["result"]["triage_level"]
+
+        assert len(api._session_store.get(session["session_id"]).history) == 2
+
+    def test_triage_output_is_streamed(self, client, agent, monkeypatch):
+        async def stream_triage(symptoms, conversation_history=None):
+            yield "reasoning", "Crushing chest pain "
+            yield "triage_level", "Emergency"
+            yield agent.fallback_triage(symptoms)
+
+        monkeypatch.setattr(agent, "stream_triage", stream_triage)
+        with client.websocket_connect("/chat?max_rounds=0") as ws:
+            ws.receive_json()
+            ws.send_json({"message": "crushing chest pain"})
+            events = [ws.receive_json() for _ in range(3)]
+
+        assert [e["type"] for e in events] == ["chunk", "chunk", "triage"]
+        assert events[1] == {"type": "chunk", "field": "triage_level", "text": "Emergency"}
+
+
+class TestChatEdgeCases:
+    """Edge case: resuming sessions, bad frames and idle connections."""
+
+    def test_resume_session(self, client):
+        session_id = client.post("/sessions", json={}).json()["session_id"]
+        with client.websocket_connect(f"/chat?session_id={session_id}") as ws:
+            assert ws.receive_json()["session_id"] == session_id
+
+    def test_invalid_frame_keeps_connection(self, client):
+        with client.websocket_connect("/chat") as ws:
+            ws.receive_json()
+            ws.send_text("not json")
+            assert ws.receive_json()["status_code"] == 422
+            ws.send_json({"message": "severe headache since this morning, 40 years old"})
+            assert ws.receive_json()["type"] in ("questions", "chunk", "triage")
+
+    def test_idle_timeout(self, client, monkeypatch):
+        monkeypatch.setattr(api.api_config, "ws_idle_timeout", 0.05)
+        with client.websocket_connect("/chat") as ws:
+            ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 1000
+
+
+class TestChatFailures:
+    """Failure case: unknown sessions and nurse roles close the connection."""
+
+    def test_unknown_session(self, client):
+        with client.websocket_connect("/chat?session_id=nope") as ws:
+            assert ws.receive_json()["status_code"] == 404
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        assert closed.value.code == 4404
+
+    def test_unknown_role(self, client):
+        with client.websocket_connect("/chat?nurse_role=not_a_nurse") as ws:
+            assert ws.receive_json()["status_code"] == 400
@@ -0,0 +1,111 @@
+"""
+Tests for per-request deadlines.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import time
+
+import dspy
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.lm.breaker import CircuitBreaker, CircuitBreakerLM
+from stcc_triage.lm.deadline import expired, remaining, request_deadline
+from stcc_triage.lm.quality import QualityController, QualityMode, get_quality_controller
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+def _client(monkeypatch, tmp_path, base_url="stub://"):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", base_url)
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def quality():
+    controller = get_quality_controller()
+    controller.reset()
+    yield controller
+    controller.reset()
+
+
+class TestDeadline:
+    """Expected use: the richest strategy that fits the deadline is used."""
+
+    def test_context(self):
+        assert remaining() is None and not expired()
+        with request_deadline(10):
+            assert 9 < remaining() <= 10
+            with request_deadline(60):  # Never extends the outer deadline
+                assert remaining() <= 10
+        assert remaining() is None
+
+    def test_fit_picks_richest_mode(self):
+        controller = QualityController()
+        for _ in range(5):
+            controller.record(QualityMode.FULL, 5.0)
+            controller.record(QualityMode.FAST, 1.0)
+        assert controller.fit(QualityMode.FULL, 6.0) == QualityMode.FULL
+        assert controller.fit(QualityMode.FULL, 2.0) == QualityMode.FAST
+        assert controller.fit(QualityMode.FAST, 0.5) == QualityMode.RULES
+
+    def test_api_downgrades_to_fast(self, monkeypatch, tmp_path, quality):
+        client = _client(monkeypatch, tmp_path)
+        for _ in range(5):
+            quality.record(QualityMode.FULL, 30.0)
+        body = client.post("/triage", json={"symptoms": "mild rash", "deadline_ms": 5000}).json()
+        assert body["mode"] == "fast" and body["degraded"] is False
+
+
+class TestDeadlineEdgeCases:
+    """Edge case: without a deadline, or with no samples, full quality is used."""
+
+    def test_no_deadline(self, monkeypatch, tmp_path, quality):
+        client = _client(monkeypatch, tmp_path)
+        for _ in range(5):
+            quality.record(QualityMode.FULL, 30.0)
+        assert client.post("/triage", json={"symptoms": "mild rash"}).json()["mode"] == "full"
+
+    def test_unknown_latency_is_optimistic(self):
+        assert QualityController().fit(QualityMode.FULL, 0.1) == QualityMode.FULL
+
+
+class TestDeadlineFailures:
+    """Failure case: a missed deadline answers with rules and spares the breaker."""
+
+    def test_slow_lm_falls_back_within_deadline(self, monkeypatch, tmp_path, quality):
+        client = _client(monkeypatch, tmp_path, "stub://?latency=constant:2000")
+        start = time.perf_counter()
+        response = client.post("/triage", json={"symptoms": "mild rash", "deadline_ms": 200})
+        assert time.perf_counter() - start < 1.5
+        assert response.json()["mode"] == "rules" and response.json()["degraded"] is True
+
+    def test_invalid_deadline(self, monkeypatch, tmp_path):
+        client = _client(monkeypatch, tmp_path)
+        response = client.post("/triage", json={"symptoms": "x", "deadline_ms": 0})
+        assert response.status_code == 422
+
+    def test_deadline_timeouts_do_not_open_breaker(self):
+        class TimingOutLM(dspy.BaseLM):
+            def forward(self, prompt=None, messages=None, **kwargs):
+                time.sleep(0.02)
+                raise TimeoutError("LM timed out")
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        lm = CircuitBreakerLM(TimingOutLM(model="slow"), breaker)
+        with request_deadline(0.01), pytest.raises(TimeoutError):
+            lm.forward(prompt="hi")
+        assert breaker.snapshot()["state"] == "closed"
+
+        with pytest.raises(TimeoutError):
+            lm.forward(prompt="hi")
+        assert breaker.snapshot()["state"] == "open"
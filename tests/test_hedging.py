@@ -0,0 +1,148 @@
+"""
+Tests for hedged LM requests.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+
+import dspy
+import pytest
+
+from stcc_triage.lm.hedging import HedgedLM, HedgingStats, get_hedging_stats, latency_percentile
+from stcc_triage.telemetry.metrics import get_registry
+
+
+class ScriptedLM(dspy.BaseLM):
+    """Fake LM whose n-th call sleeps for latencies[n] and returns 'call-n'."""
+
+    def __init__(self, latencies, fail_calls=()):
+        super().__init__(model="scripted")
+        self.latencies = latencies
+        self.fail_calls = set(fail_calls)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.cancelled = []
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        with self._lock:
+            n = next(self._counter)
+        time.sleep(self.latencies[n])
+        if n in self.fail_calls:
+            raise RuntimeError(f"call-{n} failed")
+        return f"call-{n}"
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        with self._lock:
+            n = next(self._counter)
+        try:
+            await asyncio.sleep(self.latencies[n])
+        except asyncio.CancelledError:
+            self.cancelled.append(n)
+            raise
+        if n in self.fail_calls:
+            raise RuntimeError(f"call-{n} failed")
+        return f"call-{n}"
+
+
+def make_hedged(latencies, fail_calls=(), delay=0.05):
+    return HedgedLM(
+        ScriptedLM(latencies, fail_calls),
+        initial_delay=delay,
+        min_samples=1000,
+        stats=HedgingStats(),
+    )
+
+
+class TestHedgedLM:
+    """Expected use: hedge only slow calls and take the fastest answer."""
+
+    def test_fast_call_is_not_hedged(self):
+        lm = make_hedged([0.0])
+        assert lm.forward(prompt="hi") == "call-0"
+        snapshot = lm.stats.snapshot()
+        assert snapshot["hedges"] == 0
+        assert snapshot["hedge_rate"] == 0.0
+
+    def test_slow_call_is_hedged_and_duplicate_wins(self):
+        lm = make_hedged([1.0, 0.0])
+        start = time.perf_counter()
+        assert lm.forward(prompt="hi") == "call-1"
+        assert time.perf_counter() - start < 0.5
+        snapshot = lm.stats.snapshot()
+        assert snapshot["hedges"] == 1
+        assert snapshot["hedge_wins"] == 1
+
+    def test_failed_hedge_waits_for_primary(self):
+        """Failure case: a fast error must not beat a slow success."""
+        lm = make_hedged([0.2, 0.0], fail_calls={1})
+        assert lm.forward(prompt="hi") == "call-0"
+
+    def test_both_failures_propagate(self):
+        lm = make_hedged([0.1, 0.0], fail_calls={0, 1})
+        with pytest.raises(RuntimeError):
+            lm.forward(prompt="hi")
+
+
+class TestAsyncHedging:
+    """Expected use: aforward hedges, returns the winner and cancels the loser."""
+
+    def test_duplicate_wins_and_primary_is_cancelled(self):
+        lm = make_hedged([1.0, 0.0])
+        start = time.perf_counter()
+        assert asyncio.run(lm.aforward(prompt="hi")) == "call-1"
+        assert time.perf_counter() - start < 0.5
+        assert lm.lm.cancelled == [0]
+
+        snapshot = lm.stats.snapshot()
+        assert snapshot["hedges"] == 1 and snapshot["hedge_wins"] == 1
+        # The cancelled primary is kept as a lower bound on its latency
+        assert len(lm.stats.primary_latencies) == 1
+        assert lm.stats.primary_latencies[0] >= 0.05
+
+    def test_fast_call_is_not_hedged(self):
+        lm = make_hedged([0.0])
+        assert asyncio.run(lm.aforward(prompt="hi")) == "call-0"
+        assert lm.stats.snapshot()["hedges"] == 0
+        assert lm.lm.cancelled == []
+
+
+class TestHedgingMetrics:
+    """Expected use: hedge rate and p99 improvement are exported on /metrics."""
+
+    def test_gauges_rendered(self):
+        stats = get_hedging_stats()
+        stats.reset()
+        try:
+            for _ in range(3):
+                stats.record_primary(2.0)
+            stats.record_call(0.5, hedged=True, hedge_won=True)
+            stats.record_call(0.5, hedged=False, hedge_won=False)
+            text = get_registry().render()
+        finally:
+            stats.reset()
+        assert "stcc_lm_hedge_rate 0.5" in text
+        assert 'stcc_lm_hedging_p99_seconds{latency="primary"} 2' in text
+        assert 'stcc_lm_hedging_p99_seconds{latency="effective"} 0.5' in text
+        assert "stcc_lm_hedging_p99_improvement_seconds 1.5" in text
+
+
+class TestHedgeDelay:
+    """Edge case: the delay is learned from recent primary latencies."""
+
+    def test_uses_initial_delay_until_warm(self):
+        lm = make_hedged([0.0], delay=1.5)
+        assert lm.hedge_delay() == 1.5
+
+    def test_learns_percentile_within_bounds(self):
+        stats = HedgingStats()
+        for latency in [0.1] * 19 + [5.0]:
+            stats.record_primary(latency)
+        lm = HedgedLM(ScriptedLM([0.0]), percentile=90, min_samples=10, stats=stats)
+        assert lm.hedge_delay() == pytest.approx(0.2)  # clamped to min_delay
+
+    def test_percentile_of_empty_sample(self):
+        assert latency_percentile([], 99) is None
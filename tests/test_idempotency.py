@@ -0,0 +1,132 @@
+"""
+Tests for Idempotency-Key handling in the API.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.idempotency import IdempotencyStore, StoredResponse
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    monkeypatch.setattr(api, "idempotency", IdempotencyStore())
+    return agent
+
+
+@pytest.fixture
+def client(agent):
+    return TestClient(api.app)
+
+
+def _counting(agent, monkeypatch, delay=0.0):
+    calls = []
+    triage = agent.triage
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        time.sleep(delay)
+        return triage(*args, **kwargs)
+
+    monkeypatch.setattr(agent, "triage", counted)
+    return calls
+
+
+class TestIdempotency:
+    """Expected use: retries replay the first response without another LM call."""
+
+    def test_retry_replays_bytes(self, client, agent, monkeypatch):
+        calls = _counting(agent, monkeypatch)
+        headers = {"Idempotency-Key": "abc-123"}
+        first = client.post("/triage", json={"symptoms": "mild rash"}, headers=headers)
+        retry = client.post("/triage", json={"symptoms": "mild rash"}, headers=headers)
+
+        assert retry.content == first.content and retry.status_code == 200
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert len(calls) == 1
+
+    def test_concurrent_retries_wait_for_original(self, client, agent, monkeypatch):
+        calls = _counting(agent, monkeypatch, delay=0.3)
+        results = []
+
+        def send():
+            results.append(client.post(
+                "/triage", json={"symptoms": "mild rash"}, headers={"Idempotency-Key": "same"}
+            ))
+
+        threads = [threading.Thread(target=send) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len({r.content for r in results}) == 1
+
+
+class TestIdempotencyEdgeCases:
+    """Edge case: requests without a key, other keys and expired entries run normally."""
+
+    def test_without_key_or_with_other_key(self, client, agent, monkeypatch):
+        calls = _counting(agent, monkeypatch)
+        client.post("/triage", json={"symptoms": "mild rash"})
+        client.post("/triage", json={"symptoms": "mild rash"})
+        client.post("/triage", json={"symptoms": "mild rash"}, headers={"Idempotency-Key": "a"})
+        client.post("/triage", json={"symptoms": "mild rash"}, headers={"Idempotency-Key": "b"})
+        assert len(calls) == 4
+
+    def test_ttl_and_capacity(self):
+        async def scenario():
+            store = IdempotencyStore(max_entries=1, ttl_seconds=60)
+            for key in ("a", "b"):
+                assert store.begin(key, "fp") is None
+                store.finish(key, StoredResponse("fp", 200, {}, key.encode()))
+            assert store.begin("a", "fp") is None  # Evicted by capacity
+            store._responses["b"].created_at -= 61
+            assert store.begin("b", "fp") is None  # Expired
+            return len(store)
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestIdempotencyFailures:
+    """Failure case: reused keys, bad keys and transient errors."""
+
+    def test_key_reused_with_other_body(self, client):
+        headers = {"Idempotency-Key": "k"}
+        client.post("/triage", json={"symptoms": "mild rash"}, headers=headers)
+        response = client.post("/triage", json={"symptoms": "chest pain"}, headers=headers)
+        assert response.status_code == 422
+
+    def test_too_long_key(self, client):
+        response = client.post(
+            "/triage", json={"symptoms": "x"}, headers={"Idempotency-Key": "k" * 256}
+        )
+        assert response.status_code == 400
+
+    def test_server_errors_are_not_stored(self, client, agent, monkeypatch):
+        def broken(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(agent, "triage", broken)
+        headers = {"Idempotency-Key": "retry-me"}
+        assert client.post("/triage", json={"symptoms": "x"}, headers=headers).status_code == 500
+        assert len(api.idempotency) == 0
@@ -0,0 +1,93 @@
+"""
+Tests for lazy package imports and the import-time budgets.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import stcc_triage
+from stcc_triage.bench.imports import (
+    ImportBudget,
+    format_import_results,
+    run_import_budgets,
+    time_import,
+)
+
+
+def _loaded_after(statement: str) -> str:
+    probe = "print(sorted(m for m in ('dspy', 'fastapi') if m in sys.modules))"
+    code = f"import sys\n{statement}\n{probe}"
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestLazyPackage:
+    """Expected use: the package and entry points import without DSPy."""
+
+    @pytest.mark.parametrize(
+        "statement",
+        [
+            "import stcc_triage",
+            "import stcc_triage.cli.api, stcc_triage.cli.bench, stcc_triage.cli.optimize",
+            "import stcc_triage.cli.batch, stcc_triage.batch",
+            "import stcc_triage.cli.parse, stcc_triage.cli.stub",
+            "from stcc_triage.lm.stub import StubResponder, create_stub_server",
+            "from stcc_triage.protocols.parser import parse_all_protocols",
+        ],
+    )
+    def test_no_heavy_imports(self, statement):
+        assert _loaded_after(statement) == "[]"
+
+    def test_names_resolve_on_first_use(self):
+        assert _loaded_after("from stcc_triage import STCCTriageAgent") == "['dspy']"
+        assert stcc_triage.STCCTriageAgent.__name__ == "STCCTriageAgent"
+        assert "STCCTriageAgent" in vars(stcc_triage)  # Cached after first lookup
+        assert set(stcc_triage.__all__) <= set(dir(stcc_triage))
+
+
+class TestStubLMCompat:
+    """Edge case: StubLM is still importable from its old module."""
+
+    def test_old_path(self):
+        from stcc_triage.lm.stub import StubLM as OldStubLM
+        from stcc_triage.lm.stub_lm import StubLM as NewStubLM
+
+        assert OldStubLM is NewStubLM
+
+
+class TestUnknownName:
+    """Failure case: unknown attributes still raise AttributeError."""
+
+    def test_attribute_error(self):
+        with pytest.raises(AttributeError, match="no_such_name"):
+            stcc_triage.no_such_name
+        with pytest.raises(ImportError):
+            from stcc_triage.lm import no_such_name  # noqa: F401
+
+
+class TestImportBudgets:
+    """Expected use and failure case: budgets pass, overruns and DSPy loads fail."""
+
+    def test_within_budget(self):
+        [result] = run_import_budgets([ImportBudget("stcc_triage", 5.0)], repeats=1)
+        assert result.ok and not result.dspy_loaded
+        assert "OK" in format_import_results([result])
+
+    def test_over_budget_and_dspy(self):
+        [slow, heavy] = run_import_budgets(
+            [ImportBudget("json", 0.0), ImportBudget("stcc_triage.lm.stub_lm", 60.0)],
+            repeats=1,
+        )
+        assert not slow.ok and not heavy.ok
+        assert heavy.dspy_loaded
+        table = format_import_results([slow, heavy])
+        assert "OVER BUDGET" in table and "LOADS DSPY" in table
+
+    def test_failed_import(self):
+        with pytest.raises(RuntimeError, match="no_such_module"):
+            time_import("stcc_triage.no_such_module", repeats=1)
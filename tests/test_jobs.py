@@ -0,0 +1,178 @@
+"""
+Tests for the persistent triage job queue.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import json
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.jobs import JobQueue, JobStore
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def queue(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    # No worker threads: tests drain the queue with run_once()
+    job_queue = JobQueue(JobStore(tmp_path / "jobs.sqlite3"), api.run_job_item, workers=0)
+    monkeypatch.setattr(api, "_job_queue", job_queue)
+    return job_queue
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _jsonl(*requests):
+    return "\n".join(json.dumps(r) for r in requests)
+
+
+class TestJobs:
+    """Expected use: submit JSONL, poll progress, download results in order."""
+
+    def test_submit_poll_download(self, queue):
+        client = TestClient(api.app)
+        body = _jsonl(
+            {"symptoms": "severe chest pain and shortness of breath"},
+            {"symptoms": "mild rash on forearm for two days"},
+        )
+        response = client.post("/jobs", content=body)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued" and job["total"] == 2
+        assert response.headers["location"] == f"/jobs/{job['id']}"
+
+        assert queue.run_once()
+        assert client.get(f"/jobs/{job['id']}").json()["status"] == "running"
+        assert queue.run_once() and not queue.run_once()
+
+        progress = client.get(f"/jobs/{job['id']}").json()
+        assert progress["status"] == "completed" and progress["done"] == 2
+        lines = [json.loads(line) for line in client.get(f"/jobs/{job['id']}/results").text.splitlines()]
+        assert [line["index"] for line in lines] == [0, 1]
+        assert all(line["result"]["triage_level"] for line in lines)
+
+
+class TestJobEdgeCases:
+    """Edge case: unfinished items are resumed after a restart; 5xx items are retried."""
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite3")
+        job_id = store.submit([{"symptoms": "fever"}])
+        assert store.claim()[:2] == (job_id, 0)
+        assert store.claim() is None  # Leased to the (crashed) worker
+
+        restarted = JobStore(tmp_path / "jobs.sqlite3", lease_seconds=0)
+        assert restarted.claim()[:2] == (job_id, 0)
+
+    def test_finish_after_lost_lease_is_ignored(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite3", lease_seconds=0)
+        job_id = store.submit([{"symptoms": "fever"}])
+        stale = store.claim()
+        current = store.claim()  # Lease expired: another worker takes the item
+
+        assert not store.finish(job_id, 0, 200, {"index": 0, "stale": True}, stale[3])
+        assert store.progress(job_id)["running"] == 1
+        assert store.finish(job_id, 0, 200, {"index": 0}, current[3])
+        assert list(store.results(job_id)) == [{"index": 0}]
+
+    def test_dead_owner_is_released_at_start(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite3")
+        job_id = store.submit([{"symptoms": "fever"}, {"symptoms": "cough"}])
+        store.claim()
+        store.claim()
+        store._connection().execute(
+            "UPDATE items SET owner_pid = ? WHERE idx = 0", (_dead_pid(),)
+        )
+
+        JobQueue(store, api.run_job_item, workers=0).start()
+        assert store.claim()[:2] == (job_id, 0)
+        assert store.claim() is None  # Still held by this (live) process
+        assert store.release_stale() == 0
+
+    def test_server_error_is_retried(self, tmp_path):
+        outcomes = [RuntimeError("LM exploded"), (200, {"index": 0, "status_code": 200})]
+
+        def runner(index, request):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        store = JobStore(tmp_path / "jobs.sqlite3", retry_delay=0)
+        queue = JobQueue(store, runner, workers=0)
+        job_id = queue.submit([{"symptoms": "fever"}])
+        assert queue.run_once()
+        assert store.progress(job_id)["pending"] == 1
+        assert queue.run_once() and not queue.run_once()
+        assert store.progress(job_id)["done"] == 1
+
+    def test_item_error_does_not_fail_job(self, queue):
+        job_id = queue.submit([{"symptoms": "fever", "nurse_role": "not_a_nurse"}])
+        queue.run_once()
+
+        progress = queue.store.progress(job_id)
+        assert progress["status"] == "completed" and progress["failed"] == 1
+        line = next(queue.store.results(job_id))
+        assert line["status_code"] == 400 and "not_a_nurse" in line["error"]
+
+
+class TestJobFailures:
+    """Failure case: bad uploads are rejected, retries stop, unknown jobs are 404."""
+
+    def test_invalid_line(self, queue):
+        client = TestClient(api.app)
+        response = client.post("/jobs", content=_jsonl({"symptoms": "fever"}, {"age": 3}))
+        assert response.status_code == 400 and "Line 2" in response.json()["detail"]
+
+    def test_empty_and_oversized(self, queue, monkeypatch):
+        client = TestClient(api.app)
+        assert client.post("/jobs", content="\n").status_code == 400
+
+        monkeypatch.setattr(api.api_config, "jobs_max_items", 1)
+        body = _jsonl({"symptoms": "fever"}, {"symptoms": "cough"})
+        assert client.post("/jobs", content=body).status_code == 413
+
+    def test_retries_are_bounded(self, tmp_path):
+        def runner(index, request):
+            raise RuntimeError("LM exploded")
+
+        store = JobStore(tmp_path / "jobs.sqlite3", max_attempts=2, retry_delay=0)
+        queue = JobQueue(store, runner, workers=0)
+        job_id = queue.submit([{"symptoms": "fever"}])
+        assert queue.run_once() and queue.run_once() and not queue.run_once()
+
+        assert store.progress(job_id)["failed"] == 1
+        assert next(store.results(job_id))["error"] == "LM exploded"
+
+    def test_old_queue_file_is_migrated(self, tmp_path):
+        path = tmp_path / "jobs.sqlite3"
+        store = JobStore(path)
+        store._connection().executescript(
+            "DROP TABLE items; CREATE TABLE items (job_id TEXT NOT NULL, idx INTEGER NOT NULL, "
+            "request TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', claimed_at REAL, "
+            "finished_at REAL, result TEXT, PRIMARY KEY (job_id, idx));"
+        )
+        job_id = JobStore(path).submit([{"symptoms": "fever"}])
+        assert JobStore(path).claim()[:2] == (job_id, 0)
+
+    def test_unknown_job(self, queue):
+        client = TestClient(api.app)
+        assert client.get("/jobs/nope").status_code == 404
+        assert client.get("/jobs/nope/results").status_code == 404
@@ -0,0 +1,95 @@
+"""
+Tests for the compiled nurse pool.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import threading
+
+import pytest
+from dspy import ChainOfThought
+
+from stcc_triage.core.signatures import TriageSignature
+from stcc_triage.nurses.pool import NursePool
+from stcc_triage.nurses.roles import NurseRole
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    return STCCTriageAgent()
+
+
+@pytest.fixture
+def compiled_dir(tmp_path):
+    for role in (NurseRole.OB_NURSE, NurseRole.GI_NURSE):
+        ChainOfThought(TriageSignature).save(str(tmp_path / f"compiled_{role.value}_agent.json"))
+    return tmp_path
+
+
+class TestNursePool:
+    """Expected use: each role is loaded once and shares the base agent's protocols."""
+
+    def test_loads_once_and_shares_protocols(self, agent, compiled_dir):
+        pool = NursePool(agent, compiled_dir)
+        nurse = pool.get(NurseRole.OB_NURSE)
+
+        assert pool.get(NurseRole.OB_NURSE) is nurse
+        assert nurse.protocols is agent.protocols and nurse.rules is agent.rules
+        assert nurse.triage_module is not agent.triage_module
+
+    def test_preload_finds_compiled_roles(self, agent, compiled_dir):
+        pool = NursePool(agent, compiled_dir)
+        assert set(pool.preload()) == {NurseRole.OB_NURSE, NurseRole.GI_NURSE}
+
+    def test_triage_uses_role_program(self, agent, compiled_dir):
+        nurse = NursePool(agent, compiled_dir).get(NurseRole.GI_NURSE)
+        result = nurse.triage("severe abdominal pain and vomiting blood")
+        assert result.triage_level
+
+
+class TestNursePoolConcurrency:
+    """Edge case: concurrent first requests never mutate the base agent or race."""
+
+    def test_concurrent_roles(self, agent, compiled_dir):
+        pool = NursePool(agent, compiled_dir)
+        base_module = agent.triage_module
+        results = {}
+
+        def fetch(role):
+            results.setdefault(role, []).append(pool.get(role))
+
+        threads = [
+            threading.Thread(target=fetch, args=(role,))
+            for role in (NurseRole.OB_NURSE, NurseRole.GI_NURSE) * 8
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for nurses in results.values():
+            assert all(nurse is nurses[0] for nurse in nurses)
+        ob, gi = results[NurseRole.OB_NURSE][0], results[NurseRole.GI_NURSE][0]
+        assert ob.triage_module is not gi.triage_module
+        assert agent.triage_module is base_module
+
+    def test_reload_drops_role(self, agent, compiled_dir):
+        pool = NursePool(agent, compiled_dir)
+        first = pool.get(NurseRole.OB_NURSE)
+        pool.reload(NurseRole.OB_NURSE)
+        assert pool.loaded_roles() == []
+        assert pool.get(NurseRole.OB_NURSE) is not first
+
+
+class TestNursePoolFailures:
+    """Failure case: roles without a compiled program raise FileNotFoundError."""
+
+    def test_missing_role(self, agent, compiled_dir):
+        pool = NursePool(agent, compiled_dir)
+        with pytest.raises(FileNotFoundError, match="stcc-optimize --role neuro_nurse"):
+            pool.get(NurseRole.NEURO_NURSE)
+        assert pool.loaded_roles() == []
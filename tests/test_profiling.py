@@ -0,0 +1,99 @@
+"""
+Tests for on-demand profiling hooks.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import pstats
+
+import pytest
+
+from stcc_triage.telemetry.profiling import (
+    Profiler,
+    ProfileRateLimiter,
+    configure_profiling,
+    importtime_to_folded,
+    profile_request,
+    profiled,
+)
+
+
+def _work():
+    return sum(i * i for i in range(20000))
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = configure_profiling(Profiler(tmp_path, mode="header"))
+    yield profiler
+    configure_profiling(Profiler(tmp_path))
+
+
+class TestProfiles:
+    """Expected use: profiles are written in pstats and collapsed-stack formats."""
+
+    def test_cprofile_writes_pstats(self, tmp_path):
+        with Profiler(tmp_path).profile("agent.init") as written:
+            _work()
+        assert written[0].suffix == ".prof"
+        assert pstats.Stats(str(written[0])).total_calls > 0
+
+    def test_sampler_writes_folded_stacks(self, tmp_path):
+        with Profiler(tmp_path, kind="sample", interval=0.001).profile("demo") as written:
+            for _ in range(20):
+                _work()
+        lines = written[0].read_text().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("_work (test_profiling.py" in line for line in lines)
+
+    def test_request_profiles_first_hook_only(self, profiler):
+        hooked = profiled("agent.triage")(_work)
+        assert profiler.wants_request("1") and not profiler.wants_request(None)
+
+        with profile_request(True) as request:
+            hooked()
+            first = request.path
+            hooked()
+        assert first is not None and request.path == first
+        assert len(list(profiler.output_dir.iterdir())) == 1
+
+    def test_hooks_are_noops_when_disabled(self, profiler):
+        profiled("agent.init")(_work)()
+        assert list(profiler.output_dir.iterdir()) == []
+
+
+class TestProfileLimits:
+    """Edge case: the per-minute cap and nested profiles skip quietly."""
+
+    def test_rate_limit(self):
+        limiter = ProfileRateLimiter(max_per_minute=2)
+        assert [limiter.allow() for _ in range(3)] == [True, True, False]
+        assert ProfileRateLimiter(None).allow()
+
+    def test_nested_profile_is_skipped(self, tmp_path):
+        profiler = Profiler(tmp_path, max_per_minute=None)
+        with profiler.profile("outer") as outer:
+            with profiler.profile("inner") as inner:
+                _work()
+        assert len(outer) == 1 and inner == []
+
+    def test_importtime_folding(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:        10 |         10 |     leaf\n"
+            "import time:        20 |         30 |   child\n"
+            "import time:         5 |         35 | root\n"
+        )
+        assert importtime_to_folded(output) == "root 5\nroot;child 20\nroot;child;leaf 10\n"
+
+
+class TestProfileConfig:
+    """Failure case: unknown profiler kinds and modes are rejected."""
+
+    def test_unknown_kind(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown profiler"):
+            Profiler(tmp_path, kind="perf")
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError, match="STCC_PROFILE mode"):
+            Profiler(tmp_path, mode="sometimes")
@@ -0,0 +1,113 @@
+"""
+Tests for load-adaptive triage quality.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.lm.quality import QualityController, QualityMode, get_quality_controller
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def pressure(monkeypatch):
+    """Enable the process-wide controller with a long queue."""
+    quality = get_quality_controller()
+    monkeypatch.setattr(quality, "enabled", True)
+    monkeypatch.setattr(quality, "queue_depth", lambda: 100)
+    yield quality
+    quality.reset()
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    return TestClient(api.app)
+
+
+class TestQualityController:
+    """Expected use: pressure switches to fast mode, and back once it falls."""
+
+    def test_queue_pressure(self):
+        depth = [0]
+        quality = QualityController(enabled=True, queue_high=4, hold_seconds=0)
+        quality.set_queue_source(lambda: depth[0])
+        assert quality.choose() == QualityMode.FULL
+
+        depth[0] = 4
+        assert quality.choose() == QualityMode.FAST
+        depth[0] = 2  # Above half the threshold: stay in fast mode
+        assert quality.choose() == QualityMode.FAST
+        depth[0] = 1
+        assert quality.choose() == QualityMode.FULL
+        assert quality.switches == 2
+
+    def test_latency_pressure(self):
+        quality = QualityController(enabled=True, queue_high=0, latency_high=2.0, hold_seconds=0)
+        for _ in range(10):
+            quality.record(QualityMode.FULL, 3.0)
+        assert quality.choose() == QualityMode.FAST
+
+    def test_api_reports_mode(self, client, pressure):
+        fast = client.post("/triage", json={"symptoms": "mild rash on arm for two days"}).json()
+        assert fast["mode"] == "fast" and fast["rationale"] is None
+        assert pressure.decisions["fast"] == 1
+
+
+class TestQualityEdgeCases:
+    """Edge case: red flags, hold time and stale samples keep full quality."""
+
+    def test_red_flags_stay_full(self, client, pressure):
+        response = client.post("/triage", json={"symptoms": "crushing chest pain, can't breathe"})
+        assert response.json()["mode"] == "full"
+
+    def test_hold_time_prevents_flapping(self):
+        depth = [10]
+        quality = QualityController(enabled=True, queue_high=4, hold_seconds=60)
+        quality.set_queue_source(lambda: depth[0])
+        assert quality.choose() == QualityMode.FAST
+        depth[0] = 0
+        assert quality.choose() == QualityMode.FAST
+
+    def test_fast_samples_and_stale_samples_ignored(self):
+        quality = QualityController(enabled=True, queue_high=0, latency_high=2.0, sample_ttl=60)
+        quality.record(QualityMode.FAST, 10.0)
+        assert quality.latency_p90() is None
+        quality.record(QualityMode.FULL, 10.0)
+        quality._samples[QualityMode.FULL][0] = (time.monotonic() - 120, 10.0)  # Surge is over
+        assert quality.choose() == QualityMode.FULL
+
+
+class TestQualityFailures:
+    """Failure case: fallbacks report rules mode; disabled never degrades."""
+
+    def test_disabled_controller(self):
+        quality = QualityController(enabled=False, queue_high=1)
+        quality.set_queue_source(lambda: 100)
+        assert quality.choose() == QualityMode.FULL
+
+    def test_fallback_reports_rules(self, client, monkeypatch):
+        monkeypatch.setattr(api.api_config, "triage_timeout", 0)
+        body = client.post("/triage", json={"symptoms": "mild rash"}).json()
+        assert body["degraded"] is True and body["mode"] == "rules"
+
+    def test_failing_controller_falls_back_to_rules(self, client, pressure, monkeypatch):
+        def broken():
+            raise RuntimeError("queue source failed")
+
+        monkeypatch.setattr(pressure, "queue_depth", broken)
+        body = client.post("/triage", json={"symptoms": "mild rash"}).json()
+        assert body["degraded"] is True and body["mode"] == "rules"
@@ -0,0 +1,84 @@
+"""
+Tests for the shared LM rate limiter.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import threading
+import time
+
+import pytest
+
+from stcc_triage.lm.scheduler import (
+    Lane,
+    RateLimitScheduler,
+    current_lane,
+    lm_lane,
+    red_flag_priority,
+)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    # 6000 tokens/minute refills 100 tokens per second
+    return RateLimitScheduler(tokens_per_minute=6000, state_dir=tmp_path)
+
+
+class TestTokenBucket:
+    """Expected use: grant immediately while budget remains, then wait."""
+
+    def test_grants_without_waiting_when_budget_available(self, scheduler):
+        assert scheduler.acquire(100) == pytest.approx(0.0, abs=0.01)
+
+    def test_waits_for_refill_when_exhausted(self, scheduler):
+        scheduler.acquire(6000)
+        waited = scheduler.acquire(20)
+        assert 0.1 < waited < 1.0
+
+    def test_budget_is_shared_across_schedulers(self, scheduler, tmp_path):
+        """Two schedulers on one state dir behave like two worker processes."""
+        scheduler.acquire(6000)
+        other_process = RateLimitScheduler(tokens_per_minute=6000, state_dir=tmp_path)
+        assert other_process.acquire(20) > 0.1
+
+    def test_cache_hit_refunds_reservation(self, scheduler):
+        scheduler.acquire(6000)
+        scheduler.settle(6000, 0, cache_hit=True)
+        assert scheduler.acquire(100) == pytest.approx(0.0, abs=0.01)
+
+    def test_snapshot_is_read_only(self, scheduler):
+        """Edge case: exporting metrics never rewrites the shared state."""
+        scheduler.acquire(6000)
+        before = scheduler.state_path.read_bytes()
+        time.sleep(0.05)
+        assert scheduler.snapshot()["remaining"]["tokens"] > 0
+        assert scheduler.state_path.read_bytes() == before
+
+
+class TestPriorityLanes:
+    """Edge case: higher-priority lanes are served first when budget is scarce."""
+
+    def test_red_flag_served_before_batch(self, scheduler):
+        scheduler.acquire(6000)
+        order = []
+
+        def call(lane):
+            scheduler.acquire(50, lane)
+            order.append(lane)
+
+        batch = threading.Thread(target=call, args=(Lane.BATCH,))
+        red_flag = threading.Thread(target=call, args=(Lane.RED_FLAG,))
+        batch.start()
+        time.sleep(0.05)
+        red_flag.start()
+        batch.join()
+        red_flag.join()
+
+        assert order == [Lane.RED_FLAG, Lane.BATCH]
+
+    def test_red_flag_priority_only_escalates_live_calls(self):
+        with red_flag_priority(True):
+            assert current_lane() == Lane.RED_FLAG
+        with lm_lane(Lane.COMPILE), red_flag_priority(True):
+            assert current_lane() == Lane.COMPILE
+        assert current_lane() == Lane.LIVE
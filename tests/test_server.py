@@ -0,0 +1,86 @@
+"""
+Tests for the pre-fork multi-worker server.
+
+Covers expected use and failure cases.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork needs os.fork")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, json.loads(response.read())
+
+
+def _start(*args, jobs_db=None):
+    env = dict(os.environ, DEEPSEEK_BASE_URL="stub://", DEEPSEEK_API_KEY="stub")
+    if jobs_db is not None:
+        # Keep the lifespan's job queue out of the repo's user_data/
+        env["STCC_API_JOBS_DB"] = str(jobs_db)
+    return subprocess.Popen(
+        [sys.executable, "-m", "stcc_triage.cli.api", "--host", "127.0.0.1", *args],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+
+class TestPreforkServer:
+    """Expected use: workers forked from a warmed master are ready immediately."""
+
+    def test_workers_serve_and_stop(self, tmp_path):
+        port = _free_port()
+        master = _start("--port", str(port), "--workers", "2", jobs_db=tmp_path / "jobs.sqlite3")
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    status, body = _get(f"http://127.0.0.1:{port}/readyz")
+                    break
+                except OSError:
+                    if time.monotonic() > deadline or master.poll() is not None:
+                        raise
+                    time.sleep(0.2)
+
+            # Warmed once in the master: workers inherit a ready state
+            assert status == 200 and body["status"] == "ready"
+            assert _get(f"http://127.0.0.1:{port}/livez")[1] == {"status": "alive"}
+        finally:
+            master.send_signal(signal.SIGTERM)
+            output, _ = master.communicate(timeout=30)
+
+        assert master.returncode == 0
+        assert "with 2 workers" in output
+
+
+class TestPreforkArguments:
+    """Failure case: invalid worker options are rejected before binding."""
+
+    def test_reload_with_workers(self):
+        master = _start("--workers", "2", "--reload")
+        output, _ = master.communicate(timeout=30)
+        assert master.returncode == 2
+        assert "--reload cannot be combined with --workers" in output
+
+    def test_zero_workers(self):
+        master = _start("--workers", "0")
+        output, _ = master.communicate(timeout=30)
+        assert master.returncode == 2
@@ -0,0 +1,111 @@
+"""
+Tests for server-side conversation sessions.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.sessions import SessionStore
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", "stub://")
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    monkeypatch.setattr(api, "_session_store", SessionStore())
+    return TestClient(api.app)
+
+
+class TestSessions:
+    """Expected use: the server tracks history and follow-up rounds."""
+
+    def test_ask_then_triage(self, client):
+        session_id = client.post("/sessions", json={"max_rounds": 1}).json()["session_id"]
+
+        first = client.post(f"/sessions/{session_id}/messages", json={"message": "my stomach hurts"})
+        assert first.status_code == 200
+        assert first.json()["action"] == "ask" and first.json()["question_rounds"] == 1
+
+        second = client.post(f"/sessions/{session_id}/messages", json={"message": "since yesterday"})
+        body = second.json()
+        assert body["action"] == "triage" and body["result"]["triage_level"]
+
+        state = client.get(f"/sessions/{session_id}").json()
+        assert state["messages"] == 2 and state["question_rounds"] == 0
+
+    def test_missing_info_is_tracked_incrementally(self, client):
+        session_id = client.post("/sessions", json={}).json()["session_id"]
+        client.post(f"/sessions/{session_id}/messages", json={"message": "severe headache"})
+
+        session = api._session_store.get(session_id)
+        assert "severity" not in session.missing_info
+        assert "duration" in session.missing_info
+
+    def test_delete(self, client):
+        session_id = client.post("/sessions", json={}).json()["session_id"]
+        assert client.delete(f"/sessions/{session_id}").status_code == 204
+        assert client.get(f"/sessions/{session_id}").status_code == 404
+
+
+class TestSessionStoreEdgeCases:
+    """Edge case: bounded memory with TTL expiry, LRU eviction and spill."""
+
+    def test_ttl_expiry(self):
+        store = SessionStore(ttl_seconds=60)
+        session = store.create()
+        session.last_active -= 61
+        assert store.get(session.id) is None and len(store) == 0
+
+    def test_lru_eviction_without_spill(self):
+        store = SessionStore(max_sessions=2)
+        first, second = store.create(), store.create()
+        store.get(first.id)  # second is now least recently used
+        store.create()
+        assert len(store) == 2
+        assert store.get(second.id) is None and store.get(first.id) is not None
+
+    def test_spill_and_reload(self, tmp_path):
+        store = SessionStore(max_sessions=1, spill_path=tmp_path / "sessions.sqlite3")
+        first = store.create(nurse_role="ob_nurse")
+        first.add_message("bleeding at 30 weeks", max_messages=20)
+        store.create()
+        assert len(store) == 1
+
+        reloaded = store.get(first.id)
+        assert reloaded.history == ["bleeding at 30 weeks"] and reloaded.nurse_role == "ob_nurse"
+
+    def test_history_is_capped(self):
+        session = SessionStore().create()
+        for i in range(5):
+            session.add_message(f"message {i}", max_messages=3)
+        assert session.history == ["message 2", "message 3", "message 4"]
+
+
+class TestSessionFailures:
+    """Failure case: unknown sessions, bad roles and overlapping turns."""
+
+    def test_unknown_session(self, client):
+        response = client.post("/sessions/nope/messages", json={"message": "hello"})
+        assert response.status_code == 404
+
+    def test_bad_and_uncompiled_roles(self, client):
+        assert client.post("/sessions", json={"nurse_role": "not_a_nurse"}).status_code == 400
+        assert client.post("/sessions", json={"nurse_role": "neuro_nurse"}).status_code == 404
+
+    def test_busy_session(self, client):
+        session_id = client.post("/sessions", json={}).json()["session_id"]
+        api._session_store.get(session_id).busy = True
+        response = client.post(f"/sessions/{session_id}/messages", json={"message": "hello"})
+        assert response.status_code == 409
@@ -0,0 +1,119 @@
+"""
+Tests for Server-Sent Events triage streaming.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import asyncio
+import importlib
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.lm.stub import StubResponder, create_stub_server
+from stcc_triage.nurses.pool import NursePool
+
+api = importlib.import_module("stcc_triage.api.app")
+
+
+def _events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _use_agent(monkeypatch, tmp_path, base_url):
+    monkeypatch.setenv("DEEPSEEK_BASE_URL", base_url)
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "stub")
+    monkeypatch.setenv("STCC_LM_CACHE", "false")
+    from stcc_triage.core.agent import STCCTriageAgent
+
+    agent = STCCTriageAgent()
+    monkeypatch.setattr(api, "_agent", agent)
+    monkeypatch.setattr(api, "_nurse_pool", NursePool(agent, tmp_path))
+    return agent
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    _use_agent(monkeypatch, tmp_path, "stub://")
+    return TestClient(api.app)
+
+
+@pytest.fixture
+def streaming_client(monkeypatch, tmp_path):
+    server = create_stub_server(port=0, responder=StubResponder(seed=1))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _use_agent(monkeypatch, tmp_path, f"http://127.0.0.1:{server.server_address[1]}/v1")
+    yield TestClient(api.app)
+    server.shutdown()
+
+
+class TestTriageStream:
+    """Expected use: fields arrive as events in generation order, then the result."""
+
+    def test_streams_fields_from_streaming_lm(self, streaming_client):
+        response = streaming_client.post("/triage/stream", json={"symptoms": "severe chest pain"})
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = _events(response)
+        names = [name for name, _ in events]
+        assert names[0] == "reasoning" and names.count("triage_level") == 1
+        assert names.index("triage_level") < names.index("clinical_justification")
+        assert names[-1] == "result"
+        assert events[names.index("triage_level")][1] == {"triage_level": "Emergency"}
+        justification = "".join(d["text"] for n, d in events if n == "clinical_justification")
+        assert justification.strip() == events[-1][1]["clinical_justification"]
+        assert events[-1][1]["usage"]["calls"] == 1
+
+    def test_streams_with_hedging_enabled(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("STCC_LM_HEDGE", "true")
+        server = create_stub_server(port=0, responder=StubResponder(seed=1))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            _use_agent(monkeypatch, tmp_path, f"http://127.0.0.1:{server.server_address[1]}/v1")
+            response = TestClient(api.app).post("/triage/stream", json={"symptoms": "chest pain"})
+        finally:
+            server.shutdown()
+
+        names = [name for name, _ in _events(response)]
+        assert names[0] == "reasoning" and names[-1] == "result"
+        assert "error" not in names
+
+    def test_non_streaming_lm_sends_level_and_result(self, client):
+        events = _events(client.post("/triage/stream", json={"symptoms": "mild rash"}))
+        assert [name for name, _ in events] == ["triage_level", "result"]
+        assert events[0][1]["triage_level"] == events[1][1]["triage_level"]
+        assert "usage" in events[1][1]
+
+
+class TestTriageStreamEdgeCases:
+    """Edge case: a missed deadline ends the stream with degraded triage."""
+
+    def test_deadline_falls_back(self, client, monkeypatch):
+        async def slow_stream(symptoms, conversation_history=None):
+            yield "reasoning", "Thinking"
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(api._agent, "stream_triage", slow_stream)
+        monkeypatch.setattr(api.api_config, "triage_timeout", 0.1)
+        events = _events(client.post("/triage/stream", json={"symptoms": "chest pain"}))
+
+        assert [name for name, _ in events] == ["reasoning", "triage_level", "result"]
+        assert events[-1][1]["degraded"] is True
+
+
+class TestTriageStreamFailures:
+    """Failure case: bad nurse roles are rejected before streaming starts."""
+
+    def test_unknown_role(self, client):
+        response = client.post("/triage/stream", json={"symptoms": "x", "nurse_role": "not_a_nurse"})
+        assert response.status_code == 400
+
+    def test_uncompiled_role(self, client):
+        response = client.post("/triage/stream", json={"symptoms": "x", "nurse_role": "neuro_nurse"})
+        assert response.status_code == 404
@@ -0,0 +1,73 @@
+"""
+Tests for the offline stub LM backend.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import threading
+
+import dspy
+import pytest
+
+from stcc_triage.core.signatures import FollowUpSignature, TriageSignature
+from stcc_triage.lm.hedging import HedgedLM, HedgingStats
+from stcc_triage.lm.stub import LatencyModel, StubLM, StubLMError, StubResponder, create_stub_server
+
+
+@pytest.fixture
+def stub_server():
+    server = create_stub_server(port=0, responder=StubResponder(seed=1))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+class TestStubServer:
+    """Expected use: dspy.LM pointed at the stub returns well-formed fields."""
+
+    def test_triage_signature_over_http(self, stub_server):
+        lm = dspy.LM("openai/deepseek-chat", api_key="stub", api_base=stub_server, cache=False)
+        with dspy.context(lm=lm):
+            result = dspy.ChainOfThought(TriageSignature)(symptoms="severe chest pain")
+        assert result.triage_level == "Emergency"
+        assert result.clinical_justification
+        assert lm.history[-1]["usage"]["total_tokens"] > 0
+
+    def test_stream_chunks_rebuild_completion(self):
+        responder = StubResponder(seed=1)
+        messages = [{"role": "user", "content": "[[ ## triage_level ## ]] chest pain"}]
+        chunks = responder.stream_chunks(messages, include_usage=True)
+
+        text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"])
+        assert text == responder.completion_text(messages)
+        assert chunks[-1]["usage"]["total_tokens"] > 0
+
+
+class TestStubLM:
+    """Edge case: the in-process adapter needs no server at all."""
+
+    def test_followup_signature_in_process(self):
+        with dspy.context(lm=StubLM.from_url("stub://?seed=3")):
+            result = dspy.ChainOfThought(FollowUpSignature)(
+                patient_message="I feel unwell", missing_categories="age, duration"
+            )
+        assert "How long" in result.follow_up_questions
+
+    def test_injected_errors(self):
+        """Failure case: error_rate=1 fails every call."""
+        lm = StubLM(StubResponder(error_rate=1.0))
+        with pytest.raises(StubLMError):
+            lm.forward(messages=[{"role": "user", "content": "hi"}])
+
+    def test_hedging_cuts_stub_tail_latency(self):
+        responder = StubResponder(latency="lognormal:20,1.5", seed=7)
+        lm = HedgedLM(StubLM(responder), initial_delay=0.05, min_samples=1000, stats=HedgingStats())
+        for _ in range(20):
+            lm.forward(messages=[{"role": "user", "content": "cough"}])
+        assert lm.stats.snapshot()["hedges"] > 0
+
+    def test_invalid_latency_spec(self):
+        with pytest.raises(ValueError):
+            LatencyModel("gaussian:1")
@@ -0,0 +1,102 @@
+"""
+Tests for per-stage timing and Prometheus metrics.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import dspy
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.app import app
+from stcc_triage.core.signatures import TriageSignature
+from stcc_triage.lm.stub import StubLM
+from stcc_triage.telemetry.metrics import Histogram, MetricsRegistry, observe_request
+from stcc_triage.telemetry.timing import (
+    annotate_request,
+    current_timer,
+    get_stage_callback,
+    stage,
+    track_stages,
+)
+
+
+class TestStageTiming:
+    """Expected use: stages accumulate inside a tracked request only."""
+
+    def test_stages_and_server_timing(self):
+        with track_stages() as timer:
+            with stage("retrieval"):
+                pass
+            with stage("retrieval"):
+                pass
+            annotate_request(role="ob_nurse", action="ask")
+
+        assert list(timer.stages) == ["retrieval"]
+        assert (timer.role, timer.action) == ("ob_nurse", "ask")
+        header = timer.server_timing(total=0.25)
+        assert header.startswith("retrieval;dur=")
+        assert header.endswith("total;dur=250.0")
+
+    def test_noop_outside_request(self):
+        with stage("retrieval"):
+            annotate_request(action="triage")
+        assert current_timer() is None
+
+    def test_dspy_callback_times_lm_and_parse(self):
+        with dspy.context(lm=StubLM(), callbacks=[get_stage_callback()]):
+            with track_stages() as timer:
+                dspy.ChainOfThought(TriageSignature)(symptoms="chest pain")
+        assert {"prompt", "lm", "parse"} <= set(timer.stages)
+
+
+class TestPrometheus:
+    """Edge case: histogram buckets are cumulative and labels are escaped."""
+
+    def test_histogram_rendering(self):
+        histogram = Histogram("demo_seconds", "Demo", ["role"], buckets=[0.1, 1.0])
+        histogram.observe(0.05, role='a"b')
+        histogram.observe(0.5, role='a"b')
+        text = histogram.render()
+
+        assert '# TYPE demo_seconds histogram' in text
+        assert 'demo_seconds_bucket{role="a\\"b",le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{role="a\\"b",le="1"} 2' in text
+        assert 'demo_seconds_bucket{role="a\\"b",le="+Inf"} 2' in text
+        assert 'demo_seconds_count{role="a\\"b"} 2' in text
+
+    def test_observe_request_records_stages(self):
+        with track_stages() as timer:
+            with stage("keywords"):
+                pass
+            annotate_request(role="gi_nurse", action="triage", degraded=True)
+        observe_request(timer, "/triage/specialized", 200)
+
+        text = TestClient(app).get("/metrics").text
+        assert (
+            'stcc_triage_stage_duration_seconds_count{stage="keywords",role="gi_nurse",action="triage"}'
+            in text
+        )
+        assert 'stcc_triage_degraded_total{endpoint="/triage/specialized",role="gi_nurse"}' in text
+        assert 'stcc_lm_breaker_state{state="closed"}' in text
+
+    def test_server_timing_header(self):
+        response = TestClient(app).get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "total;dur=" in response.headers["server-timing"]
+
+
+class TestMetricFailures:
+    """Failure case: wrong labels and duplicate names are rejected."""
+
+    def test_wrong_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo", ["status"])
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc(code="200")
+
+    def test_duplicate_metric(self):
+        registry = MetricsRegistry()
+        registry.counter("demo_total", "Demo")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("demo_total", "Demo")
@@ -0,0 +1,109 @@
+"""
+Tests for pluggable tracing.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import json
+
+import dspy
+import pytest
+
+from stcc_triage.core.signatures import TriageSignature
+from stcc_triage.lm.stub import StubLM
+from stcc_triage.telemetry.tracing import (
+    JSONLExporter,
+    SpanExporter,
+    configure_tracing,
+    current_span,
+    get_tracing_callback,
+    trace_span,
+    traced,
+)
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.started, self.ended = [], []
+
+    def on_start(self, span):
+        self.started.append(span.name)
+
+    def on_end(self, span):
+        self.ended.append(span)
+
+
+@pytest.fixture
+def exporter():
+    recorder = RecordingExporter()
+    configure_tracing(recorder)
+    yield recorder
+    configure_tracing(None)
+
+
+class TestSpans:
+    """Expected use: nested spans share a trace and record attributes."""
+
+    def test_nesting_and_attributes(self, exporter):
+        @traced("inner")
+        def inner():
+            current_span().set_attribute("prompt_chars", 42)
+
+        with trace_span("outer", role="ob_nurse") as outer:
+            inner()
+
+        assert exporter.started == ["outer", "inner"]
+        child, parent = exporter.ended
+        assert child.parent_id == outer.span_id
+        assert child.trace_id == parent.trace_id
+        assert child.attributes == {"prompt_chars": 42}
+        assert parent.attributes == {"role": "ob_nurse"}
+        assert parent.duration >= child.duration
+        assert current_span().name == "noop"
+
+    def test_lm_calls_become_spans(self, exporter):
+        with dspy.context(lm=StubLM(), callbacks=[get_tracing_callback()]):
+            with trace_span("agent.triage"):
+                dspy.ChainOfThought(TriageSignature)(symptoms="chest pain")
+
+        lm_span = next(span for span in exporter.ended if span.name == "lm.call")
+        assert lm_span.attributes["prompt_chars"] > 0
+        assert lm_span.attributes["lane"] == "live"
+        assert lm_span.parent_id is not None
+
+
+class TestExporters:
+    """Edge case: disabled tracing is a no-op; JSONL writes one line per span."""
+
+    def test_noop_by_default(self):
+        configure_tracing(None)
+        with trace_span("anything") as span:
+            span.set_attribute("ignored", True)
+        assert span.attributes == {}
+
+    def test_jsonl_exporter(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        configure_tracing(JSONLExporter(path))
+        try:
+            with trace_span("outer"):
+                with trace_span("inner", size=3):
+                    pass
+        finally:
+            configure_tracing(None)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["name"] for r in records] == ["inner", "outer"]
+        assert records[0]["parent_id"] == records[1]["span_id"]
+        assert records[0]["attributes"] == {"size": 3}
+
+
+class TestErrors:
+    """Failure case: exceptions mark the span as failed and propagate."""
+
+    def test_exception_recorded(self, exporter):
+        with pytest.raises(ValueError):
+            with trace_span("failing"):
+                raise ValueError("boom")
+        span = exporter.ended[0]
+        assert span.status == "error"
+        assert span.error == "ValueError: boom"
@@ -0,0 +1,109 @@
+"""
+Tests for LM token usage and cost accounting.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import dspy
+import pytest
+
+from stcc_triage.api.app import to_response
+from stcc_triage.core.signatures import TriageSignature
+from stcc_triage.lm.stub import StubLM
+from stcc_triage.lm.usage import (
+    Pricing,
+    UsageLedger,
+    UsageTrackingLM,
+    extract_usage,
+    track_usage,
+)
+
+
+class TestUsageTracking:
+    """Expected use: every LM response in a tracked block is counted and priced."""
+
+    def test_counts_tokens_and_cost(self):
+        lm = UsageTrackingLM(StubLM(), Pricing(1.0, 2.0, 0.5))
+        with dspy.context(lm=lm), track_usage() as usage:
+            dspy.ChainOfThought(TriageSignature)(symptoms="severe chest pain")
+            dspy.ChainOfThought(TriageSignature)(symptoms="mild rash")
+
+        totals = usage.snapshot()
+        assert totals["calls"] == 2
+        assert totals["prompt_tokens"] > 0 and totals["completion_tokens"] > 0
+        assert totals["total_tokens"] == totals["prompt_tokens"] + totals["completion_tokens"]
+        expected = (totals["prompt_tokens"] + 2 * totals["completion_tokens"]) / 1_000_000
+        assert totals["cost_usd"] == pytest.approx(expected, abs=1e-6)
+
+    def test_nested_blocks_roll_up(self):
+        lm = UsageTrackingLM(StubLM())
+        with dspy.context(lm=lm), track_usage() as outer:
+            with track_usage() as inner:
+                dspy.Predict(TriageSignature)(symptoms="fever")
+        assert inner.snapshot()["calls"] == outer.snapshot()["calls"] == 1
+
+    def test_response_model_carries_usage(self):
+        result = dspy.Prediction(triage_level="Urgent", clinical_justification="x")
+        response = to_response(result, {"calls": 1, "prompt_tokens": 10, "cost_usd": 0.001})
+        assert response.usage.prompt_tokens == 10
+        assert to_response(result).usage is None
+
+
+class TestUsageEdgeCases:
+    """Edge case: provider-cached prompt tokens and missing usage."""
+
+    def test_deepseek_cache_hit_tokens_are_cheaper(self):
+        response = SimpleNamespace(
+            usage={"prompt_tokens": 1000, "completion_tokens": 0, "prompt_cache_hit_tokens": 800}
+        )
+        counts = extract_usage(response)
+        assert counts["cached_prompt_tokens"] == 800
+        cost = Pricing(prompt_per_million=1.0, cached_prompt_per_million=0.1).cost(counts)
+        assert cost == pytest.approx((200 * 1.0 + 800 * 0.1) / 1_000_000)
+
+    def test_openai_cached_tokens_details(self):
+        response = {"usage": {"prompt_tokens": 50, "prompt_tokens_details": {"cached_tokens": 20}}}
+        assert extract_usage(response)["cached_prompt_tokens"] == 20
+
+    def test_missing_usage_counts_zero(self):
+        assert extract_usage(SimpleNamespace())["total_tokens"] == 0
+
+    def test_no_block_is_a_noop(self):
+        lm = UsageTrackingLM(StubLM())
+        with dspy.context(lm=lm):
+            result = dspy.Predict(TriageSignature)(symptoms="fever")
+        assert result.triage_level
+
+
+class TestUsageLedger:
+    """Failure case: rollups survive a corrupt file and merge across ledgers."""
+
+    def test_daily_rollup_by_source_and_role(self, tmp_path):
+        ledger = UsageLedger(tmp_path, flush_interval=3600)
+        usage = {"calls": 2, "prompt_tokens": 100, "completion_tokens": 20, "cost_usd": 0.5}
+        ledger.record("api", "ob_nurse", usage)
+        ledger.record("api", None, usage)
+
+        # A second process writing to the same directory merges, not overwrites
+        other_process = UsageLedger(tmp_path)
+        other_process.record("api", "ob_nurse", usage)
+        other_process.flush()
+
+        rollup = ledger.load_day()
+        assert rollup["api"]["ob_nurse"]["prompt_tokens"] == 200
+        assert rollup["api"]["ob_nurse"]["cost_usd"] == pytest.approx(1.0)
+        assert rollup["api"]["general"]["calls"] == 2
+
+    def test_corrupt_rollup_is_replaced(self, tmp_path):
+        ledger = UsageLedger(tmp_path)
+        (tmp_path / f"{date.today().isoformat()}.json").write_text("{not json")
+        ledger.record("compile", "gi_nurse", {"calls": 1, "total_tokens": 5})
+        assert ledger.load_day()["compile"]["gi_nurse"]["total_tokens"] == 5
+
+    def test_empty_usage_is_ignored(self, tmp_path):
+        ledger = UsageLedger(tmp_path)
+        ledger.record("api", "general", {"calls": 0})
+        assert ledger.load_day() == {}
@@ -0,0 +1,84 @@
+"""
+Tests for API startup warm-up and liveness/readiness probes.
+
+Covers expected use, edge cases, and failure cases.
+"""
+
+import importlib
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stcc_triage.api.warmup import Warmup
+
+# The package re-exports the FastAPI instance as stcc_triage.api.app
+api = importlib.import_module("stcc_triage.api.app")
+
+
+@pytest.fixture
+def warmup(monkeypatch):
+    state = Warmup()
+    monkeypatch.setattr(api, "warmup", state)
+    return state
+
+
+class TestWarmup:
+    """Expected use: steps run in order and the service turns ready."""
+
+    def test_steps_run_and_are_timed(self):
+        calls = []
+        state = Warmup()
+        state.run([("agent", lambda: calls.append("agent")), ("nurses", lambda: calls.append("nurses"))])
+
+        assert calls == ["agent", "nurses"]
+        snapshot = state.snapshot()
+        assert state.ready and snapshot["status"] == "ready"
+        assert list(snapshot["steps"]) == ["agent", "nurses"]
+
+    def test_background_start(self):
+        release = threading.Event()
+        state = Warmup()
+        thread = state.start([("agent", release.wait)])
+        assert state.status == "warming"
+        release.set()
+        thread.join()
+        assert state.ready
+
+    def test_probes(self, warmup):
+        client = TestClient(api.app)
+        assert client.get("/livez").json() == {"status": "alive"}
+
+        warmup.status = "warming"
+        response = client.get("/readyz")
+        assert response.status_code == 503 and response.json()["status"] == "warming"
+
+        warmup.skip()
+        assert client.get("/readyz").status_code == 200
+
+
+class TestWarmupEdgeCases:
+    """Edge case: the health check answers without building the agent while warming."""
+
+    def test_health_check_does_not_block(self, warmup, monkeypatch):
+        monkeypatch.setattr(api, "_agent", None)
+        warmup.status = "warming"
+        body = TestClient(api.app).get("/").json()
+        assert body["status"] == "warming" and body["protocols_loaded"] == 0
+        assert api._agent is None
+
+
+class TestWarmupFailures:
+    """Failure case: a failing step keeps the service unready and reports why."""
+
+    def test_failed_step(self, warmup, capsys):
+        def broken():
+            raise FileNotFoundError("compiled_ob_nurse_agent.json")
+
+        ran = []
+        warmup.run([("nurses", broken), ("retrieval", lambda: ran.append(True))])
+
+        assert warmup.status == "failed" and not ran
+        assert warmup.error.startswith("nurses: FileNotFoundError")
+        response = TestClient(api.app).get("/readyz")
+        assert response.status_code == 503 and response.json()["status"] == "failed"